@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered responses with a TTL and a bound on both the number of entries and their total size.
+    Every entry is tagged with the labels and relationship types its query reads, so a write only drops the entries
+    that depend on what it touched.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024, max_size=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._tagged = {}
+        self._versions = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def versions(self, tags):
+        """
+        Snapshot of the invalidation counters of tags, taken before the query runs and handed back to set(), so a
+        response built while a write invalidated one of its tags is never stored.
+        :param tags: [] labels and relationship types
+        :return: ()
+        """
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def get(self, key):
+        """
+        :param key: hashable
+        :return: cached value or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, tags, value, size = entry
+            if expires < monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags, versions, size):
+        """
+        :param key: hashable
+        :param value: anything
+        :param tags: [] labels and relationship types the value depends on
+        :param versions: () result of versions(tags) taken before the value was built
+        :param size: int, bytes counted against max_size
+        :return: bool, whether the value was stored
+        """
+        if size > self.max_size:
+            return False
+
+        with self._lock:
+            if versions != tuple(self._versions.get(tag, 0) for tag in tags):
+                return False
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (monotonic() + self.ttl, tags, value, size)
+            self.size += size
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries or self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def invalidate(self, *tags):
+        """
+        Drops every entry tagged with any of tags.
+        :param tags: labels and relationship types
+        :return: None
+        """
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                for key in list(self._tagged.get(tag, ())):
+                    self._remove(key)
+
+    def _remove(self, key):
+        expires, tags, value, size = self._entries.pop(key)
+        self.size -= size
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
@@ -0,0 +1,87 @@
+from bisect import bisect_left, insort
+
+from seeding import Seeded
+
+
+class Leaderboard(Seeded):
+    """
+    Every entry of a board kept in a list sorted by score descending, then id, so the top k is a slice. Writers
+    hand in the absolute score they read back from their transaction, which makes updates idempotent and lets them
+    arrive in any order relative to each other.
+    """
+
+    def __init__(self, score_field):
+        super().__init__()
+        self.score_field = score_field
+        self._order = []
+        self._items = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, the_id):
+        return the_id in self._items
+
+    def get(self, the_id):
+        """
+        :param the_id: string
+        :return: {} copy of the entry or None
+        """
+        with self._lock:
+            item = self._items.get(the_id)
+            return dict(item) if item is not None else None
+
+    def seed(self, items):
+        """
+        Replaces the board with items.
+        :param items: [] of {} with 'id' and the score field
+        """
+        super().seed(items)
+
+    def put(self, item):
+        """
+        Adds item or replaces the entry with the same id.
+        :param item: {} with 'id' and the score field
+        """
+        self._write(self._put, dict(item))
+
+    def update(self, the_id, **fields):
+        """
+        Changes fields of an entry already on the board, e.g. its score after a write.
+        :param the_id: string
+        """
+        self._write(self._update, the_id, fields)
+
+    def discard(self, the_id):
+        self._write(self._remove, the_id)
+
+    def top(self, k):
+        """
+        :param k: int
+        :return: [] of the k entries with the highest scores
+        """
+        with self._lock:
+            return [dict(self._items[the_id]) for score, the_id in self._order[:k]]
+
+    def _load(self, items):
+        self._items = {item['id']: dict(item) for item in items}
+        self._order = sorted(self._key(item) for item in self._items.values())
+
+    def _put(self, item):
+        self._remove(item['id'])
+        self._items[item['id']] = item
+        insort(self._order, self._key(item))
+
+    def _update(self, the_id, fields):
+        item = self._items.get(the_id)
+        if item is not None:
+            self._put(dict(item, **fields))
+
+    def _key(self, item):
+        return -(item[self.score_field] or 0), item['id']
+
+    def _remove(self, the_id):
+        item = self._items.pop(the_id, None)
+        if item is not None:
+            key = self._key(item)
+            del self._order[bisect_left(self._order, key)]
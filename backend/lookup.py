@@ -0,0 +1,186 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from unicodedata import category, normalize as unicode_normalize
+
+from seeding import Seeded
+
+GRAM_SIZE = 3
+UNDECOMPOSED = str.maketrans({'ł': 'l', 'đ': 'd', 'ø': 'o', 'ħ': 'h', 'ı': 'i'})
+
+
+def normalize(text):
+    """
+    :param text: string
+    :return: text casefolded, stripped of accents and with whitespace collapsed
+    """
+    decomposed = unicode_normalize('NFKD', text.casefold().translate(UNDECOMPOSED))
+    return ' '.join(''.join(char for char in decomposed if category(char) != 'Mn').split())
+
+
+def grams(key):
+    """
+    :param key: normalized string
+    :return: set of the GRAM_SIZE-grams of key padded on both sides
+    """
+    padded = ' ' * (GRAM_SIZE - 1) + key + ' ' * (GRAM_SIZE - 1)
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def edit_distance(a, b, bound):
+    """
+    Levenshtein distance of a and b, giving up as soon as it exceeds bound.
+    :return: int or None if the distance is greater than bound
+    """
+    if abs(len(a) - len(b)) > bound:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > bound:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= bound else None
+
+
+class PrefixIndex(Seeded):
+    """
+    Names of shows, persons and users kept in one list of (key, type, id) sorted by key, where key is the normalized
+    name or its tail starting at any later word, so both "breaking b" and "cranston" find their entries. Completing
+    a prefix is a bisect to its first key followed by a scan over the keys that start with it.
+
+    Every entry is also indexed by its whole normalized name and by the trigrams of it, which find() uses to look a
+    name up ignoring case, accents and a bounded number of typos.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._order = []
+        self._names = {}
+        self._exact = {}
+        self._grams = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, entry):
+        return entry in self._names
+
+    def seed(self, items):
+        """
+        Replaces the index with items.
+        :param items: [] of (type, id, name), entries without a name are skipped
+        """
+        super().seed(items)
+
+    def put(self, the_type, the_id, name):
+        """
+        Adds an entry or renames the entry with the same type and id.
+        :param the_type: string
+        :param the_id: string
+        :param name: string
+        """
+        self._write(self._put, (the_type, the_id), name)
+
+    def discard(self, the_type, the_id):
+        self._write(self._remove, (the_type, the_id))
+
+    def complete(self, prefix, limit, types=None):
+        """
+        :param prefix: string
+        :param limit: int
+        :param types: () of types to return, all if None
+        :return: [] of (type, id, name) of at most limit entries with a name or a word of it starting with prefix,
+        in key order
+        """
+        prefix = normalize(prefix)
+        completions = []
+        found = set()
+        with self._lock:
+            i = bisect_left(self._order, (prefix,))
+            while i < len(self._order) and len(completions) < limit:
+                key, the_type, the_id = self._order[i]
+                if not key.startswith(prefix):
+                    break
+                if (types is None or the_type in types) and (the_type, the_id) not in found:
+                    found.add((the_type, the_id))
+                    completions.append((the_type, the_id, self._names[(the_type, the_id)]))
+                i += 1
+        return completions
+
+    def find(self, the_type, name, max_distance, limit):
+        """
+        Entries of the_type whose normalized name equals the normalized name or is within max_distance edits of it.
+        Candidates for the latter are the entries sharing enough trigrams with it, since every edit changes at most
+        GRAM_SIZE of them, and only those are compared character by character.
+        :param the_type: string
+        :param name: string
+        :param max_distance: int
+        :param limit: int
+        :return: [] of (id, distance) of at most limit entries, closest first
+        """
+        key = normalize(name)
+        query = grams(key)
+        max_distance = min(max_distance, (len(query) - 1) // GRAM_SIZE)
+        with self._lock:
+            exact = sorted(the_id for entry_type, the_id in self._exact.get(key, ()) if entry_type == the_type)
+            shared = Counter()
+            if max_distance > 0:
+                for gram in query:
+                    shared.update(entry for entry in self._grams.get(gram, ()) if entry[0] == the_type)
+            candidates = [
+                (entry[1], normalize(self._names[entry])) for entry, count in shared.items()
+                if count >= len(query) - GRAM_SIZE * max_distance and entry[1] not in exact
+            ]
+
+        found = [(0, key, the_id) for the_id in exact]
+        for the_id, candidate in candidates:
+            distance = edit_distance(key, candidate, max_distance)
+            if distance is not None:
+                found.append((distance, candidate, the_id))
+        return [(the_id, distance) for distance, candidate, the_id in sorted(found)[:limit]]
+
+    def _load(self, items):
+        self._names = {(the_type, the_id): name for the_type, the_id, name in items if name}
+        self._order = sorted(key + entry for entry, name in self._names.items() for key in self._keys(name))
+        self._exact = {}
+        self._grams = {}
+        for entry, name in self._names.items():
+            self._index(entry, name)
+
+    def _put(self, entry, name):
+        self._remove(entry)
+        if name:
+            self._names[entry] = name
+            for key in self._keys(name):
+                insort(self._order, key + entry)
+            self._index(entry, name)
+
+    @staticmethod
+    def _keys(name):
+        words = normalize(name).split()
+        return {(' '.join(words[i:]),) for i in range(len(words))}
+
+    def _index(self, entry, name):
+        key = normalize(name)
+        self._exact.setdefault(key, set()).add(entry)
+        for gram in grams(key):
+            self._grams.setdefault(gram, set()).add(entry)
+
+    def _unindex(self, entry, name):
+        key = normalize(name)
+        for index, keys in ((self._exact, (key,)), (self._grams, grams(key))):
+            for key in keys:
+                entries = index.get(key)
+                if entries is not None:
+                    entries.discard(entry)
+                    if not entries:
+                        del index[key]
+
+    def _remove(self, entry):
+        name = self._names.pop(entry, None)
+        if name is not None:
+            for key in self._keys(name):
+                del self._order[bisect_left(self._order, key + entry)]
+            self._unindex(entry, name)
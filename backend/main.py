@@ -1,9 +1,25 @@
 import os
-from os.path import join, dirname
+import re
+import json
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from multiprocessing import get_context, parent_process
+from functools import wraps
+from threading import Lock, Thread, Timer
+from time import time
+from os.path import join, dirname, exists
+from uuid import uuid4
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, Response
-from neo4j import GraphDatabase
-from io import StringIO
+from flask import Flask, request, jsonify, Response, make_response
+from neo4j import GraphDatabase, READ_ACCESS
+from neo4j.exceptions import ConstraintError, Neo4jError
+from cache import ResponseCache
+from leaderboard import Leaderboard
+from lookup import PrefixIndex
+from pagination import InvalidParameter, decode_cursor, encode_cursor, next_cursor, sort_query
+from recommender import ItemRecommender, rank_reviews, recommend_chunk
+from similarity import MinHashIndex
 
 dotenv_path = join(dirname(__file__), '.env')
 load_dotenv(dotenv_path)
@@ -16,143 +32,919 @@ driver = GraphDatabase.driver(uri=URI, auth=(USERNAME, PASSWORD))
 api = Flask(__name__)
 driver.verify_connectivity()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_RECOMMENDATIONS = 10
+DEFAULT_COMPLETIONS = 10
+FUZZY_MAX_DISTANCE = 2
+POPULARITY_PRIOR = 10
+AFFINITY_WEIGHT = 1.0
+REVIEW_COMMENT_WEIGHT = 0.5
+REVIEW_HALF_LIFE = 7 * 24 * 60 * 60
+DEFAULT_FETCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 10000
+BULK_BATCH_SIZE = 1000
+MAX_BULK_BATCH_SIZE = 10000
+CACHE_TTL = int(os.environ.get("CACHE_TTL", 60))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 1024))
+CACHE_MAX_SIZE = int(os.environ.get("CACHE_MAX_SIZE", 64 * 1024 * 1024))
+RECOMMEND_CACHE_TTL = int(os.environ.get("RECOMMEND_CACHE_TTL", 3600))
+RECOMMEND_CACHE_MAX_ENTRIES = int(os.environ.get("RECOMMEND_CACHE_MAX_ENTRIES", 10000))
+RECOMMEND_CACHE_MAX_SIZE = int(os.environ.get("RECOMMEND_CACHE_MAX_SIZE", 64 * 1024 * 1024))
+POPULARITY_REFRESH = int(os.environ.get("POPULARITY_REFRESH", 300))
+RECOMMENDER_PATH = os.environ.get("RECOMMENDER_PATH", join(dirname(__file__), 'recommender.npz'))
+RECOMMEND_CHUNK_SIZE = 500
+SIMILARITY_PERMUTATIONS = 128
+SIMILARITY_BANDS = 32
+RECOMMEND_WORKERS = int(os.environ.get("RECOMMEND_WORKERS", os.cpu_count() or 1))
+
+
+def new_uid():
+    """
+    Public uid for an entity written with MERGE. The statement sets it only ON CREATE, so comparing it with the
+    stored uid tells whether the entity was created or already existed.
+    :return: string
+    """
+    return str(uuid4())
+
+
+# pagination------------------------------------------------------------------------------------------------------------
 
-# /genres---------------------------------------------------------------------------------------------------------------
 
+@api.errorhandler(InvalidParameter)
+def invalid_parameter_handler(error):
+    response = {'message': str(error)}
+    return jsonify(response), 400
 
-def get_genres(tx):
-    locate_genre = """
-        MATCH (genre:Genre)
-        WITH genre.name AS genre, ID(genre) AS id
-        RETURN genre, id
+
+def get_limit(default=DEFAULT_PAGE_SIZE, streamed=False):
+    """
+    Reads ?limit= from the query string, capped at MAX_PAGE_SIZE unless the response is streamed.
+    :param default: int or None
+    :param streamed: bool
+    :return: int or None
     """
-    locate_genre_result = tx.run(locate_genre).data()
-    return locate_genre_result
+    limit = request.args.get('limit', default, type=int)
+    if limit is not None and limit < 1:
+        raise InvalidParameter('Invalid limit!')
+    if limit is not None and not streamed:
+        limit = min(limit, MAX_PAGE_SIZE)
+    return limit
 
 
-@api.route('/genres', methods=['GET'])
-def get_genres_route():
+def get_page(streamed=False):
     """
-    http GET http://127.0.0.1:5000/genres
-    :return: {}
+    Reads ?limit=&cursor= from the query string. Streamed responses are not capped and have no limit by default.
+    :param streamed: bool
+    :return: (limit, after) where after is [key, the_id] of the last row already seen or None
     """
-    with driver.session() as session:
-        genres = session.read_transaction(get_genres)
+    limit = get_limit(None if streamed else DEFAULT_PAGE_SIZE, streamed)
 
-    response = {'genres': genres}
-    return jsonify(response)
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    return limit, after
 
 
-def get_genres_csv(tx):
-    locate_genres = """
-        WITH "MATCH (genre:Genre) WITH genre.name AS genre, ID(genre) AS id RETURN genre, id" AS query
-        CALL apoc.export.csv.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
+# streaming-------------------------------------------------------------------------------------------------------------
+
+
+def is_streamed():
     """
-    locate_genres_result = tx.run(locate_genres).data()
-    return locate_genres_result[0]['data']
+    :return: True if the client opted in with ?stream=true
+    """
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
 
 
-@api.route('/admin/get/csv/genres', methods=['GET'])
-def get_genres_csv_route():
+def stream_response(name, query, key, limit, **params):
     """
-    http GET http://127.0.0.1:5000/admin/get/csv/genres
-    :return: StringIO
+    Sends {name: [...], 'next': cursor} as a chunked response. Rows are pulled from the driver's result cursor
+    fetch_size records at a time and serialized one by one, so neither the list of rows nor the whole body is ever
+    held in memory.
+    :param name: string
+    :param query: string
+    :param key: name of the column holding the sort key, left out of the rows sent
+    :param limit: int or None
+    :return: Response
+    """
+    fetch_size = request.args.get('fetch_size', DEFAULT_FETCH_SIZE, type=int)
+    if fetch_size < 1:
+        raise InvalidParameter('Invalid fetch size!')
+
+    def generate():
+        with driver.session(default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+            result = session.run(query, limit=limit, **params)
+            yield '{"%s": [' % name
+            last, count = None, 0
+            for record in result:
+                row = record.data()
+                last = row.pop(key), row['id']
+                yield (', ' if count else '') + json.dumps(row)
+                count += 1
+            cursor = encode_cursor(*last) if limit is not None and count == limit else None
+            yield '], "next": %s}' % json.dumps(cursor)
+
+    return Response(generate(), mimetype='application/json')
+
+
+def export_response(export_format, query=None):
+    """
+    Streams an APOC export to the client. APOC yields one record per batch_size rows (?batch_size=, default 10000)
+    and the driver fetches them one at a time, so only a single batch is held in the API process.
+    :param export_format: 'csv' | 'json'
+    :param query: string, whole database is exported when left out
+    :return: Response
+    """
+    batch_size = request.args.get('batch_size', EXPORT_BATCH_SIZE, type=int)
+    if batch_size < 1:
+        raise InvalidParameter('Invalid batch size!')
+
+    if query:
+        export = f"""
+            CALL apoc.export.{export_format}.query($query, null, {{stream: true, batchSize: $batch_size}})
+            YIELD data
+            RETURN data
+        """
+    else:
+        export = f"""
+            CALL apoc.export.{export_format}.all(null, {{stream: true, batchSize: $batch_size}})
+            YIELD data
+            RETURN data
+        """
+
+    def generate():
+        with driver.session(default_access_mode=READ_ACCESS, fetch_size=1) as session:
+            for record in session.run(export, query=query, batch_size=batch_size):
+                yield record['data']
+
+    return Response(generate(), mimetype='text/plain')
+
+
+# caching---------------------------------------------------------------------------------------------------------------
+
+
+cache = ResponseCache(CACHE_TTL, CACHE_MAX_ENTRIES, CACHE_MAX_SIZE)
+recommendation_cache = ResponseCache(RECOMMEND_CACHE_TTL, RECOMMEND_CACHE_MAX_ENTRIES, RECOMMEND_CACHE_MAX_SIZE)
+
+
+def cache_key():
     """
-    with driver.session() as session:
-        string = session.read_transaction(get_genres_csv)
+    :return: (path, args) of the current request, with args in a stable order
+    """
+    return request.path, tuple(sorted(request.args.items(multi=True)))
+
 
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
+def user_tag(the_id):
+    """
+    :param the_id: string, user uid
+    :return: tag of the cached responses computed from the connections of one user
+    """
+    return f'User:{the_id}'
 
 
-def get_genres_json(tx):
-    locate_genres = """
-        WITH "MATCH (genre:Genre) WITH genre.name AS genre, ID(genre) AS id RETURN genre, id" AS query
-        CALL apoc.export.json.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
+def cached(*tags, store=None, user=None):
     """
-    locate_genres_result = tx.run(locate_genres).data()
-    return locate_genres_result[0]['data']
+    Serves a GET route from the response cache. The rendered body and its ETag are stored under the route and its
+    arguments until they expire or a write invalidates one of tags, so a matching If-None-Match is answered with 304
+    straight from the cache. Streamed responses are never cached.
+    :param tags: labels and relationship types the route reads
+    :param store: ResponseCache to use instead of the shared one
+    :param user: name of the route argument holding a user uid, whose user_tag() is added to tags
+    :return: decorator
+    """
+    responses = cache if store is None else store
 
+    def decorator(route):
+        @wraps(route)
+        def cached_route(*args, **kwargs):
+            if is_streamed():
+                return route(*args, **kwargs)
 
-@api.route('/admin/get/json/genres', methods=['GET'])
-def get_genres_json_route():
+            entry_tags = tags + (user_tag(kwargs[user]),) if user else tags
+            key = cache_key()
+            hit = responses.get(key)
+            if hit is not None:
+                body, mimetype, etag = hit
+                if request.if_none_match.contains(etag):
+                    response = Response(status=304)
+                else:
+                    response = Response(body, mimetype=mimetype)
+                response.set_etag(etag)
+                return response
+
+            versions = responses.versions(entry_tags)
+            response = make_response(route(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                body = response.get_data()
+                response.add_etag()
+                etag, weak = response.get_etag()
+                responses.set(key, (body, response.mimetype, etag), entry_tags, versions, len(body))
+            return response
+        return cached_route
+    return decorator
+
+
+def invalidates(*tags):
     """
-    http GET http://127.0.0.1:5000/admin/get/json/genres
-    :return: StringIO
+    Drops the cached responses and recommendations that read any of tags once a write route has run.
+    :param tags: labels and relationship types the route writes
+    :return: decorator
     """
-    with driver.session() as session:
-        string = session.read_transaction(get_genres_json)
+    def decorator(route):
+        @wraps(route)
+        def invalidating_route(*args, **kwargs):
+            try:
+                return route(*args, **kwargs)
+            finally:
+                cache.invalidate(*tags)
+                recommendation_cache.invalidate(*tags)
+        return invalidating_route
+    return decorator
 
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
+
+def invalidate_recommendations(connection):
+    """
+    Drops the cached recommendations of the user whose connection was written.
+    :param connection: {} result of a connection write returning user_id
+    """
+    recommendation_cache.invalidate(user_tag(connection['user_id']))
 
 
-def sort_genres_by_name(tx):
-    locate_genre = """
-        MATCH (genre:Genre)
-        WITH genre.name AS genre, ID(genre) AS id
-        RETURN genre, id
-        ORDER BY genre
+def refresh_popularity():
+    """
+    Every POPULARITY_REFRESH seconds drops the cached recommendations that rank by other users' likes and
+    connections, which no per-user invalidation covers. Also reseeds the leaderboards and rebuilds the recommendation
+    model if it fell behind the graph, so separate processes converge on the writes made by each other.
     """
-    locate_genre_result = tx.run(locate_genre).data()
-    return locate_genre_result
+    timer = Timer(POPULARITY_REFRESH, refresh_popularity)
+    timer.daemon = True
+    timer.start()
 
+    recommendation_cache.invalidate('popularity')
+    if show_board.seeded and user_board.seeded:
+        with seed_lock:
+            seed_leaderboards()
+    reconcile_recommender()
 
-@api.route('/genres/sort/by_name', methods=['GET'])
-def sort_genres_by_name_route():
+
+@api.after_request
+def conditional_response(response):
     """
-    http GET http://127.0.0.1:5000/genres/sort/by_name
+    Gives every complete JSON response to a GET a strong ETag hashed from its body and answers a matching
+    If-None-Match with 304. Streamed listings and exports are left alone.
+    """
+    if request.method != 'GET' or response.status_code != 200 or response.is_streamed:
+        return response
+    if response.mimetype != 'application/json':
+        return response
+
+    etag, weak = response.get_etag()
+    if etag is None:
+        response.add_etag()
+    return response.make_conditional(request)
+
+
+# leaderboards----------------------------------------------------------------------------------------------------------
+
+
+show_board = Leaderboard('score')
+user_board = Leaderboard('activity')
+seed_lock = Lock()
+
+
+def ensure_seeded(seed, lock, *indexes):
+    """
+    Runs seed the first time one of indexes is needed before it was seeded. Requests arriving meanwhile wait on lock
+    and find them seeded.
+    """
+    if all(index.seeded for index in indexes):
+        return
+    with lock:
+        if not all(index.seeded for index in indexes):
+            seed()
+
+
+def get_leaderboards(tx):
+    locate_shows = """
+        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
+        RETURN show.title AS title, show.photo AS photo, genre.name AS genre, show.uid AS id, show.likes AS score
+    """
+    locate_users = """
+        MATCH (user:User)
+        RETURN user.uid AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo, user.activity AS activity
+    """
+    locate_shows_result = tx.run(locate_shows).data()
+    locate_users_result = tx.run(locate_users).data()
+    return locate_shows_result, locate_users_result
+
+
+def seed_leaderboards():
+    """
+    Loads every show score and user activity into the in-process leaderboards. Writes that land while the snapshot
+    is read are replayed on top of it.
+    """
+    show_board.begin_seed()
+    user_board.begin_seed()
+    with driver.session(default_access_mode=READ_ACCESS) as session:
+        shows, users = session.read_transaction(get_leaderboards)
+    show_board.seed(shows)
+    user_board.seed(users)
+
+
+def board_show(show):
+    """
+    :param show: {} result of a write returning title, photo, genre, id and score of a show
+    """
+    show_board.put({field: show[field] for field in ('title', 'photo', 'genre', 'id', 'score')})
+
+
+def board_genre(show):
+    """
+    Shows left without a genre are dropped, as seed_leaderboards() only reads shows that have one.
+    :param show: {} with show_id and the name of another genre of the show or None
+    """
+    if show['genre'] is None:
+        show_board.discard(show['show_id'])
+    else:
+        show_board.update(show['show_id'], genre=show['genre'])
+
+
+def board_likes(connection):
+    """
+    :param connection: {} result of a LIKES write returning show_id and the new likes of the show
+    """
+    show_board.update(connection['show_id'], score=connection['likes'])
+
+
+def board_activity(connection):
+    """
+    :param connection: {} result of a review or comment write returning user_id and the new activity of the user
+    """
+    user_board.update(connection['user_id'], activity=connection['activity'])
+
+
+def board_user(user):
+    """
+    :param user: {} result of a write returning id, nick, e_mail, photo and activity of a user
+    """
+    user_board.put({field: user[field] for field in ('id', 'nick', 'e_mail', 'photo', 'activity')})
+
+
+# collaborative filtering-----------------------------------------------------------------------------------------------
+
+
+recommender = None
+recommender_lock = Lock()
+recommender_save_lock = Lock()
+recommend_pool = None
+
+
+def get_interactions(tx):
+    locate_interactions = """
+        MATCH (user:User)-[conn:SEEN|LIKES]->(show:Show)
+        RETURN user.uid AS user, show.uid AS show, count(conn) AS weight
+    """
+    return [(record['user'], record['show'], record['weight']) for record in tx.run(locate_interactions)]
+
+
+def count_interactions(tx):
+    """
+    Both counts are answered from the count store, without touching any relationship.
+    :return: int, the number of SEEN and LIKES connections to shows, equal to ItemRecommender.weight() of an up to
+    date model
+    """
+    count_seen = 'MATCH ()-[conn:SEEN]->(:Show) RETURN count(conn) AS count'
+    count_likes = 'MATCH ()-[conn:LIKES]->(:Show) RETURN count(conn) AS count'
+    return tx.run(count_seen).single()['count'] + tx.run(count_likes).single()['count']
+
+
+def graph_watermark():
+    with driver.session(default_access_mode=READ_ACCESS) as session:
+        return session.read_transaction(count_interactions)
+
+
+def build_recommender():
+    """
+    Builds the item-item model from every SEEN and LIKES connection and saves it to RECOMMENDER_PATH.
+    :return: ItemRecommender
+    """
+    global recommender
+    with driver.session(default_access_mode=READ_ACCESS, fetch_size=DEFAULT_FETCH_SIZE) as session:
+        interactions = session.read_transaction(get_interactions)
+
+    users, shows, weights = zip(*interactions) if interactions else ((), (), ())
+    model = ItemRecommender.from_interactions(users, shows, weights)
+    model.save(RECOMMENDER_PATH)
+    recommender = model
+    return model
+
+
+def load_recommender(build=False):
+    """
+    A saved model is used only if its watermark matches the graph. Interactions it missed, e.g. writes still pending
+    when a process stopped or made by another process, get it rebuilt instead.
+    :param build: bool, build the model from the database if there is no saved model
+    :return: ItemRecommender or None
+    """
+    global recommender
+    if recommender is not None:
+        return recommender
+    with recommender_lock:
+        if recommender is None:
+            model = None
+            if exists(RECOMMENDER_PATH):
+                try:
+                    model = ItemRecommender.load(RECOMMENDER_PATH)
+                except (OSError, ValueError, KeyError):
+                    model = None
+            if model is not None and model.watermark == graph_watermark():
+                recommender = model
+            elif model is not None or build:
+                build_recommender()
+    return recommender
+
+
+def save_recommender():
+    """
+    Saves the model if it changed and still matches the graph, so a process whose model fell behind never
+    overwrites a newer one. Only one save runs at a time.
+    """
+    model = recommender
+    if model is None or not model.changed or not recommender_save_lock.acquire(blocking=False):
+        return
+    try:
+        if model.weight() == graph_watermark():
+            model.save(RECOMMENDER_PATH)
+    finally:
+        recommender_save_lock.release()
+
+
+def reconcile_recommender():
+    """
+    Rebuilds the model when it no longer matches the graph, e.g. after writes made by another process.
+    """
+    model = recommender
+    if model is not None and model.weight() != graph_watermark():
+        build_recommender()
+
+
+def train_recommender(connection):
+    """
+    Once an update folds the pending interactions into the model, it is saved in a background thread, off the
+    request. Interactions still pending are saved at exit.
+    :param connection: {} result of a SEEN or LIKES write returning user_id, show_id and weight, the number of SEEN
+    and LIKES connections left between them
+    """
+    model = load_recommender()
+    if model is not None and model.set_interaction(connection['user_id'], connection['show_id'], connection['weight']):
+        Thread(target=save_recommender, daemon=True).start()
+
+
+# Recommendation workers are spawned, and re-run this module when the app is started with python main.py. Only the
+# app process keeps the model saved and the popularity refreshed.
+if parent_process() is None:
+    atexit.register(save_recommender)
+    refresh_popularity()
+
+
+def describe_shows(scored):
+    """
+    :param scored: [] of (show uid, score)
+    :return: [] of shows with their details from the show leaderboard
+    """
+    shows = []
+    for show_id, score in scored:
+        show = show_board.get(show_id)
+        if show:
+            shows.append({
+                'title': show['title'],
+                'photo': show['photo'],
+                'genre': show['genre'],
+                'id': show_id,
+                'likes': show['score'],
+                'score': score
+            })
+    return shows
+
+
+def get_watchlists(tx, users):
+    locate_watchlists = """
+        UNWIND $users AS user_id
+        MATCH (:User {uid: user_id})-[:WANTS_TO_WATCH]->(show:Show)
+        RETURN user_id, collect(show.uid) AS shows
+    """
+    return {record['user_id']: record['shows'] for record in tx.run(locate_watchlists, users=users)}
+
+
+def read_watchlists(users):
+    """
+    :param users: [] of user uids
+    :return: {} user uid -> [] of uids of the shows the user wants to watch, which are not recommended to them
+    """
+    with driver.session(default_access_mode=READ_ACCESS, fetch_size=DEFAULT_FETCH_SIZE) as session:
+        return session.read_transaction(get_watchlists, users)
+
+
+def recommend_similar_shows(user_id, limit):
+    """
+    :param user_id: string
+    :param limit: int
+    :return: [] of the shows most similar to those the user has seen or liked, best first, without the shows on
+    their watchlist
+    """
+    model = load_recommender(build=True)
+    ensure_seeded(seed_leaderboards, seed_lock, show_board, user_board)
+
+    return describe_shows(model.recommend(user_id, limit, read_watchlists([user_id]).get(user_id, ())))
+
+
+def get_recommend_pool():
+    """
+    Worker processes are spawned rather than forked, since a fork would copy the driver's connections and the locks
+    held by other threads. They only need recommend_chunk, which reads the model from RECOMMENDER_PATH.
+    :return: ProcessPoolExecutor
+    """
+    global recommend_pool
+    with recommender_lock:
+        if recommend_pool is None:
+            recommend_pool = ProcessPoolExecutor(RECOMMEND_WORKERS, mp_context=get_context('spawn'))
+    return recommend_pool
+
+
+def recommendation_lines(users, recommended):
+    """
+    :param users: [] of user uids
+    :param recommended: {} user uid -> [] of (show uid, score)
+    :return: generator of one NDJSON line per user
+    """
+    for user in users:
+        line = {'user': user, 'recommended': describe_shows(recommended[user])}
+        yield json.dumps(line) + '\n'
+
+
+def stream_recommendations(model, users, limit):
+    """
+    Scores users in chunks of RECOMMEND_CHUNK_SIZE, in the worker pool when there is more than one chunk, and yields
+    one NDJSON line per user in the order given. Watchlists are read chunk by chunk, and at most
+    2 * RECOMMEND_WORKERS chunks are in flight, so memory stays bounded however many users are scored. Workers use
+    the model saved by save_recommender(), which leaves the previous file in place while the model does not match
+    the graph.
+    :param model: ItemRecommender
+    :param users: [] of user uids
+    :param limit: int
+    :return: generator
+    """
+    chunks = (users[i:i + RECOMMEND_CHUNK_SIZE] for i in range(0, len(users), RECOMMEND_CHUNK_SIZE))
+    if len(users) > RECOMMEND_CHUNK_SIZE:
+        save_recommender()
+    if len(users) <= RECOMMEND_CHUNK_SIZE or not exists(RECOMMENDER_PATH):
+        for chunk in chunks:
+            yield from recommendation_lines(chunk, model.recommend_many(chunk, limit, read_watchlists(chunk)))
+        return
+
+    pool = get_recommend_pool()
+    pending = deque()
+    for chunk in chunks:
+        future = pool.submit(recommend_chunk, RECOMMENDER_PATH, chunk, limit, read_watchlists(chunk))
+        pending.append((chunk, future))
+        if len(pending) >= 2 * RECOMMEND_WORKERS:
+            chunk, future = pending.popleft()
+            yield from recommendation_lines(chunk, future.result())
+    for chunk, future in pending:
+        yield from recommendation_lines(chunk, future.result())
+
+
+@api.cli.command('recommender')
+def recommender_command():
+    """
+    flask --app main recommender
+    """
+    model = build_recommender()
+    print(f"{len(model.users)} users, {len(model.shows)} shows, {model.cooccurrence.nnz} co-occurrences "
+          f"saved to {RECOMMENDER_PATH}")
+
+
+# user similarity-------------------------------------------------------------------------------------------------------
+
+
+similarity = MinHashIndex(SIMILARITY_PERMUTATIONS, SIMILARITY_BANDS)
+similarity_lock = Lock()
+
+
+def seed_similarity():
+    """
+    Indexes the shows every user has seen or liked. Writes that land while the snapshot is read are replayed on top
+    of it.
+    """
+    similarity.begin_seed()
+    with driver.session(default_access_mode=READ_ACCESS, fetch_size=DEFAULT_FETCH_SIZE) as session:
+        interactions = session.read_transaction(get_interactions)
+    similarity.seed((user, show) for user, show, weight in interactions)
+
+
+def index_history(connection):
+    """
+    :param connection: {} result of a SEEN or LIKES write returning user_id, show_id and weight, the number of SEEN
+    and LIKES connections left between them
+    """
+    similarity.set_interaction(connection['user_id'], connection['show_id'], connection['weight'] > 0)
+
+
+# autocomplete----------------------------------------------------------------------------------------------------------
+
+
+lookup = PrefixIndex()
+lookup_lock = Lock()
+
+
+def get_names(tx):
+    locate_names = """
+        MATCH (show:Show)
+        RETURN 'show' AS type, show.uid AS id, show.title AS name
+        UNION ALL
+        MATCH (person:Person)
+        RETURN 'person' AS type, person.uid AS id, person.name + ' ' + person.surname AS name
+        UNION ALL
+        MATCH (user:User)
+        RETURN 'user' AS type, user.uid AS id, user.nick AS name
+    """
+    return [(record['type'], record['id'], record['name']) for record in tx.run(locate_names)]
+
+
+def seed_lookup():
+    """
+    Loads every show title, person name and user nick into the in-process prefix index. Writes that land while the
+    snapshot is read are replayed on top of it.
+    """
+    lookup.begin_seed()
+    with driver.session(default_access_mode=READ_ACCESS, fetch_size=DEFAULT_FETCH_SIZE) as session:
+        names = session.read_transaction(get_names)
+    lookup.seed(names)
+
+
+def lookup_show(show):
+    """
+    :param show: {} result of a write returning id and title of a show
+    """
+    lookup.put('show', show['id'], show['title'])
+
+
+def lookup_person(person):
+    """
+    :param person: {} result of a write returning id, name and surname of a person
+    """
+    lookup.put('person', person['id'], f"{person['name']} {person['surname']}")
+
+
+def lookup_user(user):
+    """
+    :param user: {} result of a write returning id and nick of a user
+    """
+    lookup.put('user', user['id'], user['nick'])
+
+
+def is_fuzzy():
+    """
+    :return: True if the client opted in with ?fuzzy=true
+    """
+    return request.args.get('fuzzy', '').lower() in ('1', 'true', 'yes')
+
+
+def fuzzy_matches(the_type, name):
+    """
+    Looks name up in the prefix index ignoring case and accents and allowing up to FUZZY_MAX_DISTANCE typos.
+    :param the_type: 'show' | 'person' | 'user'
+    :param name: string
+    :return: [] of {position, id, distance} of the best ?limit= matches, closest first
+    """
+    limit = get_limit(DEFAULT_COMPLETIONS)
+    ensure_seeded(seed_lookup, lookup_lock, lookup)
+
+    return [
+        {'position': position, 'id': the_id, 'distance': distance}
+        for position, (the_id, distance) in enumerate(lookup.find(the_type, name, FUZZY_MAX_DISTANCE, limit))
+    ]
+
+
+# sorting---------------------------------------------------------------------------------------------------------------
+
+
+def sort_listing(tx, listing, sort, descending, limit, after):
+    locate_page = sort_query(listing, sort, descending)
+    locate_page_result = tx.run(locate_page, limit=limit, after=after).data()
+    return locate_page_result
+
+
+def sort_response(listing, sort=None, order=None):
+    """
+    Shared body of the list routes. Plain listings take ?sort=&order= from the query string, the /sort/... aliases pass
+    them explicitly. ?stream=true switches to a chunked response.
+    :param listing: {} one of the *_LISTING specs
+    :param sort: string
+    :param order: 'asc' | 'desc'
     :return: {}
     """
+    sort = sort or request.args.get('sort', 'id')
+    order = order or request.args.get('order', 'asc')
+    if sort not in listing['keys'] or order not in ('asc', 'desc'):
+        raise InvalidParameter('Invalid sort key!')
+
+    if is_streamed():
+        limit, after = get_page(streamed=True)
+        query = sort_query(listing, sort, order == 'desc', paged=limit is not None)
+        return stream_response(listing['name'], query, 'key', limit, after=after)
+    limit, after = get_page()
+
     with driver.session() as session:
-        genres = session.read_transaction(sort_genres_by_name)
+        rows = session.read_transaction(sort_listing, listing, sort, order == 'desc', limit, after)
+
+    cursor = next_cursor(rows, 'key', limit)
+    for row in rows:
+        del row['key']
+    response = {listing['name']: rows, 'next': cursor}
+    return jsonify(response)
+
+
+# bulk------------------------------------------------------------------------------------------------------------------
+
 
-    response = {'genres': genres}
+INVALID_JSON = object()
+
+
+def read_bulk_rows():
+    """
+    Yields (index, row) for every row of a bulk request. NDJSON bodies are read line by line from the request stream,
+    anything else is parsed as a JSON array. Lines that are not valid JSON are yielded as INVALID_JSON.
+    :return: generator
+    """
+    if request.mimetype == 'application/x-ndjson':
+        index = 0
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError:
+                yield index, INVALID_JSON
+            index += 1
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            raise InvalidParameter('Expected a JSON array or NDJSON!')
+        yield from enumerate(rows)
+
+
+def bulk_import(work, fields, exists_message=None, on_write=()):
+    """
+    Writes the rows of a bulk request in UNWIND batches of ?batch_size= rows (default 1000), one transaction per
+    batch. work is the same write helper the single-row routes use, so rows are validated by the same statement: a
+    row missing from its result did not match, a row with created = false already existed. A batch the database
+    rejects, e.g. for a value of the wrong type or a uniqueness conflict with a concurrent write, is retried one row
+    at a time, so only the offending rows are reported.
+    :param work: tx function taking a list of rows
+    :param fields: [] required fields of a row
+    :param exists_message: error reported for rows that already existed, None if that is not an error
+    :param on_write: () of functions called with the result of every written row once its batch is committed
+    :return: {}
+    """
+    batch_size = request.args.get('batch_size', BULK_BATCH_SIZE, type=int)
+    if batch_size < 1:
+        raise InvalidParameter('Invalid batch size!')
+    batch_size = min(batch_size, MAX_BULK_BATCH_SIZE)
+
+    written = []
+    errors = []
+
+    def write(batch):
+        try:
+            with driver.session() as session:
+                results = session.write_transaction(work, batch)
+        except Neo4jError as error:
+            if len(batch) > 1:
+                for row in batch:
+                    write([row])
+            else:
+                exists = isinstance(error, ConstraintError) and exists_message
+                errors.append({'index': batch[0]['index'], 'message': exists or 'Invalid arguments!'})
+            return
+
+        results = {result['index']: result for result in results}
+        for row in batch:
+            result = results.get(row['index'])
+            if not result:
+                errors.append({'index': row['index'], 'message': 'Invalid arguments!'})
+            elif exists_message and not result['created']:
+                errors.append({'index': row['index'], 'message': exists_message})
+            else:
+                written.append({'index': row['index'], 'id': result['id']})
+                for hook in on_write:
+                    hook(result)
+
+    batch = []
+    for index, row in read_bulk_rows():
+        if row is INVALID_JSON:
+            errors.append({'index': index, 'message': 'Invalid JSON!'})
+            continue
+        if not isinstance(row, dict) or any(field not in row for field in fields):
+            errors.append({'index': index, 'message': 'Missing fields!'})
+            continue
+
+        batch.append(dict({field: row[field] for field in fields}, index=index, uid=new_uid()))
+        if len(batch) == batch_size:
+            write(batch)
+            batch = []
+    if batch:
+        write(batch)
+
+    response = {'status': 'success', 'written': written, 'errors': errors}
     return jsonify(response)
 
 
-def reverse_sort_genres_by_name(tx):
-    locate_genre = """
-        MATCH (genre:Genre)
-        WITH genre.name AS genre, ID(genre) AS id
-        RETURN genre, id
-        ORDER BY genre DESC
+# /genres---------------------------------------------------------------------------------------------------------------
+
+
+GENRE_LISTING = {
+    'name': 'genres',
+    'match': 'MATCH (genre:Genre)',
+    'node': 'genre',
+    'carry': 'genre',
+    'keys': {
+        'id': ('genre.uid', 'id', "''"),
+        'name': ('genre.name', 'genre', "''"),
+    },
+    'return': 'RETURN genre.name AS genre, id',
+}
+
+
+@api.route('/genres', methods=['GET'])
+@cached('Genre')
+def get_genres_route():
+    """
+    http GET http://127.0.0.1:5000/genres sort==name order==desc limit==10
+    :return: {}
     """
-    locate_genre_result = tx.run(locate_genre).data()
-    return locate_genre_result
+    return sort_response(GENRE_LISTING)
+
+
+GENRES_EXPORT = """
+    MATCH (genre:Genre)
+    WITH genre.name AS genre, genre.uid AS id
+    RETURN genre, id
+"""
+
+
+@api.route('/admin/get/csv/genres', methods=['GET'])
+def get_genres_csv_route():
+    """
+    http GET http://127.0.0.1:5000/admin/get/csv/genres
+    :return: Response
+    """
+    return export_response('csv', GENRES_EXPORT)
+
+
+@api.route('/admin/get/json/genres', methods=['GET'])
+def get_genres_json_route():
+    """
+    http GET http://127.0.0.1:5000/admin/get/json/genres
+    :return: Response
+    """
+    return export_response('json', GENRES_EXPORT)
+
+
+@api.route('/genres/sort/by_name', methods=['GET'])
+@cached('Genre')
+def sort_genres_by_name_route():
+    """
+    http GET http://127.0.0.1:5000/genres/sort/by_name
+    :return: {}
+    """
+    return sort_response(GENRE_LISTING, 'name', 'asc')
 
 
 @api.route('/genres/sort/reverse/by_name', methods=['GET'])
+@cached('Genre')
 def reverse_sort_genres_by_name_route():
     """
     http GET http://127.0.0.1:5000/genres/sort/reverse/by_name
     :return: {}
     """
-    with driver.session() as session:
-        genres = session.read_transaction(reverse_sort_genres_by_name)
-
-    response = {'genres': genres}
-    return jsonify(response)
+    return sort_response(GENRE_LISTING, 'name', 'desc')
 
 
 # /admin/genres---------------------------------------------------------------------------------------------------------
 
 
 def add_genre(tx, name):
-    locate_genre = "MATCH (genre:Genre {name: $name}) RETURN genre"
-    locate_genre_result = tx.run(locate_genre, name=name).data()
-
-    if not locate_genre_result:
-        create_genre = "CREATE (:Genre {name: $name})"
-        tx.run(create_genre, name=name)
-        return {'name': name}
+    create_genre = """
+        MERGE (genre:Genre {name: $name})
+        ON CREATE SET genre.uid = $uid
+        RETURN genre.uid AS id, genre.uid = $uid AS created
+    """
+    create_genre_result = tx.run(create_genre, name=name, uid=new_uid()).data()
+    return create_genre_result[0]
 
 
 @api.route('/admin/genres', methods=['POST'])
+@invalidates('Genre')
 def add_genre_route():
     """
     http POST http://127.0.0.1:5000/admin/genres genre="name"
@@ -163,29 +955,38 @@ def add_genre_route():
     with driver.session() as session:
         genre = session.write_transaction(add_genre, name)
 
-    if not genre:
+    if not genre or not genre['created']:
         response = {'message': 'Genre already exists!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        response = {'status': 'success', 'id': genre['id']}
         return jsonify(response)
 
 
 def delete_genre(tx, the_id):
-    locate_genre = "MATCH (genre:Genre) WHERE ID(genre) = $the_id RETURN genre"
-    locate_genre_result = tx.run(locate_genre, the_id=the_id).data()
+    remove_genre = """
+        MATCH (genre:Genre {uid: $the_id})
+        CALL {
+            WITH genre
+            MATCH (show:Show)-[:BELONGS]-(genre)
+            WITH show, head([(show)-[:BELONGS]-(other:Genre) WHERE other <> genre | other.name]) AS other
+            RETURN collect({show_id: show.uid, genre: other}) AS shows
+        }
+        DETACH DELETE genre
+        RETURN $the_id AS id, shows
+    """
+    remove_genre_result = tx.run(remove_genre, the_id=the_id).data()
 
-    if locate_genre_result:
-        remove_genre = "MATCH (genre:Genre) WHERE ID(genre) = $the_id DETACH DELETE genre"
-        tx.run(remove_genre, the_id=the_id)
-        return {'id': the_id}
+    if remove_genre_result:
+        return remove_genre_result[0]
 
 
-@api.route('/admin/genres/<int:the_id>', methods=['DELETE'])
+@api.route('/admin/genres/<string:the_id>', methods=['DELETE'])
+@invalidates('Genre', 'BELONGS')
 def delete_genre_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/admin/genres/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/admin/genres/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -195,6 +996,8 @@ def delete_genre_route(the_id):
         response = {'message': 'Genre not found!'}
         return jsonify(response)
     else:
+        for show in genre['shows']:
+            board_genre(show)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -202,278 +1005,171 @@ def delete_genre_route(the_id):
 # /persons--------------------------------------------------------------------------------------------------------------
 
 
-def get_persons(tx):
-    locate_person = """
-        MATCH (person:Person)
-        WITH person.name AS name, person.surname AS surname, person.photo AS photo, ID(person) AS id
-        RETURN name, surname, photo, id
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result
+PERSON_LISTING = {
+    'name': 'persons',
+    'match': 'MATCH (person:Person)',
+    'node': 'person',
+    'carry': 'person',
+    'keys': {
+        'id': ('person.uid', 'id', "''"),
+        'name': ('person.surname', 'surname', "''"),
+        'roles': ('size([(person)-[:PLAYED]-(:Show) | 1])', 'played', '0'),
+        'directed': ('size([(person)-[:DIRECTED]-(:Show) | 1])', 'directed', '0'),
+    },
+    'return': """
+        RETURN person.name AS name,
+            person.surname AS surname,
+            person.photo AS photo,
+            id,
+            size([(person)-[:PLAYED]-(:Show) | 1]) AS played,
+            size([(person)-[:DIRECTED]-(:Show) | 1]) AS directed
+    """,
+}
 
 
 @api.route('/persons', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def get_persons_route():
     """
-    http GET http://127.0.0.1:5000/persons
+    http GET http://127.0.0.1:5000/persons sort==roles order==desc limit==10
     :return: {}
     """
-    with driver.session() as session:
-        persons = session.read_transaction(get_persons)
+    return sort_response(PERSON_LISTING)
 
-    response = {'persons': persons}
-    return jsonify(response)
 
-
-def get_persons_csv(tx):
-    locate_person = """
-        WITH "MATCH (person:Person)
-            WITH person.name AS name, person.surname AS surname, person.photo AS photo, ID(person) AS id
-            RETURN name, surname, photo, id" AS query
-        CALL apoc.export.csv.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result[0]['data']
+PERSONS_EXPORT = """
+    MATCH (person:Person)
+    WITH person.name AS name, person.surname AS surname, person.photo AS photo, person.uid AS id
+    RETURN name, surname, photo, id
+"""
 
 
 @api.route('/admin/get/csv/persons', methods=['GET'])
 def get_persons_csv_route():
     """
     http GET http://127.0.0.1:5000/admin/get/csv/persons
-    :return: StringIO
+    :return: Response
     """
-    with driver.session() as session:
-        string = session.read_transaction(get_persons_csv)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
-
-
-def get_persons_json(tx):
-    locate_person = """
-        WITH "MATCH (person:Person)
-            WITH person.name AS name, person.surname AS surname, person.photo AS photo, ID(person) AS id
-            RETURN name, surname, photo, id" AS query
-        CALL apoc.export.json.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result[0]['data']
+    return export_response('csv', PERSONS_EXPORT)
 
 
 @api.route('/admin/get/json/persons', methods=['GET'])
 def get_persons_json_route():
     """
     http GET http://127.0.0.1:5000/admin/get/json/persons
-    :return: StringIO
+    :return: Response
     """
-    with driver.session() as session:
-        string = session.read_transaction(get_persons_json)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
+    return export_response('json', PERSONS_EXPORT)
 
 
 def find_person_by_name(tx, name, surname):
     locate_person = """
         MATCH (person:Person {name: $name, surname: $surname})
-        WITH person.name AS name, person.surname AS surname, person.photo AS photo, ID(person) AS id
+        WITH person.name AS name, person.surname AS surname, person.photo AS photo, person.uid AS id
         RETURN name, surname, photo, id
     """
     locate_person_result = tx.run(locate_person, name=name, surname=surname).data()
     return locate_person_result
 
 
+def find_persons_by_matches(tx, matches):
+    locate_person = """
+        UNWIND $matches AS match
+        MATCH (person:Person {uid: match.id})
+        WITH match, person.name AS name, person.surname AS surname, person.photo AS photo, person.uid AS id
+        RETURN name, surname, photo, id, match.distance AS distance
+        ORDER BY match.position
+    """
+    locate_person_result = tx.run(locate_person, matches=matches).data()
+    return locate_person_result
+
+
 @api.route('/persons/find/by_name/<string:name>&<string:surname>', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def find_person_by_name_route(name, surname):
     """
-    http GET http://127.0.0.1:5000/persons/find/by_name/<string:name>&<string:surname>
+    http GET http://127.0.0.1:5000/persons/find/by_name/<string:name>&<string:surname> fuzzy==true limit==10
     :param name: string
     :param surname: string
     :return: {}
     """
     with driver.session() as session:
-        person = session.read_transaction(find_person_by_name, name, surname)
+        if is_fuzzy():
+            person = session.read_transaction(find_persons_by_matches, fuzzy_matches('person', f'{name} {surname}'))
+        else:
+            person = session.read_transaction(find_person_by_name, name, surname)
 
     response = {'person': person}
     return jsonify(response)
 
 
-def sort_persons_by_surname(tx):
-    locate_person = """
-        MATCH (person:Person)
-        WITH person.name AS name, person.surname AS surname, person.photo AS photo, ID(person) AS id
-        RETURN name, surname, photo, id
-        ORDER BY surname
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result
-
-
 @api.route('/persons/sort/by_name', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def sort_persons_by_surname_route():
     """
     http GET http://127.0.0.1:5000/persons/sort/by_name
     :return: {}
     """
-    with driver.session() as session:
-        persons = session.read_transaction(sort_persons_by_surname)
-
-    response = {'persons': persons}
-    return jsonify(response)
-
-
-def reverse_sort_persons_by_surname(tx):
-    locate_person = """
-        MATCH (person:Person)
-        WITH person.name AS name, person.surname AS surname, person.photo AS photo, ID(person) AS id
-        RETURN name, surname, photo, id
-        ORDER BY surname DESC
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result
+    return sort_response(PERSON_LISTING, 'name', 'asc')
 
 
 @api.route('/persons/sort/reverse/by_name', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def reverse_sort_persons_by_surname_route():
     """
     http GET http://127.0.0.1:5000/persons/sort/reverse/by_name
     :return: {}
     """
-    with driver.session() as session:
-        persons = session.read_transaction(reverse_sort_persons_by_surname)
-
-    response = {'persons': persons}
-    return jsonify(response)
-
-
-def sort_persons_by_roles(tx):
-    locate_person = """
-        MATCH (person:Person)
-        OPTIONAL MATCH (person)-[conn:PLAYED]-(:Show)
-        WITH person.name AS name,
-            person.surname AS surname,
-            person.photo AS photo,
-            ID(person) AS id,
-            count(conn) AS played
-        RETURN name, surname, photo, id
-        ORDER BY played DESC
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result
+    return sort_response(PERSON_LISTING, 'name', 'desc')
 
 
 @api.route('/persons/sort/by_roles', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def sort_persons_by_roles_route():
     """
     http GET http://127.0.0.1:5000/persons/sort/by_roles
     :return: {}
     """
-    with driver.session() as session:
-        persons = session.read_transaction(sort_persons_by_roles)
-
-    response = {'persons': persons}
-    return jsonify(response)
-
-
-def reverse_sort_persons_by_roles(tx):
-    locate_person = """
-        MATCH (person:Person)
-        OPTIONAL MATCH (person)-[conn:PLAYED]-(:Show)
-        WITH person.name AS name,
-            person.surname AS surname,
-            person.photo AS photo,
-            ID(person) AS id,
-            count(conn) AS played
-        RETURN name, surname, photo, id
-        ORDER BY played
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result
+    return sort_response(PERSON_LISTING, 'roles', 'desc')
 
 
 @api.route('/persons/sort/reverse/by_roles', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def reverse_sort_persons_by_roles_route():
     """
     http GET http://127.0.0.1:5000/persons/sort/reverse/by_roles
     :return: {}
     """
-    with driver.session() as session:
-        persons = session.read_transaction(reverse_sort_persons_by_roles)
-
-    response = {'persons': persons}
-    return jsonify(response)
-
-
-def sort_persons_by_directed(tx):
-    locate_person = """
-        MATCH (person:Person)
-        OPTIONAL MATCH (person)-[conn:DIRECTED]-(:Show)
-        WITH person.name AS name,
-            person.surname AS surname,
-            person.photo AS photo,
-            ID(person) AS id,
-            count(conn) AS directed
-        RETURN name, surname, photo, id
-        ORDER BY directed DESC
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result
+    return sort_response(PERSON_LISTING, 'roles', 'asc')
 
 
 @api.route('/persons/sort/by_directed', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def sort_persons_by_directed_route():
     """
     http GET http://127.0.0.1:5000/persons/sort/by_directed
     :return: {}
     """
-    with driver.session() as session:
-        persons = session.read_transaction(sort_persons_by_directed)
-
-    response = {'persons': persons}
-    return jsonify(response)
-
-
-def reverse_sort_persons_by_directed(tx):
-    locate_person = """
-        MATCH (person:Person)
-        OPTIONAL MATCH (person)-[conn:DIRECTED]-(:Show)
-        WITH person.name AS name,
-            person.surname AS surname,
-            person.photo AS photo,
-            ID(person) AS id,
-            count(conn) AS directed
-        RETURN name, surname, photo, id
-        ORDER BY directed
-    """
-    locate_person_result = tx.run(locate_person).data()
-    return locate_person_result
+    return sort_response(PERSON_LISTING, 'directed', 'desc')
 
 
 @api.route('/persons/sort/reverse/by_directed', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED')
 def reverse_sort_persons_by_directed_route():
     """
     http GET http://127.0.0.1:5000/persons/sort/reverse/by_directed
     :return: {}
     """
-    with driver.session() as session:
-        persons = session.read_transaction(reverse_sort_persons_by_directed)
-
-    response = {'persons': persons}
-    return jsonify(response)
+    return sort_response(PERSON_LISTING, 'directed', 'asc')
 
 
 def get_person_info(tx, the_id):
     locate_person = """
-        MATCH (person:Person)
-        WHERE ID(person) = $the_id
+        MATCH (person:Person {uid: $the_id})
         OPTIONAL MATCH (person)-[played:PLAYED]-(in:Show)
         OPTIONAL MATCH (person)-[:DIRECTED]-(what:Show)
         WITH person,
-            ID(person) AS id,
+            person.uid AS id,
             collect(distinct played.role) AS roles,
             collect(distinct in.title) AS filmography,
             collect(distinct what.title) AS directed
@@ -497,11 +1193,12 @@ def get_person_info(tx, the_id):
         return person
 
 
-@api.route('/persons/<int:the_id>', methods=['GET'])
+@api.route('/persons/<string:the_id>', methods=['GET'])
+@cached('Person', 'PLAYED', 'DIRECTED', 'Show')
 def get_person_info_route(the_id):
     """
-    http GET http://127.0.0.1:5000/persons/<int:the_id>
-    :param the_id: int
+    http GET http://127.0.0.1:5000/persons/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -518,17 +1215,28 @@ def get_person_info_route(the_id):
 # /admin/persons--------------------------------------------------------------------------------------------------------
 
 
-def add_person(tx, name, surname, born, photo):
-    locate_person = "MATCH (person:Person {name: $name, surname: $surname, born: $born}) RETURN person"
-    locate_person_result = tx.run(locate_person, name=name, surname=surname, born=born).data()
+def add_persons(tx, rows):
+    create_persons = """
+        UNWIND $rows AS row
+        MERGE (person:Person {name: row.name, surname: row.surname, born: row.born})
+        ON CREATE SET person.uid = row.uid, person.photo = row.photo
+        RETURN row.index AS index,
+            person.uid AS id,
+            person.uid = row.uid AS created,
+            person.name AS name,
+            person.surname AS surname
+    """
+    create_persons_result = tx.run(create_persons, rows=rows).data()
+    return create_persons_result
+
 
-    if not locate_person_result:
-        create_person = "CREATE (:Person {name: $name, surname: $surname, born: $born, photo: $photo})"
-        tx.run(create_person, name=name, surname=surname, born=born, photo=photo)
-        return {'name': name, 'surname': surname, 'born': born, 'photo': photo}
+def add_person(tx, name, surname, born, photo):
+    rows = [{'index': 0, 'uid': new_uid(), 'name': name, 'surname': surname, 'born': born, 'photo': photo}]
+    return add_persons(tx, rows)[0]
 
 
 @api.route('/admin/persons', methods=['POST'])
+@invalidates('Person')
 def add_person_route():
     """
     http POST http://127.0.0.1:5000/admin/persons name="name" surname="surname" born=1999 photo="photoURL"
@@ -542,33 +1250,54 @@ def add_person_route():
     with driver.session() as session:
         person = session.write_transaction(add_person, name, surname, born, photo)
 
-    if not person:
+    if not person or not person['created']:
         response = {'message': 'This person is already in database!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        lookup_person(person)
+        response = {'status': 'success', 'id': person['id']}
         return jsonify(response)
 
 
-def put_person_info(tx, the_id, name, surname, born, photo):
-    locate_person = "MATCH (person:Person) WHERE ID(person) = $the_id RETURN person"
-    locate_person_result = tx.run(locate_person, the_id=the_id).data()
-
-    if locate_person_result:
-        update_person = """
-            MATCH (person:Person)
-            WHERE ID(person) = $the_id
-            SET person.name = $name, person.surname = $surname, person.born = $born, person.photo = $photo
-        """
-        tx.run(update_person, the_id=the_id, name=name, surname=surname, born=born, photo=photo).data()
-        return {'name': name, 'surname': surname, 'born': born, 'photo': photo}
+@api.route('/admin/bulk/persons', methods=['POST'])
+@invalidates('Person')
+def add_persons_route():
+    """
+    http POST http://127.0.0.1:5000/admin/bulk/persons < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with name, surname, born, photo.
+    :return: {}
+    """
+    fields = ['name', 'surname', 'born', 'photo']
+    exists_message = 'This person is already in database!'
+    return bulk_import(add_persons, fields, exists_message=exists_message, on_write=(lookup_person,))
 
 
-@api.route('/admin/persons/<int:the_id>', methods=['PUT'])
+def put_person_info(tx, the_id, name, surname, born, photo):
+    update_person = """
+        MATCH (person:Person {uid: $the_id})
+        SET person.name = $name, person.surname = $surname, person.born = $born, person.photo = $photo
+        RETURN person.uid AS id, person.name AS name, person.surname AS surname
+    """
+    update_person_result = tx.run(
+        update_person,
+        the_id=the_id,
+        name=name,
+        surname=surname,
+        born=born,
+        photo=photo
+    ).data()
+
+    if update_person_result:
+        return update_person_result[0]
+
+
+@api.route('/admin/persons/<string:the_id>', methods=['PUT'])
+@invalidates('Person')
 def put_person_info_route(the_id):
     """
-    http PUT http://127.0.0.1:5000/admin/persons/<int:the_id> name="name" surname="surname" born=1999 photo="photoURL"
-    :param the_id: int
+    http PUT http://127.0.0.1:5000/admin/persons/<string:the_id> name="name" surname="surname" born=1999
+    photo="photoURL"
+    :param the_id: string
     :return: {}
     """
     name = request.json['name']
@@ -583,29 +1312,29 @@ def put_person_info_route(the_id):
         response = {'message': 'Person not found!'}
         return jsonify(response)
     else:
+        lookup_person(person)
         response = {'status': 'success'}
         return jsonify(response)
 
 
 def delete_person(tx, the_id):
-    locate_person = "MATCH (person:Person) WHERE ID(person) = $the_id RETURN person"
-    locate_person_result = tx.run(locate_person, the_id=the_id).data()
+    remove_person = """
+        MATCH (person:Person {uid: $the_id})
+        DETACH DELETE person
+        RETURN $the_id AS id
+    """
+    remove_person_result = tx.run(remove_person, the_id=the_id).data()
 
-    if locate_person_result:
-        detach_delete_person = """
-            MATCH (person:Person)
-            WHERE ID(person) = $the_id
-            DETACH DELETE person
-        """
-        tx.run(detach_delete_person, the_id=the_id)
-        return {'the_id': the_id}
+    if remove_person_result:
+        return remove_person_result[0]
 
 
-@api.route('/admin/persons/<int:the_id>', methods=['DELETE'])
+@api.route('/admin/persons/<string:the_id>', methods=['DELETE'])
+@invalidates('Person', 'PLAYED', 'DIRECTED')
 def delete_person_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/admin/persons/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/admin/persons/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -615,6 +1344,7 @@ def delete_person_route(the_id):
         response = {'message': 'Person not found!'}
         return jsonify(response)
     else:
+        lookup.discard('person', the_id)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -622,95 +1352,53 @@ def delete_person_route(the_id):
 # /shows----------------------------------------------------------------------------------------------------------------
 
 
-def get_shows(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-        RETURN title, photo, genre, id, score
-    """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
+SHOW_LISTING = {
+    'name': 'shows',
+    'match': 'MATCH (show:Show)-[:BELONGS]-(genre:Genre)',
+    'node': 'show',
+    'carry': 'show, genre',
+    'keys': {
+        'id': ('show.uid', 'id', "''"),
+        'title': ('show.title', 'title', "''"),
+        'genre': ('genre.name', 'genre', "''"),
+        'score': ('show.likes', 'score', '0'),
+    },
+    'return': 'RETURN show.title AS title, show.photo AS photo, genre.name AS genre, id, show.likes AS score',
+}
 
 
 @api.route('/shows', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def get_shows_route():
     """
-    http GET http://127.0.0.1:5000/shows
+    http GET http://127.0.0.1:5000/shows sort==score order==desc limit==10
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(get_shows)
-
-    response = {'shows': shows}
-    return jsonify(response)
+    return sort_response(SHOW_LISTING)
 
 
-def get_shows_csv(tx):
-    locate_shows = """
-        WITH "MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-            OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-            WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-            RETURN title, photo, genre, id, score" AS query
-        CALL apoc.export.csv.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
-    """
-    locate_shows_result = tx.run(locate_shows).data()
-    return locate_shows_result[0]['data']
+SHOWS_EXPORT = """
+    MATCH (show:Show)-[:BELONGS]-(genre:Genre)
+    RETURN show.title AS title, show.photo AS photo, genre.name AS genre, show.uid AS id, show.likes AS score
+"""
 
 
 @api.route('/admin/get/csv/shows', methods=['GET'])
 def get_shows_csv_route():
     """
     http GET http://127.0.0.1:5000/admin/get/csv/shows
-    :return: StringIO
-    """
-    with driver.session() as session:
-        string = session.read_transaction(get_shows_csv)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
-
-
-def get_shows_json(tx):
-    locate_shows = """
-        WITH "MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-            OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-            WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-            RETURN title, photo, genre, id, score" AS query
-        CALL apoc.export.json.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
+    :return: Response
     """
-    locate_shows_result = tx.run(locate_shows).data()
-    return locate_shows_result[0]['data']
+    return export_response('csv', SHOWS_EXPORT)
 
 
 @api.route('/admin/get/json/shows', methods=['GET'])
 def get_shows_json_route():
     """
     http GET http://127.0.0.1:5000/admin/get/json/shows
-    :return: StringIO
-    """
-    with driver.session() as session:
-        string = session.read_transaction(get_shows_json)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
-
-
-def get_top_shows(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, ID(show) AS id, genre.name AS genre, count(like) AS score
-        RETURN title, photo, genre, id, score
-        ORDER BY score DESC
-        LIMIT 5
+    :return: Response
     """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
+    return export_response('json', SHOWS_EXPORT)
 
 
 @api.route('/shows/top', methods=['GET'])
@@ -719,61 +1407,112 @@ def get_top_shows_route():
     http GET http://127.0.0.1:5000/shows/top
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(get_top_shows)
+    ensure_seeded(seed_leaderboards, seed_lock, show_board, user_board)
 
-    response = {'shows': shows}
+    response = {'shows': show_board.top(5)}
     return jsonify(response)
 
 
-def recommend_shows(tx, user_id):
-    locate_title = """
-        MATCH (user:User) WHERE ID(user) = $user_id
-        MATCH (show:Show)-[BELONGS]-(genre:Genre) WHERE NOT (user)-[:SEEN|WANTS_TO_WATCH]-(show)
-        OPTIONAL MATCH (:User)-[like:LIKES]-(show)
-        WITH show.title AS title, show.photo AS photo, ID(show) AS id, genre.name AS genre, count(like) AS score
-        RETURN title, photo, genre, id, score
+def recommend_shows(tx, user_id, limit, genre=None):
+    """
+    Ranks the shows the user has neither seen nor put on the watchlist by popularity, likes / (likes + prior), plus
+    their genre affinity, the share of the user's SEEN and LIKES connections pointing at shows of that genre. Neo4j
+    keeps only the best limit rows while sorting.
     """
-    locate_title_result = tx.run(locate_title, user_id=user_id).data()
+    locate_title = """
+        MATCH (user:User {uid: $user_id})
+        WITH user, size([(user)-[:SEEN|LIKES]->(:Show) | 1]) AS history
+        MATCH (genre:Genre) WHERE $genre IS NULL OR genre.name = $genre
+        WITH user,
+            genre,
+            toFloat(size([(user)-[:SEEN|LIKES]->(:Show)-[:BELONGS]->(genre) | 1])) / CASE history
+                WHEN 0 THEN 1
+                ELSE history
+            END AS affinity
+        MATCH (show:Show)-[:BELONGS]->(genre) WHERE NOT (user)-[:SEEN|WANTS_TO_WATCH]-(show)
+        WITH show, genre, affinity, coalesce(show.likes, 0) AS likes
+        WITH show, genre, likes, toFloat(likes) / (likes + $prior) + $weight * affinity AS score
+        ORDER BY score DESC, show.uid
+        LIMIT $limit
+        RETURN show.title AS title, show.photo AS photo, genre.name AS genre, show.uid AS id, likes, score
+    """
+    locate_title_result = tx.run(
+        locate_title,
+        user_id=user_id,
+        genre=genre,
+        limit=limit,
+        prior=POPULARITY_PRIOR,
+        weight=AFFINITY_WEIGHT
+    ).data()
     return locate_title_result
 
 
-@api.route('/shows/recommend/<int:the_id>', methods=['GET'])
-def recommend_shows_route(the_id):
+@api.route('/shows/recommend/<string:the_id>', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'popularity', store=recommendation_cache, user='the_id')
+def recommend_shows_route(the_id):
+    """
+    http GET http://127.0.0.1:5000/shows/recommend/<string:the_id> limit==10 mode==cf
+    :param the_id: string
+    :return: {}
+    """
+    mode = request.args.get('mode', 'popular')
+    if mode not in ('popular', 'cf'):
+        raise InvalidParameter('Invalid mode!')
+    limit = get_limit(DEFAULT_RECOMMENDATIONS)
+
+    if mode == 'cf':
+        shows = recommend_similar_shows(the_id, limit)
+    else:
+        with driver.session() as session:
+            shows = session.read_transaction(recommend_shows, the_id, limit)
+
+    response = {'recommended': shows}
+    return jsonify(response)
+
+
+@api.route('/shows/recommend/batch', methods=['POST'])
+def recommend_shows_batch_route():
     """
-    http GET http://127.0.0.1:5000/shows/recommend/<int:the_id>
-    :param the_id: int
-    :return: {}
+    http POST http://127.0.0.1:5000/shows/recommend/batch users:='["user-uid", "user-uid"]' limit==10
+    Recommends shows in collaborative filtering mode for every user in the body, or for every user with a SEEN or
+    LIKES connection if there is none. Answers with one JSON line per user.
+    :return: Response
     """
-    with driver.session() as session:
-        shows = session.read_transaction(recommend_shows, the_id)
+    limit = get_limit(DEFAULT_RECOMMENDATIONS)
+    body = request.get_json(silent=True)
+    if body is None:
+        body = {}
+    if not isinstance(body, dict):
+        raise InvalidParameter('Invalid users!')
+    users = body.get('users')
+    if users is not None and (not isinstance(users, list) or not all(isinstance(user, str) for user in users)):
+        raise InvalidParameter('Invalid users!')
 
-    response = {'recommended': shows}
-    return jsonify(response)
+    model = load_recommender(build=True)
+    ensure_seeded(seed_leaderboards, seed_lock, show_board, user_board)
+    if users is None:
+        users = model.active_users()
 
+    return Response(stream_recommendations(model, users, limit), mimetype='application/x-ndjson')
 
-def recommend_shows_by_genre(tx, user_id, genre):
-    locate_title = """
-        MATCH (user:User) WHERE ID(user) = $user_id
-        MATCH (show:Show)-[BELONGS]-(genre:Genre {name: $genre}) WHERE NOT (user)-[:SEEN|WANTS_TO_WATCH]-(show)
-        OPTIONAL MATCH (:User)-[like:LIKES]-(show)
-        WITH show.title AS title, show.photo AS photo, ID(show) AS id, genre.name AS genre, count(like) AS score
-        RETURN title, photo, genre, id, score
-    """
-    locate_title_result = tx.run(locate_title, user_id=user_id, genre=genre).data()
-    return locate_title_result
 
+def recommend_shows_by_genre(tx, user_id, genre, limit):
+    return recommend_shows(tx, user_id, limit, genre)
 
-@api.route('/shows/recommend/by_genre/<int:the_id>&<string:genre>', methods=['GET'])
+
+@api.route('/shows/recommend/by_genre/<string:the_id>&<string:genre>', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'popularity', store=recommendation_cache, user='the_id')
 def recommend_shows_by_genre_route(the_id, genre):
     """
-    http GET http://127.0.0.1:5000/shows/recommend/by_genre/<int:the_id>&<string:genre>
-    :param the_id: int
+    http GET http://127.0.0.1:5000/shows/recommend/by_genre/<string:the_id>&<string:genre> limit==10
+    :param the_id: string
     :param genre: string
     :return: {}
     """
+    limit = get_limit(DEFAULT_RECOMMENDATIONS)
+
     with driver.session() as session:
-        shows = session.read_transaction(recommend_shows_by_genre, the_id, genre)
+        shows = session.read_transaction(recommend_shows_by_genre, the_id, genre, limit)
 
     response = {'recommended': shows}
     return jsonify(response)
@@ -782,23 +1521,38 @@ def recommend_shows_by_genre_route(the_id, genre):
 def find_show_by_name(tx, title):
     locate_title = """
         MATCH (show:Show {title: $title})-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, ID(show) AS id, genre.name AS genre, count(like) AS score
+        WITH show.title AS title, show.photo AS photo, show.uid AS id, genre.name AS genre, show.likes AS score
         RETURN title, photo, id, genre, score
     """
     locate_title_result = tx.run(locate_title, title=title).data()
     return locate_title_result
 
 
+def find_shows_by_matches(tx, matches):
+    locate_title = """
+        UNWIND $matches AS match
+        MATCH (show:Show {uid: match.id})-[:BELONGS]-(genre:Genre)
+        WITH match, show.title AS title, show.photo AS photo, show.uid AS id, genre.name AS genre, show.likes AS score
+        RETURN title, photo, id, genre, score, match.distance AS distance
+        ORDER BY match.position
+    """
+    locate_title_result = tx.run(locate_title, matches=matches).data()
+    return locate_title_result
+
+
 @api.route('/shows/find/by_name/<string:title>', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def find_show_by_name_route(title):
     """
-    http GET http://127.0.0.1:5000/shows/find/by_name/<string:title>
+    http GET http://127.0.0.1:5000/shows/find/by_name/<string:title> fuzzy==true limit==10
     :param title: string
     :return: {}
     """
     with driver.session() as session:
-        show = session.read_transaction(find_show_by_name, title)
+        if is_fuzzy():
+            show = session.read_transaction(find_shows_by_matches, fuzzy_matches('show', title))
+        else:
+            show = session.read_transaction(find_show_by_name, title)
 
     response = {'show': show}
     return jsonify(response)
@@ -807,8 +1561,7 @@ def find_show_by_name_route(title):
 def find_shows_by_genre(tx, genre):
     locate_title = """
         MATCH (show:Show)-[:BELONGS]-(genre:Genre) WHERE genre.name = $genre
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, ID(show) AS id, genre.name AS genre, count(like) AS score
+        WITH show.title AS title, show.photo AS photo, show.uid AS id, genre.name AS genre, show.likes AS score
         RETURN title, photo, id, genre, score
     """
     locate_title_result = tx.run(locate_title, genre=genre).data()
@@ -816,6 +1569,7 @@ def find_shows_by_genre(tx, genre):
 
 
 @api.route('/shows/find/by_genre/<string:genre>', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def find_shows_by_genre_route(genre):
     """
     http GET http://127.0.0.1:5000/shows/find/by_genre/<string:genre>
@@ -829,182 +1583,100 @@ def find_shows_by_genre_route(genre):
     return jsonify(response)
 
 
-def sort_shows_by_genre(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-        RETURN title, photo, genre, id, score
-        ORDER BY genre
-    """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
-
-
 @api.route('/shows/sort/by_genre', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def sort_shows_by_genre_route():
     """
     http GET http://127.0.0.1:5000/shows/sort/by_genre
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(sort_shows_by_genre)
-
-    response = {'shows': shows}
-    return jsonify(response)
-
-
-def reverse_sort_shows_by_genre(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-        RETURN title, photo, genre, id, score
-        ORDER BY genre DESC
-    """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
+    return sort_response(SHOW_LISTING, 'genre', 'asc')
 
 
 @api.route('/shows/sort/reverse/by_genre', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def reverse_sort_shows_by_genre_route():
     """
     http GET http://127.0.0.1:5000/shows/sort/reverse/by_genre
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(reverse_sort_shows_by_genre)
-
-    response = {'shows': shows}
-    return jsonify(response)
-
-
-def sort_shows_by_title(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-        RETURN title, photo, genre, id, score
-        ORDER BY title
-    """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
+    return sort_response(SHOW_LISTING, 'genre', 'desc')
 
 
 @api.route('/shows/sort/by_name', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def sort_shows_by_title_route():
     """
     http GET http://127.0.0.1:5000/shows/sort/by_name
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(sort_shows_by_title)
-
-    response = {'shows': shows}
-    return jsonify(response)
-
-
-def reverse_sort_shows_by_title(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-        RETURN title, photo, genre, id, score
-        ORDER BY title DESC
-    """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
+    return sort_response(SHOW_LISTING, 'title', 'asc')
 
 
 @api.route('/shows/sort/reverse/by_name', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def reverse_sort_shows_by_title_route():
     """
     http GET http://127.0.0.1:5000/shows/sort/reverse/by_name
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(reverse_sort_shows_by_title)
-
-    response = {'shows': shows}
-    return jsonify(response)
-
-
-def sort_shows_by_score(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-        RETURN title, photo, genre, id, score
-        ORDER BY score DESC
-    """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
+    return sort_response(SHOW_LISTING, 'title', 'desc')
 
 
 @api.route('/shows/sort/by_score', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def sort_shows_by_score_route():
     """
     http GET http://127.0.0.1:5000/shows/sort/by_score
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(sort_shows_by_score)
-
-    response = {'shows': shows}
-    return jsonify(response)
-
-
-def reverse_sort_shows_by_score(tx):
-    locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        OPTIONAL MATCH (show)-[like:LIKES]-(:User)
-        WITH show.title AS title, show.photo AS photo, genre.name AS genre, ID(show) AS id, count(like) AS score
-        RETURN title, photo, genre, id, score
-        ORDER BY score
-    """
-    locate_title_result = tx.run(locate_title).data()
-    return locate_title_result
+    return sort_response(SHOW_LISTING, 'score', 'desc')
 
 
 @api.route('/shows/sort/reverse/by_score', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'LIKES')
 def reverse_sort_shows_by_score_route():
     """
     http GET http://127.0.0.1:5000/shows/sort/reverse/by_score
     :return: {}
     """
-    with driver.session() as session:
-        shows = session.read_transaction(reverse_sort_shows_by_score)
+    return sort_response(SHOW_LISTING, 'score', 'asc')
 
-    response = {'shows': shows}
-    return jsonify(response)
 
-
-def get_show_info(tx, the_id):
+def get_show_info(tx, the_id, limit, after=None):
+    """
+    Every section is read by its own subquery returning one row, so the work grows with the size of each section
+    instead of their product. Reviews are paged newest first.
+    """
     locate_title = """
-        MATCH (show:Show)-[:BELONGS]-(genre:Genre)
-        WHERE ID(show) = $the_id
-        OPTIONAL MATCH (show)-[:DIRECTED]-(director:Person)
-        OPTIONAL MATCH (show)-[played:PLAYED]-(actor:Person)
-        OPTIONAL MATCH (show)-[:LIKES]-(user:User)
-        OPTIONAL MATCH (show)-[:ABOUT]-(review:Review)
-        OPTIONAL MATCH (review)-[:WROTE]-(author:User)
-        WITH show,
-            genre,
-            ID(show) AS id,
-            collect(distinct director) AS directors,
-            collect(distinct played.role) AS roles,
-            collect(distinct actor) AS cast,
-            count(distinct user) AS score,
-            collect(distinct review) AS reviews,
-            collect(distinct ID(review)) AS review_ids,
-            collect(distinct author) AS authors
-        RETURN show, genre, id, directors, roles, cast, score, reviews, review_ids, authors
+        MATCH (show:Show {uid: $the_id})-[:BELONGS]-(genre:Genre)
+        CALL {
+            WITH show
+            OPTIONAL MATCH (show)-[:DIRECTED]-(director:Person)
+            RETURN collect(director {.name, .surname}) AS directors
+        }
+        CALL {
+            WITH show
+            OPTIONAL MATCH (show)-[played:PLAYED]-(actor:Person)
+            RETURN collect(actor {.name, .surname, as: played.role}) AS cast
+        }
+        CALL {
+            WITH show
+            MATCH (show)-[:ABOUT]-(review:Review)-[:WROTE]-(author:User)
+            WITH review, author, coalesce(review.created, 0) AS key, review.uid AS id
+            WHERE $after IS NULL OR key < $after[0] OR (key = $after[0] AND id > $after[1])
+            WITH review, author, key, id
+            ORDER BY key DESC, id
+            LIMIT $limit
+            RETURN collect({author: author.nick, body: review.body, id: id, created: key}) AS reviews
+        }
+        RETURN show, genre, directors, cast, size([(show)-[:ABOUT]-(:Review) | 1]) AS review_count, reviews
     """
-    locate_title_result = tx.run(locate_title, the_id=the_id).data()
+    locate_title_result = tx.run(locate_title, the_id=the_id, limit=limit, after=after).data()
 
     if locate_title_result:
         show = {
-            'id': locate_title_result[0]['id'],
+            'id': locate_title_result[0]['show']['uid'],
             'title': locate_title_result[0]['show']['title'],
             'genre': locate_title_result[0]['genre']['name'],
             'photo': locate_title_result[0]['show']['photo'],
@@ -1012,39 +1684,32 @@ def get_show_info(tx, the_id):
             'episodes': locate_title_result[0]['show']['episodes'],
             'released': locate_title_result[0]['show']['released'],
             'ended': locate_title_result[0]['show']['ended'],
-            'director': [{
-                'name': locate_title_result[0]['directors'][i]['name'],
-                'surname': locate_title_result[0]['directors'][i]['surname']
-            } for i in range(0, len(locate_title_result[0]['directors']))],
-            'cast': [{
-                'name': locate_title_result[0]['cast'][i]['name'],
-                'surname': locate_title_result[0]['cast'][i]['surname'],
-                'as': locate_title_result[0]['roles'][i]
-            } for i in range(0, len(locate_title_result[0]['cast']))],
-            'score': locate_title_result[0]['score'],
-            'reviews': [{
-                'author': locate_title_result[0]['authors'][i]['nick'],
-                'body': locate_title_result[0]['reviews'][i]['body'],
-                'id': locate_title_result[0]['review_ids'][i]
-            } for i in range(0, len(locate_title_result[0]['reviews']))]
+            'director': locate_title_result[0]['directors'],
+            'cast': locate_title_result[0]['cast'],
+            'score': locate_title_result[0]['show']['likes'],
+            'review_count': locate_title_result[0]['review_count'],
+            'reviews': locate_title_result[0]['reviews']
         }
         return show
 
 
-@api.route('/shows/<int:the_id>', methods=['GET'])
+@api.route('/shows/<string:the_id>', methods=['GET'])
+@cached('Show', 'Genre', 'BELONGS', 'Person', 'PLAYED', 'DIRECTED', 'LIKES', 'Review', 'ABOUT', 'User', 'WROTE')
 def get_show_info_route(the_id):
     """
-    http GET http://127.0.0.1:5000/shows/<int:the_id>
-    :param the_id: int
+    http GET http://127.0.0.1:5000/shows/<string:the_id> limit==50 cursor==<reviews_next>
+    :param the_id: string
     :return: {}
     """
+    limit, after = get_page()
     with driver.session() as session:
-        show = session.read_transaction(get_show_info, the_id)
+        show = session.read_transaction(get_show_info, the_id, limit, after)
 
     if not show:
         response = {'message': 'Show not found!'}
         return jsonify(response)
     else:
+        show['reviews_next'] = next_cursor(show['reviews'], 'created', limit)
         response = {'show': show}
         return jsonify(response)
 
@@ -1052,45 +1717,56 @@ def get_show_info_route(the_id):
 # /admin/shows----------------------------------------------------------------------------------------------------------
 
 
-def add_show(tx, title, genre, photo, trailer, episodes, released, ended):
-    locate_title = "MATCH (show:Show {title: $title}) RETURN show"
-    locate_title_result = tx.run(locate_title, title=title).data()
-
-    locate_genre = "MATCH (genre:Genre {name: $genre}) RETURN genre"
-    locate_genre_result = tx.run(locate_genre, genre=genre).data()
-
-    if not locate_title_result and locate_genre_result:
-        create_show = """
-            MATCH (genre:Genre {name: $genre})
-            CREATE (:Show {
-                title: $title,
-                photo: $photo,
-                trailer: $trailer,
-                episodes: $episodes,
-                released: $released,
-                ended:$ended
-            })-[:BELONGS]->(genre)
-        """
-        tx.run(create_show,
-               title=title,
-               genre=genre,
-               photo=photo,
-               trailer=trailer,
-               episodes=episodes,
-               released=released,
-               ended=ended)
-        return {
-            'title': title,
-            'genre': genre,
-            'photo': photo,
-            'trailer': trailer,
-            'episodes': episodes,
-            'released': released,
-            'ended': ended
+def add_shows(tx, rows):
+    create_shows = """
+        UNWIND $rows AS row
+        MATCH (genre:Genre {name: row.genre})
+        MERGE (show:Show {title: row.title})
+        ON CREATE SET show.uid = row.uid,
+            show.likes = 0,
+            show.photo = row.photo,
+            show.trailer = row.trailer,
+            show.episodes = row.episodes,
+            show.released = row.released,
+            show.ended = row.ended
+        WITH row, show, genre, show.uid = row.uid AS created
+        CALL {
+            WITH show, genre, created
+            WITH show, genre WHERE created
+            CREATE (show)-[:BELONGS {uid: randomUUID()}]->(genre)
         }
+        RETURN row.index AS index,
+            show.uid AS id,
+            created,
+            show.title AS title,
+            show.photo AS photo,
+            genre.name AS genre,
+            show.likes AS score
+    """
+    create_shows_result = tx.run(create_shows, rows=rows).data()
+    return create_shows_result
+
+
+def add_show(tx, title, genre, photo, trailer, episodes, released, ended):
+    rows = [{
+        'index': 0,
+        'uid': new_uid(),
+        'title': title,
+        'genre': genre,
+        'photo': photo,
+        'trailer': trailer,
+        'episodes': episodes,
+        'released': released,
+        'ended': ended
+    }]
+    create_show_result = add_shows(tx, rows)
+
+    if create_show_result:
+        return create_show_result[0]
 
 
 @api.route('/admin/shows', methods=['POST'])
+@invalidates('Show', 'BELONGS')
 def add_show_route():
     """
     http POST http://127.0.0.1:5000/admin/shows title="title" genre="genre" photo="photoURL" trailer="trailerURL"
@@ -1108,54 +1784,74 @@ def add_show_route():
     with driver.session() as session:
         show = session.write_transaction(add_show, title, genre, photo, trailer, episodes, released, ended)
 
-    if not show:
+    if not show or not show['created']:
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        board_show(show)
+        lookup_show(show)
+        response = {'status': 'success', 'id': show['id']}
         return jsonify(response)
 
 
-def put_show_info(tx, the_id, title, genre, photo, trailer, episodes, released, ended):
-    locate_title = "MATCH (show:Show) WHERE ID(show) = $the_id RETURN show"
-    locate_title_result = tx.run(locate_title, the_id=the_id).data()
+@api.route('/admin/bulk/shows', methods=['POST'])
+@invalidates('Show', 'BELONGS')
+def add_shows_route():
+    """
+    http POST http://127.0.0.1:5000/admin/bulk/shows < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with title, genre, photo, trailer,
+    episodes, released, ended.
+    :return: {}
+    """
+    fields = ['title', 'genre', 'photo', 'trailer', 'episodes', 'released', 'ended']
+    return bulk_import(add_shows, fields, exists_message='Invalid arguments!', on_write=(board_show, lookup_show))
 
-    locate_genre = "MATCH (genre:Genre {name: $genre}) RETURN genre"
-    locate_genre_result = tx.run(locate_genre, genre=genre).data()
 
-    if locate_title_result and locate_genre_result:
-        update_show = """
-            MATCH (show:Show)-[old:BELONGS]-(:Genre) WHERE ID(show) = $the_id
-            MATCH (genre:Genre {name: $genre})
+def put_show_info(tx, the_id, title, genre, photo, trailer, episodes, released, ended):
+    update_show = """
+        MATCH (show:Show {uid: $the_id})
+        MATCH (genre:Genre {name: $genre})
+        CALL {
+            WITH show
+            MATCH (show)-[old:BELONGS]-(:Genre)
             DELETE old
-            CREATE (show)-[:BELONGS]->(genre)
-            SET show.title = $title,
-                show.photo = $photo,
-                show.trailer = $trailer,
-                show.episodes = $episodes,
-                show.released = $released,
-                show.ended = $ended
-        """
-        tx.run(
-            update_show,
-            the_id=the_id,
-            title=title,
-            genre=genre,
-            photo=photo,
-            trailer=trailer,
-            episodes=episodes,
-            released=released,
-            ended=ended
-        )
-        return {'the_id': the_id}
-
-
-@api.route('/admin/shows/<int:the_id>', methods=['PUT'])
+        }
+        CREATE (show)-[:BELONGS {uid: randomUUID()}]->(genre)
+        SET show.title = $title,
+            show.photo = $photo,
+            show.trailer = $trailer,
+            show.episodes = $episodes,
+            show.released = $released,
+            show.ended = $ended
+        RETURN show.uid AS id,
+            show.title AS title,
+            show.photo AS photo,
+            genre.name AS genre,
+            show.likes AS score
+    """
+    update_show_result = tx.run(
+        update_show,
+        the_id=the_id,
+        title=title,
+        genre=genre,
+        photo=photo,
+        trailer=trailer,
+        episodes=episodes,
+        released=released,
+        ended=ended
+    ).data()
+
+    if update_show_result:
+        return update_show_result[0]
+
+
+@api.route('/admin/shows/<string:the_id>', methods=['PUT'])
+@invalidates('Show', 'BELONGS')
 def put_show_info_route(the_id):
     """
-    http PUT http://127.0.0.1:5000/admin/shows/<int:the_id> title="title" genre="genre" photo="photoURL"
+    http PUT http://127.0.0.1:5000/admin/shows/<string:the_id> title="title" genre="genre" photo="photoURL"
     trailer="trailerURL" episodes=00 released="01/12/2000" ended="01/12/2001"
-    :param the_id: int
+    :param the_id: string
     :return: {}
     """
     title = request.json['title']
@@ -1166,32 +1862,42 @@ def put_show_info_route(the_id):
     released = request.json['released']
     ended = request.json['ended']
 
-    with driver.session() as session:
-        show = session.write_transaction(put_show_info, the_id, title, genre, photo, trailer, episodes, released, ended)
+    try:
+        with driver.session() as session:
+            show = session.write_transaction(
+                put_show_info, the_id, title, genre, photo, trailer, episodes, released, ended
+            )
+    except ConstraintError:
+        show = None
 
     if not show:
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
+        board_show(show)
+        lookup_show(show)
         response = {'status': 'success'}
         return jsonify(response)
 
 
 def delete_show(tx, the_id):
-    locate_title = "MATCH (show:Show) WHERE ID(show) = $the_id RETURN show"
-    locate_title_result = tx.run(locate_title, the_id=the_id).data()
+    remove_show = """
+        MATCH (show:Show {uid: $the_id})
+        DETACH DELETE show
+        RETURN $the_id AS id
+    """
+    remove_show_result = tx.run(remove_show, the_id=the_id).data()
 
-    if locate_title_result:
-        remove_show = "MATCH (show:Show) WHERE ID(show) = $the_id DETACH DELETE show"
-        tx.run(remove_show, the_id=the_id)
-        return {'id': the_id}
+    if remove_show_result:
+        return remove_show_result[0]
 
 
-@api.route('/admin/shows/<int:the_id>', methods=['DELETE'])
+@api.route('/admin/shows/<string:the_id>', methods=['DELETE'])
+@invalidates('Show', 'BELONGS', 'SEEN', 'LIKES', 'WANTS_TO_WATCH', 'PLAYED', 'DIRECTED', 'ABOUT')
 def delete_show_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/admin/shows/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/admin/shows/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -1200,6 +1906,12 @@ def delete_show_route(the_id):
         response = {'message': 'Show not found!'}
         return jsonify(response)
     else:
+        show_board.discard(the_id)
+        lookup.discard('show', the_id)
+        model = load_recommender()
+        if model:
+            model.remove_show(the_id)
+        similarity.remove_show(the_id)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -1207,214 +1919,133 @@ def delete_show_route(the_id):
 # /users----------------------------------------------------------------------------------------------------------------
 
 
-def get_users(tx):
-    locate_user = """
-        MATCH (user:User)
-        WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo 
-        RETURN id, nick, e_mail, photo
-    """
-    locate_user_result = tx.run(locate_user).data()
-    return locate_user_result
+USER_LISTING = {
+    'name': 'users',
+    'match': 'MATCH (user:User)',
+    'node': 'user',
+    'carry': 'user',
+    'keys': {
+        'id': ('user.uid', 'id', "''"),
+        'name': ('user.nick', 'nick', "''"),
+        'activity': ('user.activity', 'activity', '0'),
+    },
+    'return': 'RETURN id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo, user.activity AS activity',
+}
 
 
 @api.route('/users', methods=['GET'])
+@cached('User', 'WROTE', 'COMMENTS')
 def get_users_route():
     """
-    http GET http://127.0.0.1:5000/users
+    http GET http://127.0.0.1:5000/users sort==activity order==desc limit==10
     :return: {}
     """
-    with driver.session() as session:
-        users = session.read_transaction(get_users)
-
-    response = {'users': users}
-    return jsonify(response)
+    return sort_response(USER_LISTING)
 
 
-def get_users_csv(tx):
-    locate_users = """
-        WITH "MATCH (user:User)
-            WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo 
-            RETURN id, nick, e_mail, photo" AS query
-        CALL apoc.export.csv.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
-    """
-    locate_users_result = tx.run(locate_users).data()
-    return locate_users_result[0]['data']
+USERS_EXPORT = """
+    MATCH (user:User)
+    WITH user.uid AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo
+    RETURN id, nick, e_mail, photo
+"""
 
 
 @api.route('/admin/get/csv/users', methods=['GET'])
 def get_users_csv_route():
     """
     http GET http://127.0.0.1:5000/admin/get/csv/users
-    :return: StringIO
-    """
-    with driver.session() as session:
-        string = session.read_transaction(get_users_csv)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
-
-
-def get_users_json(tx):
-    locate_users = """
-        WITH "MATCH (user:User)
-            WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo 
-            RETURN id, nick, e_mail, photo" AS query
-        CALL apoc.export.json.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
+    :return: Response
     """
-    locate_users_result = tx.run(locate_users).data()
-    return locate_users_result[0]['data']
+    return export_response('csv', USERS_EXPORT)
 
 
 @api.route('/admin/get/json/users', methods=['GET'])
 def get_users_json_route():
     """
     http GET http://127.0.0.1:5000/admin/get/json/users
-    :return: StringIO
+    :return: Response
     """
-    with driver.session() as session:
-        string = session.read_transaction(get_users_json)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
+    return export_response('json', USERS_EXPORT)
 
 
 def find_user_by_name(tx, nick):
     locate_user = """
         MATCH (user:User {nick: $nick})
-        WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo 
+        WITH user.uid AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo 
         RETURN id, nick, e_mail, photo
     """
     locate_user_result = tx.run(locate_user, nick=nick).data()
     return locate_user_result
 
 
+def find_users_by_matches(tx, matches):
+    locate_user = """
+        UNWIND $matches AS match
+        MATCH (user:User {uid: match.id})
+        WITH match, user.uid AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo
+        RETURN id, nick, e_mail, photo, match.distance AS distance
+        ORDER BY match.position
+    """
+    locate_user_result = tx.run(locate_user, matches=matches).data()
+    return locate_user_result
+
+
 @api.route('/users/find/by_name/<string:nick>', methods=['GET'])
+@cached('User', 'WROTE', 'COMMENTS')
 def find_user_by_name_route(nick):
     """
-    http GET http://127.0.0.1:5000/users/find/by_name/<string:nick>
+    http GET http://127.0.0.1:5000/users/find/by_name/<string:nick> fuzzy==true limit==10
     :param nick: string
     :return: {}
     """
     with driver.session() as session:
-        user = session.read_transaction(find_user_by_name, nick)
+        if is_fuzzy():
+            user = session.read_transaction(find_users_by_matches, fuzzy_matches('user', nick))
+        else:
+            user = session.read_transaction(find_user_by_name, nick)
 
     response = {'user': user}
     return jsonify(response)
 
 
-def sort_users_by_name(tx):
-    locate_user = """
-        MATCH (user:User)
-        WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo 
-        RETURN id, nick, e_mail, photo
-        ORDER BY nick
-    """
-    locate_user_result = tx.run(locate_user).data()
-    return locate_user_result
-
-
 @api.route('/users/sort/by_name', methods=['GET'])
+@cached('User', 'WROTE', 'COMMENTS')
 def sort_users_by_name_route():
     """
     http GET http://127.0.0.1:5000/users/sort/by_name
     :return: {}
     """
-    with driver.session() as session:
-        users = session.read_transaction(sort_users_by_name)
-
-    response = {'users': users}
-    return jsonify(response)
-
-
-def reverse_sort_users_by_name(tx):
-    locate_user = """
-        MATCH (user:User)
-        WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo 
-        RETURN id, nick, e_mail, photo
-        ORDER BY nick DESC
-    """
-    locate_user_result = tx.run(locate_user).data()
-    return locate_user_result
+    return sort_response(USER_LISTING, 'name', 'asc')
 
 
 @api.route('/users/sort/reverse/by_name', methods=['GET'])
+@cached('User', 'WROTE', 'COMMENTS')
 def reverse_sort_users_by_name_route():
     """
     http GET http://127.0.0.1:5000/users/sort/reverse/by_name
     :return: {}
     """
-    with driver.session() as session:
-        users = session.read_transaction(reverse_sort_users_by_name)
-
-    response = {'users': users}
-    return jsonify(response)
-
-
-def sort_users_by_activity(tx):
-    locate_user = """
-        MATCH (user:User)
-        OPTIONAL MATCH (user)-[conn:WROTE|COMMENTS]-(:Review)
-        WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo, count(conn) AS activity
-        RETURN id, nick, e_mail, photo
-        ORDER BY activity DESC
-    """
-    locate_user_result = tx.run(locate_user).data()
-    return locate_user_result
+    return sort_response(USER_LISTING, 'name', 'desc')
 
 
 @api.route('/users/sort/by_activity', methods=['GET'])
+@cached('User', 'WROTE', 'COMMENTS')
 def sort_users_by_activity_route():
     """
     http GET http://127.0.0.1:5000/users/sort/by_activity
     :return: {}
     """
-    with driver.session() as session:
-        users = session.read_transaction(sort_users_by_activity)
-
-    response = {'users': users}
-    return jsonify(response)
-
-
-def reverse_sort_users_by_activity(tx):
-    locate_user = """
-        MATCH (user:User)
-        OPTIONAL MATCH (user)-[conn:WROTE|COMMENTS]-(:Review)
-        WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo, count(conn) AS activity
-        RETURN id, nick, e_mail, photo
-        ORDER BY activity
-    """
-    locate_user_result = tx.run(locate_user).data()
-    return locate_user_result
+    return sort_response(USER_LISTING, 'activity', 'desc')
 
 
 @api.route('/users/sort/reverse/by_activity', methods=['GET'])
+@cached('User', 'WROTE', 'COMMENTS')
 def reverse_sort_users_by_activity_route():
     """
     http GET http://127.0.0.1:5000/users/sort/reverse/by_activity
     :return: {}
     """
-    with driver.session() as session:
-        users = session.read_transaction(reverse_sort_users_by_activity)
-
-    response = {'users': users}
-    return jsonify(response)
-
-
-def get_top_users(tx):
-    locate_user = """
-        MATCH (user:User)
-        OPTIONAL MATCH (user)-[conn:WROTE|COMMENTS]-(:Review)
-        WITH ID(user) AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo, count(conn) AS activity
-        RETURN id, nick, e_mail, photo
-        ORDER BY activity DESC
-        LIMIT 3
-    """
-    locate_user_result = tx.run(locate_user).data()
-    return locate_user_result
+    return sort_response(USER_LISTING, 'activity', 'asc')
 
 
 @api.route('/users/top', methods=['GET'])
@@ -1423,47 +2054,127 @@ def get_top_users_route():
     http GET http://127.0.0.1:5000/users/top
     :return: {}
     """
-    with driver.session() as session:
-        users = session.read_transaction(get_top_users)
+    ensure_seeded(seed_leaderboards, seed_lock, show_board, user_board)
 
-    response = {'users': users}
+    response = {'users': user_board.top(3)}
     return jsonify(response)
 
 
-def get_user_info(tx, the_id):
-    locate_user = """
-        MATCH (user:User)
-        WHERE ID(user) = $the_id
-        OPTIONAL MATCH (user)-[:SEEN]-(seen:Show)
-        OPTIONAL MATCH (user)-[:LIKES]-(liked:Show)
-        OPTIONAL MATCH (user)-[:WANTS_TO_WATCH]-(to_watch:Show)
-        OPTIONAL MATCH (user)-[:WROTE]-(written:Review)-[:ABOUT]-(review_about:Show)
-        OPTIONAL MATCH (user)-[comment:COMMENTS]-(commented:Review)-[:ABOUT]-(comment_about:Show)
-        OPTIONAL MATCH (commented)-[:WROTE]-(author:User)
-        WITH user,
-            ID(user) AS id,
-            collect(distinct seen.title) AS seen_shows,
-            collect(distinct liked.title) AS favourite,
-            collect(distinct to_watch.title) AS watchlist,
-            collect(distinct written.body) AS written_reviews,
-            collect(review_about.title) AS reviews_titles,
-            collect(distinct comment.comment) AS comments,
-            collect(comment_about.title) AS comments_titles,
-            collect(distinct ID(comment)) AS comments_ids,
-            collect(author.nick) AS authors
-        RETURN user,
-            id,
-            seen_shows,
-            favourite,
-            watchlist,
-            written_reviews,
-            reviews_titles,
-            comments,
-            comments_titles,
-            comments_ids,
-            authors
-    """
-    locate_user_result = tx.run(locate_user, the_id=the_id).data()
+@api.route('/users/<string:the_id>/similar', methods=['GET'])
+def get_similar_users_route(the_id):
+    """
+    http GET http://127.0.0.1:5000/users/<string:the_id>/similar limit==10
+    :param the_id: string
+    :return: {}
+    """
+    limit = get_limit(DEFAULT_RECOMMENDATIONS)
+    ensure_seeded(seed_similarity, similarity_lock, similarity)
+    ensure_seeded(seed_leaderboards, seed_lock, show_board, user_board)
+
+    users = []
+    for user_id, score in similarity.similar(the_id, limit):
+        user = user_board.get(user_id)
+        if user:
+            users.append({'id': user_id, 'nick': user['nick'], 'photo': user['photo'], 'similarity': score})
+
+    response = {'similar': users}
+    return jsonify(response)
+
+
+USER_SECTIONS = {
+    'seen': {
+        'field': 'seen_shows',
+        'match': 'MATCH (user)-[:SEEN]-(show:Show)',
+        'carry': 'show',
+        'key': ('show.title', 'title', "''"),
+        'id': 'show.uid',
+        'descending': False,
+        'item': '{title: show.title, id: id}',
+    },
+    'favourites': {
+        'field': 'favourite',
+        'match': 'MATCH (user)-[:LIKES]-(show:Show)',
+        'carry': 'show',
+        'key': ('show.title', 'title', "''"),
+        'id': 'show.uid',
+        'descending': False,
+        'item': '{title: show.title, id: id}',
+    },
+    'watchlist': {
+        'field': 'watchlist',
+        'match': 'MATCH (user)-[:WANTS_TO_WATCH]-(show:Show)',
+        'carry': 'show',
+        'key': ('show.title', 'title', "''"),
+        'id': 'show.uid',
+        'descending': False,
+        'item': '{title: show.title, id: id}',
+    },
+    'reviews': {
+        'field': 'reviews',
+        'match': 'MATCH (user)-[:WROTE]-(review:Review)-[:ABOUT]-(show:Show)',
+        'carry': 'review, show',
+        'key': ('review.created', 'created', '0'),
+        'id': 'review.uid',
+        'descending': True,
+        'item': '{review: review.body, title: show.title, id: id, created: key}',
+    },
+    'comments': {
+        'field': 'comments',
+        'match': 'MATCH (user)-[comment:COMMENTS]-(review:Review)-[:ABOUT]-(show:Show) '
+                 'MATCH (review)-[:WROTE]-(author:User)',
+        'carry': 'comment, review, show, author',
+        'key': ('comment.uid', 'id', "''"),
+        'id': 'comment.uid',
+        'descending': False,
+        'item': '{review: {author: author.nick, title: show.title, id: review.uid}, comment: comment.comment, id: id}',
+    },
+}
+USER_COUNTS = """
+    size([(user)-[:SEEN]-(:Show) | 1]) AS seen_count,
+    size([(user)-[:LIKES]-(:Show) | 1]) AS favourites_count,
+    size([(user)-[:WANTS_TO_WATCH]-(:Show) | 1]) AS watchlist_count,
+    size([(user)-[:WROTE]-(:Review) | 1]) AS reviews_count,
+    size([(user)-[:COMMENTS]-(:Review) | 1]) AS comments_count
+"""
+
+
+def user_section_query(section):
+    """
+    Builds a subquery collecting one page of a profile section of user into a single row named after the section,
+    with the same keyset predicate, ORDER BY and LIMIT as the listings.
+    :param section: key of USER_SECTIONS
+    :return: string
+    """
+    spec = USER_SECTIONS[section]
+    expression, column, default = spec['key']
+    direction = 'DESC' if spec['descending'] else 'ASC'
+    comparison = '<' if spec['descending'] else '>'
+    return f"""
+        CALL {{
+            WITH user
+            {spec['match']}
+            WITH {spec['carry']}, coalesce({expression}, {default}) AS key, {spec['id']} AS id,
+                coalesce($after[0], {default}) AS after
+            WHERE $after IS NULL OR key {comparison} after OR (key = after AND id > $after[1])
+            WITH {spec['carry']}, key, id
+            ORDER BY key {direction}, id
+            LIMIT $limit
+            RETURN collect({spec['item']}) AS {section}
+        }}
+    """
+
+
+def get_user_info(tx, the_id, limit):
+    """
+    Reads the summary counts and the first page of every section, each section in its own subquery returning one
+    row, so the work grows with the page size instead of the product of the section sizes.
+    """
+    locate_user = f"""
+        MATCH (user:User {{uid: $the_id}})
+        {''.join(user_section_query(section) for section in USER_SECTIONS)}
+        RETURN user, {', '.join(USER_SECTIONS)}, {USER_COUNTS}
+    """
+    locate_user_result = tx.run(locate_user, the_id=the_id, limit=limit, after=None).data()
 
     if locate_user_result:
         user = {
@@ -1471,35 +2182,39 @@ def get_user_info(tx, the_id):
             'e_mail': locate_user_result[0]['user']['e_mail'],
             'registered': locate_user_result[0]['user']['registered'],
             'photo': locate_user_result[0]['user']['photo'],
-            'id': locate_user_result[0]['id'],
-            'seen_shows': locate_user_result[0]['seen_shows'],
-            'favourite': locate_user_result[0]['favourite'],
-            'watchlist': locate_user_result[0]['watchlist'],
-            'reviews': [{
-                'review': locate_user_result[0]['written_reviews'][i],
-                'title': locate_user_result[0]['reviews_titles'][i]
-            } for i in range(0, len(locate_user_result[0]['written_reviews']))],
-            'comments': [{
-                'review': {
-                    'author': locate_user_result[0]['authors'][i],
-                    'title': locate_user_result[0]['comments_titles'][i]
-                },
-                'comment': locate_user_result[0]['comments'][i],
-                'id': locate_user_result[0]['comments_ids'][i]
-            } for i in range(0, len(locate_user_result[0]['comments']))]
+            'id': locate_user_result[0]['user']['uid'],
+            'counts': {section: locate_user_result[0][f'{section}_count'] for section in USER_SECTIONS},
+            'next': {}
         }
+        for section, spec in USER_SECTIONS.items():
+            user[spec['field']] = locate_user_result[0][section]
+            user['next'][section] = next_cursor(locate_user_result[0][section], spec['key'][1], limit)
         return user
 
 
-@api.route('/users/<int:the_id>', methods=['GET'])
+def get_user_section(tx, the_id, section, limit, after=None):
+    locate_section = f"""
+        MATCH (user:User {{uid: $the_id}})
+        {user_section_query(section)}
+        RETURN {section}
+    """
+    locate_section_result = tx.run(locate_section, the_id=the_id, limit=limit, after=after).data()
+
+    if locate_section_result:
+        return locate_section_result[0][section]
+
+
+@api.route('/users/<string:the_id>', methods=['GET'])
+@cached('User', 'Show', 'SEEN', 'LIKES', 'WANTS_TO_WATCH', 'Review', 'ABOUT', 'WROTE', 'COMMENTS')
 def get_user_info_route(the_id):
     """
-    http GET http://127.0.0.1:5000/users/<int:the_id>
-    :param the_id: int
+    http GET http://127.0.0.1:5000/users/<string:the_id> limit==50
+    :param the_id: string
     :return: {}
     """
+    limit = get_limit()
     with driver.session() as session:
-        user = session.read_transaction(get_user_info, the_id)
+        user = session.read_transaction(get_user_info, the_id, limit)
 
     if not user:
         response = {'message': 'User not found!'}
@@ -1509,22 +2224,67 @@ def get_user_info_route(the_id):
         return jsonify(response)
 
 
+@api.route('/users/<string:the_id>/<any(seen, favourites, watchlist, reviews, comments):section>', methods=['GET'])
+@cached('User', 'Show', 'SEEN', 'LIKES', 'WANTS_TO_WATCH', 'Review', 'ABOUT', 'WROTE', 'COMMENTS')
+def get_user_section_route(the_id, section):
+    """
+    http GET http://127.0.0.1:5000/users/<string:the_id>/reviews limit==50 cursor==<next>
+    :param the_id: string
+    :param section: 'seen' | 'favourites' | 'watchlist' | 'reviews' | 'comments'
+    :return: {}
+    """
+    limit, after = get_page()
+    with driver.session() as session:
+        rows = session.read_transaction(get_user_section, the_id, section, limit, after)
+
+    if rows is None:
+        response = {'message': 'User not found!'}
+        return jsonify(response)
+    else:
+        response = {section: rows, 'next': next_cursor(rows, USER_SECTIONS[section]['key'][1], limit)}
+        return jsonify(response)
+
+
 # /admin/users----------------------------------------------------------------------------------------------------------
 
 
-def add_user(tx, nick, e_mail, password, registered, photo):
-    locate_user = "MATCH (user:User {nick: $nick}) RETURN user"
-    locate_user_result = tx.run(locate_user, nick=nick).data()
+def add_users(tx, rows):
+    create_users = """
+        UNWIND $rows AS row
+        MERGE (user:User {nick: row.nick})
+        ON CREATE SET user.uid = row.uid,
+            user.activity = 0,
+            user.e_mail = row.e_mail,
+            user.password = row.password,
+            user.registered = row.registered,
+            user.photo = row.photo
+        RETURN row.index AS index,
+            user.uid AS id,
+            user.uid = row.uid AS created,
+            user.nick AS nick,
+            user.e_mail AS e_mail,
+            user.photo AS photo,
+            user.activity AS activity
+    """
+    create_users_result = tx.run(create_users, rows=rows).data()
+    return create_users_result
 
-    if not locate_user_result:
-        create_user = """
-            CREATE (:User {nick: $nick, e_mail: $e_mail, password: $password, registered: $registered, photo: $photo})
-        """
-        tx.run(create_user, nick=nick, e_mail=e_mail, password=password, registered=registered, photo=photo)
-        return {'user': nick}
+
+def add_user(tx, nick, e_mail, password, registered, photo):
+    rows = [{
+        'index': 0,
+        'uid': new_uid(),
+        'nick': nick,
+        'e_mail': e_mail,
+        'password': password,
+        'registered': registered,
+        'photo': photo
+    }]
+    return add_users(tx, rows)[0]
 
 
 @api.route('/admin/users', methods=['POST'])
+@invalidates('User')
 def add_user_route():
     """
     http POST http://127.0.0.1:5000/admin/users nick="nick" e_mail="e_mail" password="password" registered="01/12/2000"
@@ -1540,44 +2300,61 @@ def add_user_route():
     with driver.session() as session:
         user = session.write_transaction(add_user, nick, e_mail, password, registered, photo)
 
-    if not user:
+    if not user or not user['created']:
         response = {'message': 'User already exists in database!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        board_user(user)
+        lookup_user(user)
+        response = {'status': 'success', 'id': user['id']}
         return jsonify(response)
 
 
-def put_user_info(tx, the_id, nick, e_mail, password, registered, photo):
-    locate_user = "MATCH (user:User) WHERE ID(user) = $the_id RETURN user"
-    locate_user_result = tx.run(locate_user, the_id=the_id).data()
+@api.route('/admin/bulk/users', methods=['POST'])
+@invalidates('User')
+def add_users_route():
+    """
+    http POST http://127.0.0.1:5000/admin/bulk/users < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with nick, e_mail, password,
+    registered, photo.
+    :return: {}
+    """
+    fields = ['nick', 'e_mail', 'password', 'registered', 'photo']
+    exists_message = 'User already exists in database!'
+    return bulk_import(add_users, fields, exists_message=exists_message, on_write=(board_user, lookup_user))
 
-    if locate_user_result:
-        update_user = """
-            MATCH (user:User) WHERE ID(user) = $the_id
-            SET user.nick = $nick,
-                user.e_mail = $e_mail,
-                user.password = $password,
-                user.registered = $registered,
-                user.photo = $photo
-        """
-        tx.run(update_user,
-               the_id=the_id,
-               nick=nick,
-               e_mail=e_mail,
-               password=password,
-               registered=registered,
-               photo=photo
-               )
-        return {'user': nick, 'e_mail': e_mail, 'registered': registered, 'photo': photo}
-
-
-@api.route('/admin/users/<int:the_id>', methods=['PUT'])
+
+def put_user_info(tx, the_id, nick, e_mail, password, registered, photo):
+    update_user = """
+        MATCH (user:User {uid: $the_id})
+        SET user.nick = $nick,
+            user.e_mail = $e_mail,
+            user.password = $password,
+            user.registered = $registered,
+            user.photo = $photo
+        RETURN user.uid AS id, user.nick AS nick, user.e_mail AS e_mail, user.photo AS photo, user.activity AS activity
+    """
+    update_user_result = tx.run(
+        update_user,
+        the_id=the_id,
+        nick=nick,
+        e_mail=e_mail,
+        password=password,
+        registered=registered,
+        photo=photo
+    ).data()
+
+    if update_user_result:
+        return update_user_result[0]
+
+
+@api.route('/admin/users/<string:the_id>', methods=['PUT'])
+@invalidates('User')
 def put_user_info_route(the_id):
     """
-    http PUT http://127.0.0.1:5000/admin/users/<int:the_id> nick="nick" e_mail="e_mail" password="password"
+    http PUT http://127.0.0.1:5000/admin/users/<string:the_id> nick="nick" e_mail="e_mail" password="password"
     registered="01/12/2000" photo="photoURL"
-    :param the_id: int
+    :param the_id: string
     :return: {}
     """
     nick = request.json['nick']
@@ -1586,32 +2363,57 @@ def put_user_info_route(the_id):
     registered = request.json['registered']
     photo = request.json['photo']
 
-    with driver.session() as session:
-        user = session.write_transaction(put_user_info, the_id, nick, e_mail, password, registered, photo)
+    try:
+        with driver.session() as session:
+            user = session.write_transaction(put_user_info, the_id, nick, e_mail, password, registered, photo)
+    except ConstraintError:
+        response = {'message': 'User already exists in database!'}
+        return jsonify(response)
 
     if not user:
         response = {'message': 'User not found!'}
         return jsonify(response)
     else:
+        board_user(user)
+        lookup_user(user)
         response = {'status': 'success'}
         return jsonify(response)
 
 
 def delete_user(tx, the_id):
-    locate_user = "MATCH (user:User) WHERE ID(user) = $the_id RETURN user"
-    locate_user_result = tx.run(locate_user, the_id=the_id).data()
+    remove_user = """
+        MATCH (user:User {uid: $the_id})
+        CALL {
+            WITH user
+            MATCH (user)-[:LIKES]->(show:Show)
+            SET show.likes = coalesce(show.likes - 1, size([(show)<-[:LIKES]-(:User) | 1]) - 1)
+            RETURN collect({show_id: show.uid, likes: show.likes}) AS shows
+        }
+        CALL {
+            WITH user
+            MATCH (user)-[:LIKES]->(review:Review)
+            SET review.like_count = coalesce(review.like_count - 1, size([(review)<-[:LIKES]-(:User) | 1]) - 1)
+        }
+        CALL {
+            WITH user
+            MATCH (user)-[:COMMENTS]->(review:Review)
+            SET review.comment_count = coalesce(review.comment_count - 1, size([(review)<-[:COMMENTS]-(:User) | 1]) - 1)
+        }
+        DETACH DELETE user
+        RETURN $the_id AS id, shows
+    """
+    remove_user_result = tx.run(remove_user, the_id=the_id).data()
 
-    if locate_user_result:
-        remove_user = "MATCH (user:User) WHERE ID(user) = $the_id DETACH DELETE user"
-        tx.run(remove_user, the_id=the_id)
-        return {'id': the_id}
+    if remove_user_result:
+        return remove_user_result[0]
 
 
-@api.route('/admin/users/<int:the_id>', methods=['DELETE'])
+@api.route('/admin/users/<string:the_id>', methods=['DELETE'])
+@invalidates('User', 'SEEN', 'LIKES', 'WANTS_TO_WATCH', 'WROTE', 'COMMENTS')
 def delete_user_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/admin/users/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/admin/users/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -1621,6 +2423,15 @@ def delete_user_route(the_id):
         response = {'message': 'User not found!'}
         return jsonify(response)
     else:
+        user_board.discard(the_id)
+        lookup.discard('user', the_id)
+        recommendation_cache.invalidate(user_tag(the_id))
+        model = load_recommender()
+        if model:
+            model.remove_user(the_id)
+        similarity.remove_user(the_id)
+        for show in user['shows']:
+            board_likes(show)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -1628,344 +2439,261 @@ def delete_user_route(the_id):
 # /reviews--------------------------------------------------------------------------------------------------------------
 
 
-def get_reviews(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-        RETURN title, id, author, score
-    """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+REVIEW_LISTING = {
+    'name': 'reviews',
+    'match': 'MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)',
+    'node': 'review',
+    'carry': 'show, review, user',
+    'keys': {
+        'id': ('review.uid', 'id', "''"),
+        'score': ('review.like_count', 'score', '0'),
+        'comments': ('review.comment_count', 'comments', '0'),
+        'title': ('show.title', 'title', "''"),
+        'author': ('user.nick', 'author', "''"),
+    },
+    'return': """
+        RETURN show.title AS title,
+            id,
+            user.nick AS author,
+            review.like_count AS score,
+            review.comment_count AS comments
+    """,
+}
 
 
 @api.route('/reviews', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def get_reviews_route():
     """
-    http GET http://127.0.0.1:5000/reviews
+    http GET http://127.0.0.1:5000/reviews sort==comments order==desc limit==10
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(get_reviews)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
+    return sort_response(REVIEW_LISTING)
 
 
-def get_reviews_csv(tx):
-    locate_reviews = """
-        WITH "MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-            OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-            WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-            RETURN title, id, author, score" AS query
-        CALL apoc.export.csv.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
-    """
-    locate_reviews_result = tx.run(locate_reviews).data()
-    return locate_reviews_result[0]['data']
+REVIEWS_EXPORT = """
+    MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
+    RETURN show.title AS title, review.uid AS id, user.nick AS author, review.like_count AS score
+"""
 
 
 @api.route('/admin/get/csv/reviews', methods=['GET'])
 def get_reviews_csv_route():
     """
     http GET http://127.0.0.1:5000/admin/get/csv/reviews
-    :return: StringIO
+    :return: Response
     """
-    with driver.session() as session:
-        string = session.read_transaction(get_reviews_csv)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
-
-
-def get_reviews_json(tx):
-    locate_reviews = """
-        WITH "MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-            OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-            WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-            RETURN title, id, author, score" AS query
-        CALL apoc.export.json.query(query, null, {stream: true})
-        YIELD data
-        RETURN data
-    """
-    locate_reviews_result = tx.run(locate_reviews).data()
-    return locate_reviews_result[0]['data']
+    return export_response('csv', REVIEWS_EXPORT)
 
 
 @api.route('/admin/get/json/reviews', methods=['GET'])
 def get_reviews_json_route():
     """
     http GET http://127.0.0.1:5000/admin/get/json/reviews
-    :return: StringIO
+    :return: Response
     """
-    with driver.session() as session:
-        string = session.read_transaction(get_reviews_json)
-
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
+    return export_response('json', REVIEWS_EXPORT)
 
 
 def recommend_reviews(tx, user_id):
     locate_review = """
-        MATCH (user:User) WHERE ID(user) = $user_id
+        MATCH (user:User {uid: $user_id})
         MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(author:User)
-        WHERE NOT (user)-[:LIKES|COMMENTS|WROTE]-(review)               
-        OPTIONAL MATCH (:User)-[like:LIKES]-(review)
-        WITH show.title AS title, ID(review) AS id, author.nick AS author, count(like) AS score
-        RETURN title, id, author, score
+        WHERE NOT (user)-[:LIKES|COMMENTS|WROTE]-(review)
+        RETURN show.title AS title, review.uid AS id, author.nick AS author, review.like_count AS score
     """
     locate_review_result = tx.run(locate_review, user_id=user_id).data()
     return locate_review_result
 
 
-@api.route('/reviews/recommend/<int:the_id>', methods=['GET'])
-def recommend_reviews_route(the_id):
-    """
-    http GET http://127.0.0.1:5000/reviews/recommend/<int:the_id>
-    :param the_id: int
-    :return: {}
-    """
-    with driver.session() as session:
-        reviews = session.read_transaction(recommend_reviews, the_id)
-
-    response = {'recommended': reviews}
-    return jsonify(response)
-
+def rank_recommended_reviews(tx, user_id, limit, after=None):
+    """
+    Reads the counters of every review the user has not touched as parallel lists in a single row, ranks them with
+    rank_reviews() and fetches the details of the requested page only.
+    """
+    locate_candidates = """
+        MATCH (user:User {uid: $user_id})
+        MATCH (show:Show)<-[:ABOUT]-(review:Review)<-[:WROTE]-(:User)
+        WHERE NOT (user)-[:LIKES|COMMENTS|WROTE]-(review)
+        RETURN collect(review.uid) AS ids,
+            collect(coalesce(review.like_count, 0)) AS likes,
+            collect(coalesce(review.comment_count, 0)) AS comments,
+            collect(coalesce(review.created, 0)) AS created,
+            collect(size([(user)-[:SEEN|LIKES]->(show) | 1])) AS affinity
+    """
+    candidates = tx.run(locate_candidates, user_id=user_id).single()
+    if candidates is None:
+        return []
+
+    ranked = rank_reviews(
+        candidates['ids'],
+        candidates['likes'],
+        candidates['comments'],
+        candidates['created'],
+        candidates['affinity'],
+        limit,
+        after,
+        now=time() * 1000,
+        half_life=REVIEW_HALF_LIFE * 1000,
+        comment_weight=REVIEW_COMMENT_WEIGHT,
+        affinity_weight=AFFINITY_WEIGHT
+    )
+    if not ranked:
+        return []
 
-def sort_reviews_by_score(tx):
     locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-        RETURN title, id, author, score
-        ORDER BY score DESC
-    """
-    locate_review_result = tx.run(locate_review).data()
+        UNWIND $page AS row
+        MATCH (show:Show)<-[:ABOUT]-(review:Review {uid: row.id})<-[:WROTE]-(author:User)
+        RETURN show.title AS title,
+            review.uid AS id,
+            author.nick AS author,
+            review.like_count AS likes,
+            review.comment_count AS comments,
+            row.key AS key,
+            row.score AS score
+        ORDER BY row.position
+    """
+    page = [
+        {'position': position, 'id': candidates['ids'][index], 'key': key, 'score': score}
+        for position, (index, key, score) in enumerate(ranked)
+    ]
+    locate_review_result = tx.run(locate_review, page=page).data()
     return locate_review_result
 
 
-@api.route('/reviews/sort/by_score', methods=['GET'])
-def sort_reviews_by_score_route():
+@api.route('/reviews/recommend/<string:the_id>', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'popularity', store=recommendation_cache, user='the_id')
+def recommend_reviews_route(the_id):
     """
-    http GET http://127.0.0.1:5000/reviews/sort/by_score
+    http GET http://127.0.0.1:5000/reviews/recommend/<string:the_id> mode==ranked limit==10 cursor==<next>
+    :param the_id: string
     :return: {}
     """
+    mode = request.args.get('mode', 'all')
+    if mode not in ('all', 'ranked'):
+        raise InvalidParameter('Invalid mode!')
+
+    if mode == 'all':
+        with driver.session() as session:
+            reviews = session.read_transaction(recommend_reviews, the_id)
+        response = {'recommended': reviews}
+        return jsonify(response)
+
+    limit = get_limit(DEFAULT_RECOMMENDATIONS)
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
     with driver.session() as session:
-        reviews = session.read_transaction(sort_reviews_by_score)
+        reviews = session.read_transaction(rank_recommended_reviews, the_id, limit, after)
 
-    response = {'reviews': reviews}
+    response = {'recommended': reviews, 'next': next_cursor(reviews, 'key', limit)}
+    for review in reviews:
+        del review['key']
     return jsonify(response)
 
 
-def reverse_sort_reviews_by_score(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-        RETURN title, id, author, score
-        ORDER BY score
+@api.route('/reviews/sort/by_score', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
+def sort_reviews_by_score_route():
     """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+    http GET http://127.0.0.1:5000/reviews/sort/by_score
+    :return: {}
+    """
+    return sort_response(REVIEW_LISTING, 'score', 'desc')
 
 
 @api.route('/reviews/sort/reverse/by_score', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def reverse_sort_reviews_by_score_route():
     """
     http GET http://127.0.0.1:5000/reviews/sort/reverse/by_score
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(reverse_sort_reviews_by_score)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
-
-
-def sort_reviews_by_comments(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        OPTIONAL MATCH (review)-[comment:COMMENTS]-(:User)
-        WITH show.title AS title,
-            ID(review) AS id,
-            user.nick AS author,
-            count(like) AS score,
-            count(comment) AS comments
-        RETURN title, id, author, score                
-        ORDER BY comments DESC
-    """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+    return sort_response(REVIEW_LISTING, 'score', 'asc')
 
 
 @api.route('/reviews/sort/by_comments', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def sort_reviews_by_comments_route():
     """
     http GET http://127.0.0.1:5000/reviews/sort/by_comments
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(sort_reviews_by_comments)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
-
-
-def reverse_sort_reviews_by_comments(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        OPTIONAL MATCH (review)-[comment:COMMENTS]-(:User)
-        WITH show.title AS title,
-            ID(review) AS id,
-            user.nick AS author,
-            count(like) AS score,
-            count(comment) AS comments
-        RETURN title, id, author, score                
-        ORDER BY comments
-    """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+    return sort_response(REVIEW_LISTING, 'comments', 'desc')
 
 
 @api.route('/reviews/sort/reverse/by_comments', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def reverse_sort_reviews_by_comments_route():
     """
     http GET http://127.0.0.1:5000/reviews/sort/reverse/by_comments
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(reverse_sort_reviews_by_comments)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
-
-
-def sort_reviews_by_title(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-        RETURN title, id, author, score
-        ORDER BY title
-    """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+    return sort_response(REVIEW_LISTING, 'comments', 'asc')
 
 
 @api.route('/reviews/sort/by_title', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def sort_reviews_by_title_route():
     """
     http GET http://127.0.0.1:5000/reviews/sort/by_title
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(sort_reviews_by_title)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
-
-
-def reverse_sort_reviews_by_title(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-        RETURN title, id, author, score
-        ORDER BY title DESC
-    """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+    return sort_response(REVIEW_LISTING, 'title', 'asc')
 
 
 @api.route('/reviews/sort/reverse/by_title', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def reverse_sort_reviews_by_title_route():
     """
     http GET http://127.0.0.1:5000/reviews/sort/reverse/by_title
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(reverse_sort_reviews_by_title)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
-
-
-def sort_reviews_by_author(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-        RETURN title, id, author, score
-        ORDER BY author
-    """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+    return sort_response(REVIEW_LISTING, 'title', 'desc')
 
 
 @api.route('/reviews/sort/by_author', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def sort_reviews_by_author_route():
     """
     http GET http://127.0.0.1:5000/reviews/sort/by_author
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(sort_reviews_by_author)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
-
-
-def reverse_sort_reviews_by_author(tx):
-    locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
-        WITH show.title AS title, ID(review) AS id, user.nick AS author, count(like) AS score
-        RETURN title, id, author, score
-        ORDER BY author DESC
-    """
-    locate_review_result = tx.run(locate_review).data()
-    return locate_review_result
+    return sort_response(REVIEW_LISTING, 'author', 'asc')
 
 
 @api.route('/reviews/sort/reverse/by_author', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def reverse_sort_reviews_by_author_route():
     """
     http GET http://127.0.0.1:5000/reviews/sort/reverse/by_author
     :return: {}
     """
-    with driver.session() as session:
-        reviews = session.read_transaction(reverse_sort_reviews_by_author)
-
-    response = {'reviews': reviews}
-    return jsonify(response)
+    return sort_response(REVIEW_LISTING, 'author', 'desc')
 
 
 def get_review_info(tx, the_id):
     locate_review = """
-        MATCH (show:Show)-[:ABOUT]-(review:Review)-[:WROTE]-(user:User)
-        WHERE ID(review) = $the_id
-        OPTIONAL MATCH (review)-[like:LIKES]-(:User)
+        MATCH (show:Show)-[:ABOUT]-(review:Review {uid: $the_id})-[:WROTE]-(user:User)
         WITH show.title AS title,
-            ID(show) AS show_id,
+            show.uid AS show_id,
             review.body AS body,
-            ID(review) AS id,
+            review.uid AS id,
             user.nick AS author,
-            ID(user) AS user_id,
-            count(like) AS score
-        RETURN title, show_id, body, id, author, user_id, score
+            user.uid AS user_id,
+            review.like_count AS score,
+            review.comment_count AS comments
+        RETURN title, show_id, body, id, author, user_id, score, comments
     """
     locate_review_result = tx.run(locate_review, the_id=the_id).data()
     return locate_review_result
 
 
-@api.route('/reviews/<int:the_id>', methods=['GET'])
+@api.route('/reviews/<string:the_id>', methods=['GET'])
+@cached('Review', 'Show', 'ABOUT', 'User', 'WROTE', 'LIKES', 'COMMENTS')
 def get_review_info_route(the_id):
     """
-    http GET http://127.0.0.1:5000/reviews/<int:the_id>
-    :param the_id: int
+    http GET http://127.0.0.1:5000/reviews/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -1976,20 +2704,28 @@ def get_review_info_route(the_id):
 
 
 def add_review(tx, nick, title, body):
-    locate_connection = "MATCH (:User {nick: $nick})-[conn:SEEN]-(:Show {title: $title}) RETURN conn"
-    locate_connection_result = tx.run(locate_connection, nick=nick, title=title).data()
-
-    if locate_connection_result:
-        create_review = """
-            MATCH (user:User {nick: $nick})
-            MATCH (show:Show {title: $title})
-            CREATE (show)<-[:ABOUT]-(:Review {body: $body})<-[:WROTE]-(user)
-        """
-        tx.run(create_review, nick=nick, title=title, body=body)
-        return {'nick': nick, 'title': title}
+    create_review = """
+        MATCH (user:User {nick: $nick})-[:SEEN]-(show:Show {title: $title})
+        WITH DISTINCT user, show
+        CREATE (show)<-[:ABOUT {uid: randomUUID()}]-(review:Review {
+            uid: randomUUID(),
+            body: $body,
+            like_count: 0,
+            comment_count: 0,
+            created: timestamp()
+        })
+        CREATE (review)<-[:WROTE {uid: randomUUID()}]-(user)
+        SET user.activity = coalesce(user.activity + 1, size([(user)-[:WROTE|COMMENTS]->(:Review) | 1]))
+        RETURN review.uid AS id, user.uid AS user_id, user.activity AS activity
+    """
+    create_review_result = tx.run(create_review, nick=nick, title=title, body=body).data()
+
+    if create_review_result:
+        return create_review_result[0]
 
 
 @api.route('/reviews', methods=['POST'])
+@invalidates('Review', 'WROTE', 'ABOUT')
 def add_review_route():
     """
     http POST http://127.0.0.1:5000/reviews user="user" title="title" body="body"
@@ -2006,29 +2742,29 @@ def add_review_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        board_activity(review)
+        response = {'status': 'success', 'id': review['id']}
         return jsonify(response)
 
 
 def put_review_body(tx, the_id, body):
-    locate_review = "MATCH (review:Review) WHERE ID(review) = $the_id RETURN review"
-    locate_review_result = tx.run(locate_review, the_id=the_id).data()
+    update_review = """
+        MATCH (review:Review {uid: $the_id})
+        SET review.body = $body
+        RETURN review.uid AS id
+    """
+    update_review_result = tx.run(update_review, the_id=the_id, body=body).data()
 
-    if locate_review_result:
-        update_review = """
-            MATCH (review:Review)
-            WHERE ID(review) = $the_id
-            SET review.body = $body
-        """
-        tx.run(update_review, the_id=the_id, body=body)
-        return {'id': the_id, 'body': body}
+    if update_review_result:
+        return update_review_result[0]
 
 
-@api.route('/reviews/<int:the_id>', methods=['PUT'])
+@api.route('/reviews/<string:the_id>', methods=['PUT'])
+@invalidates('Review')
 def put_review_body_route(the_id):
     """
-    http PUT http://127.0.0.1:5000/reviews/<int:the_id> body="body"
-    :param the_id: int
+    http PUT http://127.0.0.1:5000/reviews/<string:the_id> body="body"
+    :param the_id: string
     :return: {}
     """
     body = request.json['body']
@@ -2045,20 +2781,29 @@ def put_review_body_route(the_id):
 
 
 def delete_review(tx, the_id):
-    locate_review = "MATCH (review:Review) WHERE ID(review) = $the_id RETURN review"
-    locate_review_result = tx.run(locate_review, the_id=the_id).data()
+    remove_review = """
+        MATCH (review:Review {uid: $the_id})
+        CALL {
+            WITH review
+            MATCH (user:User)-[:WROTE|COMMENTS]->(review)
+            SET user.activity = coalesce(user.activity - 1, size([(user)-[:WROTE|COMMENTS]->(:Review) | 1]) - 1)
+            RETURN collect({user_id: user.uid, activity: user.activity}) AS users
+        }
+        DETACH DELETE review
+        RETURN $the_id AS id, users
+    """
+    remove_review_result = tx.run(remove_review, the_id=the_id).data()
 
-    if locate_review_result:
-        remove_review = "MATCH (review:Review) WHERE ID(review) = $the_id DETACH DELETE review"
-        tx.run(remove_review, the_id=the_id)
-        return {'id': the_id}
+    if remove_review_result:
+        return remove_review_result[0]
 
 
-@api.route('/reviews/<int:the_id>', methods=['DELETE'])
+@api.route('/reviews/<string:the_id>', methods=['DELETE'])
+@invalidates('Review', 'WROTE', 'ABOUT', 'LIKES', 'COMMENTS')
 def delete_review_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/reviews/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/reviews/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -2068,6 +2813,8 @@ def delete_review_route(the_id):
         response = {'message': 'Review not found in database!'}
         return jsonify(response)
     else:
+        for user in review['users']:
+            board_activity(user)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -2075,47 +2822,56 @@ def delete_review_route(the_id):
 # /connection/show/seen-------------------------------------------------------------------------------------------------
 
 
-def get_connections_seen(tx):
-    locate_connection = """
-        MATCH (user:User)-[conn:SEEN]-(show:Show)
-        WITH user.nick AS user, ID(conn) AS id, show.title AS title
-        RETURN user, id, title
-    """
-    locate_connection_result = tx.run(locate_connection).data()
-    return locate_connection_result
+SEEN_LISTING = {
+    'name': 'connections',
+    'match': 'MATCH (user:User)-[conn:SEEN]-(show:Show)',
+    'node': 'conn',
+    'carry': 'user, conn, show',
+    'keys': {
+        'id': ('conn.uid', 'id', "''"),
+    },
+    'return': 'RETURN user.nick AS user, id, show.title AS title',
+}
 
 
 @api.route('/connection/show/seen', methods=['GET'])
+@cached('SEEN', 'User', 'Show')
 def get_connections_seen_route():
     """
     http GET http://127.0.0.1:5000/connection/show/seen
     :return: {}
     """
-    with driver.session() as session:
-        connections = session.read_transaction(get_connections_seen)
+    return sort_response(SEEN_LISTING)
+
 
-    response = {'connections': connections}
-    return response
+def add_connections_seen(tx, rows):
+    create_connections = """
+        UNWIND $rows AS row
+        MATCH (user:User {nick: row.user})
+        MATCH (show:Show {title: row.title})
+        MERGE (user)-[conn:SEEN]->(show)
+        ON CREATE SET conn.uid = row.uid
+        RETURN row.index AS index,
+            conn.uid AS id,
+            conn.uid = row.uid AS created,
+            user.uid AS user_id,
+            show.uid AS show_id,
+            size([(user)-[:SEEN|LIKES]->(show) | 1]) AS weight
+    """
+    create_connections_result = tx.run(create_connections, rows=rows).data()
+    return create_connections_result
 
 
 def add_connection_seen(tx, nick, title):
-    locate_user = "MATCH (user:User {nick: $nick}) RETURN user"
-    locate_user_result = tx.run(locate_user, nick=nick).data()
-
-    locate_title = "MATCH (show:Show {title: $title}) RETURN show"
-    locate_title_result = tx.run(locate_title, title=title).data()
+    rows = [{'index': 0, 'uid': new_uid(), 'user': nick, 'title': title}]
+    create_connection_result = add_connections_seen(tx, rows)
 
-    if locate_user_result and locate_title_result:
-        create_connection = """
-            MATCH (user:User {nick: $nick})
-            MATCH (show:Show {title: $title})
-            CREATE (user)-[:SEEN]->(show)
-        """
-        tx.run(create_connection, nick=nick, title=title)
-        return {'user': nick, 'title': title}
+    if create_connection_result:
+        return create_connection_result[0]
 
 
 @api.route('/connection/show/seen', methods=['POST'])
+@invalidates('SEEN')
 def add_connection_seen_route():
     """
     http POST http://127.0.0.1:5000/connection/show/seen user="user" title="title"
@@ -2131,25 +2887,44 @@ def add_connection_seen_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        train_recommender(connection)
+        index_history(connection)
+        invalidate_recommendations(connection)
+        response = {'status': 'success', 'id': connection['id']}
         return jsonify(response)
 
 
+@api.route('/bulk/connection/show/seen', methods=['POST'])
+@invalidates('SEEN')
+def add_connections_seen_route():
+    """
+    http POST http://127.0.0.1:5000/bulk/connection/show/seen < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with user, title.
+    :return: {}
+    """
+    on_write = (train_recommender, index_history, invalidate_recommendations)
+    return bulk_import(add_connections_seen, ['user', 'title'], on_write=on_write)
+
+
 def delete_connection_seen(tx, the_id):
-    locate_connection = "MATCH (:User)-[conn:SEEN]-(:Show) WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
+    remove_connection = """
+        MATCH (user:User)-[conn:SEEN {uid: $the_id}]->(show:Show)
+        WITH user, conn, show, size([(user)-[:SEEN|LIKES]->(show) | 1]) - 1 AS weight
+        DELETE conn
+        RETURN $the_id AS id, user.uid AS user_id, show.uid AS show_id, weight
+    """
+    remove_connection_result = tx.run(remove_connection, the_id=the_id).data()
 
-    if locate_connection_result:
-        delete_connection = "MATCH (:User)-[conn:SEEN]-(:Show) WHERE ID(conn) = $the_id DELETE conn"
-        tx.run(delete_connection, the_id=the_id)
-        return {'id': the_id}
+    if remove_connection_result:
+        return remove_connection_result[0]
 
 
-@api.route('/connection/show/seen/<int:the_id>', methods=['DELETE'])
+@api.route('/connection/show/seen/<string:the_id>', methods=['DELETE'])
+@invalidates('SEEN')
 def delete_connection_seen_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/connection/show/seen/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/connection/show/seen/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -2159,6 +2934,9 @@ def delete_connection_seen_route(the_id):
         response = {'message': 'Connection not found!'}
         return jsonify(response)
     else:
+        train_recommender(connection)
+        index_history(connection)
+        invalidate_recommendations(connection)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -2166,47 +2944,57 @@ def delete_connection_seen_route(the_id):
 # /connections/show/likes-----------------------------------------------------------------------------------------------
 
 
-def get_connections_likes(tx):
-    locate_connection = """
-        MATCH (user:User)-[conn:LIKES]-(show:Show)
-        WITH user.nick AS user, ID(conn) AS id, show.title AS title
-        RETURN user, id, title
-    """
-    locate_connection_result = tx.run(locate_connection).data()
-    return locate_connection_result
+LIKES_LISTING = {
+    'name': 'connections',
+    'match': 'MATCH (user:User)-[conn:LIKES]-(show:Show)',
+    'node': 'conn',
+    'carry': 'user, conn, show',
+    'keys': {
+        'id': ('conn.uid', 'id', "''"),
+    },
+    'return': 'RETURN user.nick AS user, id, show.title AS title',
+}
 
 
 @api.route('/connection/show/likes', methods=['GET'])
+@cached('LIKES', 'User', 'Show')
 def get_connections_likes_route():
     """
     http GET http://127.0.0.1:5000/connection/show/likes
     :return: {}
     """
-    with driver.session() as session:
-        connections = session.read_transaction(get_connections_likes)
+    return sort_response(LIKES_LISTING)
 
-    response = {'connections': connections}
-    return jsonify(response)
+
+def add_connections_likes(tx, rows):
+    create_connections = """
+        UNWIND $rows AS row
+        MATCH (user:User {nick: row.user})
+        MATCH (show:Show {title: row.title})
+        MERGE (user)-[conn:LIKES]->(show)
+        ON CREATE SET conn.uid = row.uid, show.likes = coalesce(show.likes + 1, size([(show)<-[:LIKES]-(:User) | 1]))
+        RETURN row.index AS index,
+            conn.uid AS id,
+            conn.uid = row.uid AS created,
+            user.uid AS user_id,
+            show.uid AS show_id,
+            show.likes AS likes,
+            size([(user)-[:SEEN|LIKES]->(show) | 1]) AS weight
+    """
+    create_connections_result = tx.run(create_connections, rows=rows).data()
+    return create_connections_result
 
 
 def add_connection_likes(tx, nick, title):
-    locate_user = "MATCH (user:User {nick: $nick}) RETURN user"
-    locate_user_result = tx.run(locate_user, nick=nick).data()
-
-    locate_title = "MATCH (show:Show {title: $title}) RETURN show"
-    locate_title_result = tx.run(locate_title, title=title).data()
+    rows = [{'index': 0, 'uid': new_uid(), 'user': nick, 'title': title}]
+    create_connection_result = add_connections_likes(tx, rows)
 
-    if locate_user_result and locate_title_result:
-        create_connection = """
-            MATCH (user:User {nick: $nick})
-            MATCH (show:Show {title: $title})
-            CREATE (user)-[:LIKES]->(show)
-        """
-        tx.run(create_connection, nick=nick, title=title)
-        return {'user': nick, 'title': title}
+    if create_connection_result:
+        return create_connection_result[0]
 
 
 @api.route('/connection/show/likes', methods=['POST'])
+@invalidates('LIKES')
 def add_connection_likes_route():
     """
     http POST http://127.0.0.1:5000/connection/show/likes user="user" title="title"
@@ -2222,25 +3010,46 @@ def add_connection_likes_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        board_likes(connection)
+        train_recommender(connection)
+        index_history(connection)
+        invalidate_recommendations(connection)
+        response = {'status': 'success', 'id': connection['id']}
         return jsonify(response)
 
 
+@api.route('/bulk/connection/show/likes', methods=['POST'])
+@invalidates('LIKES')
+def add_connections_likes_route():
+    """
+    http POST http://127.0.0.1:5000/bulk/connection/show/likes < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with user, title.
+    :return: {}
+    """
+    on_write = (board_likes, train_recommender, index_history, invalidate_recommendations)
+    return bulk_import(add_connections_likes, ['user', 'title'], on_write=on_write)
+
+
 def delete_connection_likes(tx, the_id):
-    locate_connection = "MATCH (:User)-[conn:LIKES]-(:Show) WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
+    remove_connection = """
+        MATCH (user:User)-[conn:LIKES {uid: $the_id}]->(show:Show)
+        SET show.likes = coalesce(show.likes - 1, size([(show)<-[:LIKES]-(:User) | 1]) - 1)
+        WITH user, conn, show, size([(user)-[:SEEN|LIKES]->(show) | 1]) - 1 AS weight
+        DELETE conn
+        RETURN $the_id AS id, user.uid AS user_id, show.uid AS show_id, show.likes AS likes, weight
+    """
+    remove_connection_result = tx.run(remove_connection, the_id=the_id).data()
 
-    if locate_connection_result:
-        delete_connection = "MATCH (:User)-[conn:LIKES]-(:Show) WHERE ID(conn) = $the_id DELETE conn"
-        tx.run(delete_connection, the_id=the_id)
-        return {'id': the_id}
+    if remove_connection_result:
+        return remove_connection_result[0]
 
 
-@api.route('/connection/show/likes/<int:the_id>', methods=['DELETE'])
+@api.route('/connection/show/likes/<string:the_id>', methods=['DELETE'])
+@invalidates('LIKES')
 def delete_connection_likes_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/connection/show/likes/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/connection/show/likes/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -2250,6 +3059,10 @@ def delete_connection_likes_route(the_id):
         response = {'message': 'Connection not found!'}
         return jsonify(response)
     else:
+        board_likes(connection)
+        train_recommender(connection)
+        index_history(connection)
+        invalidate_recommendations(connection)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -2257,47 +3070,51 @@ def delete_connection_likes_route(the_id):
 # /connection/show/wants_to_watch---------------------------------------------------------------------------------------
 
 
-def get_connections_wants_to_watch(tx):
-    locate_connection = """
-        MATCH (user:User)-[conn:WANTS_TO_WATCH]-(show:Show)
-        WITH user.nick AS user, ID(conn) AS id, show.title AS title
-        RETURN user, id, title
-    """
-    locate_connection_result = tx.run(locate_connection).data()
-    return locate_connection_result
+WANTS_TO_WATCH_LISTING = {
+    'name': 'connections',
+    'match': 'MATCH (user:User)-[conn:WANTS_TO_WATCH]-(show:Show)',
+    'node': 'conn',
+    'carry': 'user, conn, show',
+    'keys': {
+        'id': ('conn.uid', 'id', "''"),
+    },
+    'return': 'RETURN user.nick AS user, id, show.title AS title',
+}
 
 
 @api.route('/connection/show/wants_to_watch', methods=['GET'])
+@cached('WANTS_TO_WATCH', 'User', 'Show')
 def get_connections_wants_to_watch_route():
     """
     http GET http://127.0.0.1:5000/connection/show/wants_to_watch
     :return: {}
     """
-    with driver.session() as session:
-        connections = session.read_transaction(get_connections_wants_to_watch)
+    return sort_response(WANTS_TO_WATCH_LISTING)
 
-    response = {'connections': connections}
-    return jsonify(response)
+
+def add_connections_wants_to_watch(tx, rows):
+    create_connections = """
+        UNWIND $rows AS row
+        MATCH (user:User {nick: row.user})
+        MATCH (show:Show {title: row.title})
+        MERGE (user)-[conn:WANTS_TO_WATCH]->(show)
+        ON CREATE SET conn.uid = row.uid
+        RETURN row.index AS index, conn.uid AS id, conn.uid = row.uid AS created, user.uid AS user_id
+    """
+    create_connections_result = tx.run(create_connections, rows=rows).data()
+    return create_connections_result
 
 
 def add_connection_wants_to_watch(tx, nick, title):
-    locate_user = "MATCH (user:User {nick: $nick}) RETURN user"
-    locate_user_result = tx.run(locate_user, nick=nick).data()
-
-    locate_title = "MATCH (show:Show {title: $title}) RETURN show"
-    locate_title_result = tx.run(locate_title, title=title).data()
+    rows = [{'index': 0, 'uid': new_uid(), 'user': nick, 'title': title}]
+    create_connection_result = add_connections_wants_to_watch(tx, rows)
 
-    if locate_user_result and locate_title_result:
-        create_connection = """
-            MATCH (user:User {nick: $nick})
-            MATCH (show:Show {title: $title})
-            CREATE (user)-[:WANTS_TO_WATCH]->(show)
-        """
-        tx.run(create_connection, nick=nick, title=title)
-        return {'user': nick, 'title': title}
+    if create_connection_result:
+        return create_connection_result[0]
 
 
 @api.route('/connection/show/wants_to_watch', methods=['POST'])
+@invalidates('WANTS_TO_WATCH')
 def add_connection_wants_to_watch_route():
     """
     http POST http://127.0.0.1:5000/connection/show/wants_to_watch user="user" title="title"
@@ -2313,25 +3130,40 @@ def add_connection_wants_to_watch_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        invalidate_recommendations(connection)
+        response = {'status': 'success', 'id': connection['id']}
         return jsonify(response)
 
 
+@api.route('/bulk/connection/show/wants_to_watch', methods=['POST'])
+@invalidates('WANTS_TO_WATCH')
+def add_connections_wants_to_watch_route():
+    """
+    http POST http://127.0.0.1:5000/bulk/connection/show/wants_to_watch < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with user, title.
+    :return: {}
+    """
+    return bulk_import(add_connections_wants_to_watch, ['user', 'title'], on_write=(invalidate_recommendations,))
+
+
 def delete_connection_wants_to_watch(tx, the_id):
-    locate_connection = "MATCH (:User)-[conn:WANTS_TO_WATCH]-(:Show) WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
+    remove_connection = """
+        MATCH (user:User)-[conn:WANTS_TO_WATCH {uid: $the_id}]->(:Show)
+        DELETE conn
+        RETURN $the_id AS id, user.uid AS user_id
+    """
+    remove_connection_result = tx.run(remove_connection, the_id=the_id).data()
 
-    if locate_connection_result:
-        delete_connection = "MATCH (:User)-[conn:WANTS_TO_WATCH]-(:Show) WHERE ID(conn) = $the_id DELETE conn"
-        tx.run(delete_connection, the_id=the_id)
-        return {'id': the_id}
+    if remove_connection_result:
+        return remove_connection_result[0]
 
 
-@api.route('/connection/show/wants_to_watch/<int:the_id>', methods=['DELETE'])
+@api.route('/connection/show/wants_to_watch/<string:the_id>', methods=['DELETE'])
+@invalidates('WANTS_TO_WATCH')
 def delete_connection_wants_to_watch_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/connection/show/wants_to_watch/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/connection/show/wants_to_watch/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -2341,6 +3173,7 @@ def delete_connection_wants_to_watch_route(the_id):
         response = {'message': 'Connection not found!'}
         return jsonify(response)
     else:
+        invalidate_recommendations(connection)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -2348,53 +3181,59 @@ def delete_connection_wants_to_watch_route(the_id):
 # /admin/connection/show/played-----------------------------------------------------------------------------------------
 
 
-def get_connections_played(tx):
-    locate_connection = """
-        MATCH (person:Person)-[conn:PLAYED]-(show:Show)
-        WITH person.name AS name, person.surname AS surname, conn.role AS role, ID(conn) AS id, show.title AS title
-        RETURN name, surname, role, id, title
-    """
-    locate_connection_result = tx.run(locate_connection).data()
-    return locate_connection_result
+PLAYED_LISTING = {
+    'name': 'connections',
+    'match': 'MATCH (person:Person)-[conn:PLAYED]-(show:Show)',
+    'node': 'conn',
+    'carry': 'person, conn, show',
+    'keys': {
+        'id': ('conn.uid', 'id', "''"),
+    },
+    'return': """
+        RETURN person.name AS name, person.surname AS surname, conn.role AS role, id, show.title AS title
+    """,
+}
 
 
 @api.route('/admin/connection/show/played', methods=['GET'])
+@cached('PLAYED', 'Person', 'Show')
 def get_connections_played_route():
     """
     http GET http://127.0.0.1:5000/admin/connection/show/played
     :return: {}
     """
-    with driver.session() as session:
-        connections = session.read_transaction(get_connections_played)
+    return sort_response(PLAYED_LISTING)
 
-    response = {'connections': connections}
-    return jsonify(response)
+
+def add_connections_played(tx, rows):
+    create_connections = """
+        UNWIND $rows AS row
+        MATCH (person:Person {uid: row.person_id})
+        MATCH (show:Show {title: row.title})
+        MERGE (person)-[conn:PLAYED {role: row.role}]->(show)
+        ON CREATE SET conn.uid = row.uid
+        RETURN row.index AS index, conn.uid AS id, conn.uid = row.uid AS created
+    """
+    create_connections_result = tx.run(create_connections, rows=rows).data()
+    return create_connections_result
 
 
 def add_connection_played(tx, person_id, role, title):
-    locate_person = "MATCH (person:Person) WHERE ID(person) = $person_id RETURN person"
-    locate_person_result = tx.run(locate_person, person_id=person_id).data()
-
-    locate_title = "MATCH (show:Show {title: $title}) RETURN show"
-    locate_title_result = tx.run(locate_title, title=title).data()
+    rows = [{'index': 0, 'uid': new_uid(), 'person_id': person_id, 'role': role, 'title': title}]
+    create_connection_result = add_connections_played(tx, rows)
 
-    if locate_person_result and locate_title_result:
-        create_connection = """
-            MATCH (person:Person) WHERE ID(person) = $person_id
-            MATCH (show:Show {title: $title})
-            CREATE (person)-[:PLAYED {role: $role}]->(show)
-        """
-        tx.run(create_connection, person_id=person_id, role=role, title=title)
-        return {'person': person_id, 'role': role, 'show': title}
+    if create_connection_result:
+        return create_connection_result[0]
 
 
 @api.route('/admin/connection/show/played', methods=['POST'])
+@invalidates('PLAYED')
 def add_connection_route():
     """
-    http POST http://127.0.0.1:5000/admin/connection/show/played person_id=11 role="role" title="title"
+    http POST http://127.0.0.1:5000/admin/connection/show/played person_id="person-uid" role="role" title="title"
     :return: {}
     """
-    person_id = int(request.json['person_id'])
+    person_id = request.json['person_id']
     role = request.json['role']
     show_title = request.json['title']
 
@@ -2405,29 +3244,39 @@ def add_connection_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        response = {'status': 'success', 'id': connection['id']}
         return jsonify(response)
 
 
+@api.route('/admin/bulk/connection/show/played', methods=['POST'])
+@invalidates('PLAYED')
+def add_connections_played_route():
+    """
+    http POST http://127.0.0.1:5000/admin/bulk/connection/show/played < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with person_id, role, title.
+    :return: {}
+    """
+    return bulk_import(add_connections_played, ['person_id', 'role', 'title'])
+
+
 def put_connection_played_role(tx, the_id, role):
-    locate_connection = "MATCH (:Person)-[conn:PLAYED]-(:Show) WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
-
-    if locate_connection_result:
-        update_connection_body = """
-            MATCH (:Person)-[conn:PLAYED]-(:Show)
-            WHERE ID(conn) = $the_id
-            SET conn.role = $role
-        """
-        tx.run(update_connection_body, the_id=the_id, role=role)
-        return {'id': the_id, 'role': role}
+    update_connection = """
+        MATCH (:Person)-[conn:PLAYED {uid: $the_id}]->(:Show)
+        SET conn.role = $role
+        RETURN conn.uid AS id
+    """
+    update_connection_result = tx.run(update_connection, the_id=the_id, role=role).data()
 
+    if update_connection_result:
+        return update_connection_result[0]
 
-@api.route('/admin/connection/show/played/<int:the_id>', methods=['PUT'])
+
+@api.route('/admin/connection/show/played/<string:the_id>', methods=['PUT'])
+@invalidates('PLAYED')
 def put_connection_played_role_route(the_id):
     """
-    http PUT http://127.0.0.1:5000/admin/connection/show/played/<int:the_id> role="role"
-    :param the_id: int
+    http PUT http://127.0.0.1:5000/admin/connection/show/played/<string:the_id> role="role"
+    :param the_id: string
     :return: {}
     """
     role = request.json['role']
@@ -2444,20 +3293,23 @@ def put_connection_played_role_route(the_id):
 
 
 def delete_connection_played(tx, the_id):
-    locate_connection = "MATCH (:Show)-[conn:PLAYED]-(:Person) WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
+    remove_connection = """
+        MATCH (:Person)-[conn:PLAYED {uid: $the_id}]->(:Show)
+        DELETE conn
+        RETURN $the_id AS id
+    """
+    remove_connection_result = tx.run(remove_connection, the_id=the_id).data()
 
-    if locate_connection_result:
-        delete_connection = "MATCH (:Show)-[conn:PLAYED]-(:Person) WHERE ID(conn) = $the_id DELETE conn"
-        tx.run(delete_connection, the_id=the_id)
-        return {'id': the_id}
+    if remove_connection_result:
+        return remove_connection_result[0]
 
 
-@api.route('/admin/connection/show/played/<int:the_id>', methods=['DELETE'])
+@api.route('/admin/connection/show/played/<string:the_id>', methods=['DELETE'])
+@invalidates('PLAYED')
 def delete_connection_played_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/admin/connection/show/played/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/admin/connection/show/played/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -2474,55 +3326,57 @@ def delete_connection_played_route(the_id):
 # /admin/connection/show/directed---------------------------------------------------------------------------------------
 
 
-def get_connections_directed(tx):
-    locate_connection = """
-        MATCH (person:Person)-[conn:DIRECTED]-(show:Show)
-        WITH person.name AS name, person.surname AS surname, ID(conn) AS id, show.title AS title
-        RETURN name, surname, id, title
-    """
-    locate_connection_result = tx.run(locate_connection).data()
-    return locate_connection_result
+DIRECTED_LISTING = {
+    'name': 'connections',
+    'match': 'MATCH (person:Person)-[conn:DIRECTED]-(show:Show)',
+    'node': 'conn',
+    'carry': 'person, conn, show',
+    'keys': {
+        'id': ('conn.uid', 'id', "''"),
+    },
+    'return': 'RETURN person.name AS name, person.surname AS surname, id, show.title AS title',
+}
 
 
 @api.route('/admin/connection/show/directed', methods=['GET'])
+@cached('DIRECTED', 'Person', 'Show')
 def get_connections_directed_route():
     """
     http GET http://127.0.0.1:5000/admin/connection/show/directed
     :return: {}
     """
-    with driver.session() as session:
-        connections = session.read_transaction(get_connections_directed)
+    return sort_response(DIRECTED_LISTING)
 
-    response = {'connections': connections}
-    return jsonify(response)
+
+def add_connections_directed(tx, rows):
+    create_connections = """
+        UNWIND $rows AS row
+        MATCH (person:Person {uid: row.person_id})
+        MATCH (show:Show {title: row.title})
+        MERGE (person)-[conn:DIRECTED]->(show)
+        ON CREATE SET conn.uid = row.uid
+        RETURN row.index AS index, conn.uid AS id, conn.uid = row.uid AS created
+    """
+    create_connections_result = tx.run(create_connections, rows=rows).data()
+    return create_connections_result
 
 
 def add_connection_directed(tx, person_id, title):
-    locate_connection = """
-        MATCH (person:Person)-[conn:DIRECTED]-(:Show {title: $title})
-        WHERE ID(person) = $person_id
-        RETURN conn
-    """
-    locate_connection_result = tx.run(locate_connection, title=title, person_id=person_id).data()
-
-    if not locate_connection_result:
-        create_connection = """
-            MATCH (person:Person)
-            WHERE ID(person) = $person_id
-            MATCH (show:Show {title: $title})
-            CREATE (person)-[:DIRECTED]->(show)
-        """
-        tx.run(create_connection, person_id=person_id, title=title)
-        return {'person': person_id, 'show': title}
+    rows = [{'index': 0, 'uid': new_uid(), 'person_id': person_id, 'title': title}]
+    create_connection_result = add_connections_directed(tx, rows)
+
+    if create_connection_result:
+        return create_connection_result[0]
 
 
 @api.route('/admin/connection/show/directed', methods=['POST'])
+@invalidates('DIRECTED')
 def add_connection_directed_route():
     """
-    http POST http://127.0.0.1:5000/admin/connection/show/directed person_id=11 title="title"
+    http POST http://127.0.0.1:5000/admin/connection/show/directed person_id="person-uid" title="title"
     :return: {}
     """
-    person_id = int(request.json['person_id'])
+    person_id = request.json['person_id']
     title = request.json['title']
 
     with driver.session() as session:
@@ -2532,25 +3386,39 @@ def add_connection_directed_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        response = {'status': 'success', 'id': connection['id']}
         return jsonify(response)
 
 
+@api.route('/admin/bulk/connection/show/directed', methods=['POST'])
+@invalidates('DIRECTED')
+def add_connections_directed_route():
+    """
+    http POST http://127.0.0.1:5000/admin/bulk/connection/show/directed < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with person_id, title.
+    :return: {}
+    """
+    return bulk_import(add_connections_directed, ['person_id', 'title'])
+
+
 def delete_connection_directed(tx, the_id):
-    locate_connection = "MATCH ()-[conn:DIRECTED]-() WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
+    remove_connection = """
+        MATCH (:Person)-[conn:DIRECTED {uid: $the_id}]->(:Show)
+        DELETE conn
+        RETURN $the_id AS id
+    """
+    remove_connection_result = tx.run(remove_connection, the_id=the_id).data()
 
-    if locate_connection_result:
-        delete_connection = "MATCH ()-[conn:DIRECTED]-() WHERE ID(conn) = $the_id DELETE conn"
-        tx.run(delete_connection, the_id=the_id)
-        return {'id': the_id}
+    if remove_connection_result:
+        return remove_connection_result[0]
 
 
-@api.route('/admin/connection/show/directed/<int:the_id>', methods=['DELETE'])
+@api.route('/admin/connection/show/directed/<string:the_id>', methods=['DELETE'])
+@invalidates('DIRECTED')
 def delete_connection_directed_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/admin/connection/show/directed/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/admin/connection/show/directed/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -2567,59 +3435,64 @@ def delete_connection_directed_route(the_id):
 # /connection/review/likes----------------------------------------------------------------------------------------------
 
 
-def get_connection_likes_review(tx):
-    locate_connection = """
-        MATCH (user:User)-[conn:LIKES]-(review:Review)-[:ABOUT]-(show:Show)
-        WITH user.nick AS author, ID(conn) AS id, ID(review) AS review_id, show.title AS title
-        RETURN author, id, review_id, title
-    """
-    locate_connection_result = tx.run(locate_connection).data()
-    return locate_connection_result
+REVIEW_LIKES_LISTING = {
+    'name': 'connections',
+    'match': 'MATCH (user:User)-[conn:LIKES]-(review:Review)-[:ABOUT]-(show:Show)',
+    'node': 'conn',
+    'carry': 'user, conn, review, show',
+    'keys': {
+        'id': ('conn.uid', 'id', "''"),
+    },
+    'return': 'RETURN user.nick AS author, id, review.uid AS review_id, show.title AS title',
+}
 
 
 @api.route('/connection/review/likes', methods=['GET'])
+@cached('LIKES', 'User', 'Review', 'ABOUT', 'Show')
 def get_connection_likes_review_route():
     """
     http GET http://127.0.0.1:5000/connection/review/likes
     :return: {}
     """
-    with driver.session() as session:
-        connections = session.read_transaction(get_connection_likes_review)
-
-    response = {'connections': connections}
-    return jsonify(response)
+    return sort_response(REVIEW_LIKES_LISTING)
 
 
-def add_connection_likes_review(tx, nick, review_id):
-    locate_user = "MATCH (user:User {nick: $nick}) RETURN user"
-    locate_user_result = tx.run(locate_user, nick=nick).data()
+def add_connections_likes_review(tx, rows):
+    create_connections = """
+        UNWIND $rows AS row
+        MATCH (user:User {nick: row.user})
+        MATCH (review:Review {uid: row.review_id})
+        MERGE (user)-[conn:LIKES]->(review)
+        ON CREATE SET conn.uid = row.uid,
+            review.like_count = coalesce(review.like_count + 1, size([(review)<-[:LIKES]-(:User) | 1]))
+        RETURN row.index AS index,
+            conn.uid AS id,
+            conn.uid = row.uid AS created,
+            user.uid AS user_id,
+            review.uid AS review_id,
+            review.like_count AS likes
+    """
+    create_connections_result = tx.run(create_connections, rows=rows).data()
+    return create_connections_result
 
-    locate_review = "MATCH (review:Review) WHERE ID(review) = $review_id RETURN review"
-    locate_review_result = tx.run(locate_review, review_id=review_id).data()
 
-    locate_connection = """
-        MATCH (:User {nick: $nick})-[conn:LIKES]-(review:Review) WHERE ID(review) = $review_id RETURN conn
-    """
-    locate_connection_result = tx.run(locate_connection, nick=nick, review_id=review_id).data()
+def add_connection_likes_review(tx, nick, review_id):
+    rows = [{'index': 0, 'uid': new_uid(), 'user': nick, 'review_id': review_id}]
+    create_connection_result = add_connections_likes_review(tx, rows)
 
-    if locate_user_result and locate_review_result and not locate_connection_result:
-        create_connection = """
-            MATCH (user:User {nick: $nick})
-            MATCH (review:Review) WHERE ID(review) = $review_id
-            CREATE (user)-[:LIKES]->(review)
-        """
-        tx.run(create_connection, nick=nick, review_id=review_id)
-        return {'user': nick, 'review': review_id}
+    if create_connection_result:
+        return create_connection_result[0]
 
 
 @api.route('/connection/review/likes', methods=['POST'])
+@invalidates('LIKES')
 def add_connection_likes_review_route():
     """
-    http POST http://127.0.0.1:5000/connection/review/likes user="user" review_id=11
+    http POST http://127.0.0.1:5000/connection/review/likes user="user" review_id="review-uid"
     :return: {}
     """
     nick = request.json['user']
-    review_id = int(request.json['review_id'])
+    review_id = request.json['review_id']
 
     with driver.session() as session:
         connection = session.write_transaction(add_connection_likes_review, nick, review_id)
@@ -2628,25 +3501,41 @@ def add_connection_likes_review_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        invalidate_recommendations(connection)
+        response = {'status': 'success', 'id': connection['id']}
         return jsonify(response)
 
 
+@api.route('/bulk/connection/review/likes', methods=['POST'])
+@invalidates('LIKES')
+def add_connections_likes_review_route():
+    """
+    http POST http://127.0.0.1:5000/bulk/connection/review/likes < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with user, review_id.
+    :return: {}
+    """
+    return bulk_import(add_connections_likes_review, ['user', 'review_id'], on_write=(invalidate_recommendations,))
+
+
 def delete_connection_likes_review(tx, the_id):
-    locate_connection = "MATCH (:User)-[conn:LIKES]-(:Review) WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
+    remove_connection = """
+        MATCH (user:User)-[conn:LIKES {uid: $the_id}]->(review:Review)
+        SET review.like_count = coalesce(review.like_count - 1, size([(review)<-[:LIKES]-(:User) | 1]) - 1)
+        DELETE conn
+        RETURN $the_id AS id, user.uid AS user_id, review.uid AS review_id, review.like_count AS likes
+    """
+    remove_connection_result = tx.run(remove_connection, the_id=the_id).data()
 
-    if locate_connection_result:
-        remove_connection = "MATCH (:User)-[conn:LIKES]-(:Review) WHERE ID(conn) = $the_id DELETE conn"
-        tx.run(remove_connection, the_id=the_id)
-        return {'id': the_id}
+    if remove_connection_result:
+        return remove_connection_result[0]
 
 
-@api.route('/connection/review/likes/<int:the_id>', methods=['DELETE'])
+@api.route('/connection/review/likes/<string:the_id>', methods=['DELETE'])
+@invalidates('LIKES')
 def delete_connection_likes_review_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/connection/review/likes/<int:the_id>
-    :param the_id: int
+    http DELETE http://127.0.0.1:5000/connection/review/likes/<string:the_id>
+    :param the_id: string
     :return: {}
     """
     with driver.session() as session:
@@ -2656,6 +3545,7 @@ def delete_connection_likes_review_route(the_id):
         response = {'message': 'Connection not found!'}
         return jsonify(response)
     else:
+        invalidate_recommendations(connection)
         response = {'status': 'success'}
         return jsonify(response)
 
@@ -2663,60 +3553,74 @@ def delete_connection_likes_review_route(the_id):
 # /connection/review/comments-------------------------------------------------------------------------------------------
 
 
-def get_review_comments(tx):
-    locate_connection = """
+COMMENTS_LISTING = {
+    'name': 'connections',
+    'match': """
         MATCH (user:User)-[comment:COMMENTS]-(review:Review)-[:ABOUT]-(show:Show)
         MATCH (author:User)-[:WROTE]-(review)
-        WITH user.nick AS comment_author,
+    """,
+    'node': 'comment',
+    'carry': 'user, comment, review, show, author',
+    'keys': {
+        'id': ('comment.uid', 'id', "''"),
+    },
+    'return': """
+        RETURN user.nick AS comment_author,
             comment.comment AS comment,
-            ID(comment) AS id,
+            id,
             show.title AS title,
             author.nick AS review_author
-        RETURN comment_author, comment, id, title, review_author
-    """
-    locate_connection_result = tx.run(locate_connection).data()
-    return locate_connection_result
+    """,
+}
 
 
 @api.route('/connection/review/comments', methods=['GET'])
+@cached('COMMENTS', 'User', 'Review', 'ABOUT', 'Show')
 def get_review_comments_route():
     """
     http GET http://127.0.0.1:5000/connection/review/comments
     :return: {}
     """
-    with driver.session() as session:
-        connections = session.read_transaction(get_review_comments)
+    return sort_response(COMMENTS_LISTING)
 
-    response = {'connections': connections}
-    return jsonify(response)
 
+def add_review_comments(tx, rows):
+    create_connections = """
+        UNWIND $rows AS row
+        MATCH (user:User {nick: row.user})
+        MATCH (review:Review {uid: row.review_id})
+        CREATE (user)-[conn:COMMENTS {uid: row.uid, comment: row.comment}]->(review)
+        SET review.comment_count = coalesce(review.comment_count + 1, size([(review)<-[:COMMENTS]-(:User) | 1])),
+            user.activity = coalesce(user.activity + 1, size([(user)-[:WROTE|COMMENTS]->(:Review) | 1]))
+        RETURN row.index AS index,
+            conn.uid AS id,
+            review.uid AS review_id,
+            review.comment_count AS comments,
+            user.uid AS user_id,
+            user.activity AS activity
+    """
+    create_connections_result = tx.run(create_connections, rows=rows).data()
+    return create_connections_result
 
-def add_review_comment(tx, nick, comment, review_id):
-    locate_user = "MATCH (user:User {nick: $nick}) RETURN user"
-    locate_user_result = tx.run(locate_user, nick=nick).data()
 
-    locate_review = "MATCH (review:Review) WHERE ID(review) = $review_id RETURN review"
-    locate_review_result = tx.run(locate_review, review_id=review_id).data()
+def add_review_comment(tx, nick, comment, review_id):
+    rows = [{'index': 0, 'uid': new_uid(), 'user': nick, 'comment': comment, 'review_id': review_id}]
+    create_connection_result = add_review_comments(tx, rows)
 
-    if locate_user_result and locate_review_result:
-        create_connection = """
-            MATCH (user:User {nick: $nick})
-            MATCH (review:Review) WHERE ID(review) = $review_id
-            CREATE (user)-[:COMMENTS {comment: $comment}]->(review)
-        """
-        tx.run(create_connection, nick=nick, review_id=review_id, comment=comment)
-        return {'user': nick, 'comment': comment, 'review_id': review_id}
+    if create_connection_result:
+        return create_connection_result[0]
 
 
 @api.route('/connection/review/comments', methods=['POST'])
+@invalidates('COMMENTS')
 def add_review_comment_route():
     """
-    http POST http://127.0.0.1:5000/connection/review/comments user="user" comment="comment" review_id=10
+    http POST http://127.0.0.1:5000/connection/review/comments user="user" comment="comment" review_id="review-uid"
     :return: {}
     """
     nick = request.json['user']
     comment = request.json['comment']
-    review_id = int(request.json['review_id'])
+    review_id = request.json['review_id']
 
     with driver.session() as session:
         connection = session.write_transaction(add_review_comment, nick, comment, review_id)
@@ -2725,29 +3629,42 @@ def add_review_comment_route():
         response = {'message': 'Invalid arguments!'}
         return jsonify(response)
     else:
-        response = {'status': 'success'}
+        board_activity(connection)
+        invalidate_recommendations(connection)
+        response = {'status': 'success', 'id': connection['id']}
         return jsonify(response)
 
 
+@api.route('/bulk/connection/review/comments', methods=['POST'])
+@invalidates('COMMENTS')
+def add_review_comments_route():
+    """
+    http POST http://127.0.0.1:5000/bulk/connection/review/comments < rows.json
+    Body is a JSON array or NDJSON (Content-Type: application/x-ndjson) of objects with user, comment, review_id.
+    :return: {}
+    """
+    on_write = (board_activity, invalidate_recommendations)
+    return bulk_import(add_review_comments, ['user', 'comment', 'review_id'], on_write=on_write)
+
+
 def put_review_comment(tx, the_id, comment):
-    locate_connection = "MATCH (:User)-[conn:COMMENTS]-(:Review) WHERE ID(conn) = $the_id RETURN conn"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
-
-    if locate_connection_result:
-        update_connection = """
-            MATCH (:User)-[conn:COMMENTS]-(:Review)
-            WHERE ID(conn) = $the_id
-            SET conn.comment = $comment
-        """
-        tx.run(update_connection, the_id=the_id, comment=comment)
-        return {'id': the_id, 'comment': comment}
+    update_connection = """
+        MATCH (:User)-[conn:COMMENTS {uid: $the_id}]->(:Review)
+        SET conn.comment = $comment
+        RETURN conn.uid AS id
+    """
+    update_connection_result = tx.run(update_connection, the_id=the_id, comment=comment).data()
 
+    if update_connection_result:
+        return update_connection_result[0]
 
-@api.route('/connection/review/comments/<int:the_id>', methods=['PUT'])
+
+@api.route('/connection/review/comments/<string:the_id>', methods=['PUT'])
+@invalidates('COMMENTS')
 def put_review_comment_route(the_id):
     """
-    http PUT http://127.0.0.1:5000/connection/review/comments/<int:the_id> comment="comment"
-    :param the_id: int
+    http PUT http://127.0.0.1:5000/connection/review/comments/<string:the_id> comment="comment"
+    :param the_id: string
     :return: {}
     """
     comment = request.json['comment']
@@ -2764,19 +3681,28 @@ def put_review_comment_route(the_id):
 
 
 def delete_review_comment(tx, the_id):
-    locate_connection = "MATCH (:User)-[comment:COMMENTS]-(:Review) WHERE ID(comment) = $the_id RETURN comment"
-    locate_connection_result = tx.run(locate_connection, the_id=the_id).data()
+    remove_connection = """
+        MATCH (user:User)-[comment:COMMENTS {uid: $the_id}]->(review:Review)
+        SET review.comment_count = coalesce(review.comment_count - 1, size([(review)<-[:COMMENTS]-(:User) | 1]) - 1),
+            user.activity = coalesce(user.activity - 1, size([(user)-[:WROTE|COMMENTS]->(:Review) | 1]) - 1)
+        DELETE comment
+        RETURN $the_id AS id,
+            review.uid AS review_id,
+            review.comment_count AS comments,
+            user.uid AS user_id,
+            user.activity AS activity
+    """
+    remove_connection_result = tx.run(remove_connection, the_id=the_id).data()
 
-    if locate_connection_result:
-        delete_connection = "MATCH (:User)-[comment:COMMENTS]-(:Review) WHERE ID(comment) = $the_id DELETE comment"
-        tx.run(delete_connection, the_id=the_id)
-        return {'id': the_id}
+    if remove_connection_result:
+        return remove_connection_result[0]
 
 
-@api.route('/connection/review/comments/<int:the_id>', methods=['DELETE'])
+@api.route('/connection/review/comments/<string:the_id>', methods=['DELETE'])
+@invalidates('COMMENTS')
 def delete_review_comment_route(the_id):
     """
-    http DELETE http://127.0.0.1:5000/connection/review/comments/<int:the_id>
+    http DELETE http://127.0.0.1:5000/connection/review/comments/<string:the_id>
     :param the_id:
     :return:
     """
@@ -2787,53 +3713,245 @@ def delete_review_comment_route(the_id):
         response = {'message': 'Connection not found!'}
         return jsonify(response)
     else:
+        board_activity(connection)
+        invalidate_recommendations(connection)
         response = {'status': 'success'}
         return jsonify(response)
 
 
-# /admin/get/csv/database-----------------------------------------------------------------------------------------------
+# /search---------------------------------------------------------------------------------------------------------------
 
 
-def get_database_csv(tx):
-    get_database = "CALL apoc.export.csv.all(null, {stream:true}) YIELD data RETURN data"
-    get_database_result = tx.run(get_database).data()
-    return get_database_result[0]['data']
+SEARCH_TYPES = {'show': 'Show', 'person': 'Person', 'user': 'User', 'review': 'Review'}
 
 
-@api.route('/admin/get/csv/database', methods=['GET'])
-def get_database_csv_route():
+def search_query(text):
     """
-    http GET http://127.0.0.1:5000/admin/get/csv/database
-    :return: StringIO
+    Turns free text into a Lucene query matching every word exactly, as a prefix or within one edit, exact matches
+    ranked highest. Words are split the way the index analyzer splits them, which also leaves out every character of
+    the Lucene query syntax.
+    :param text: string
+    :return: string or None if text has no words
+    """
+    terms = re.findall(r'\w+', text.lower())
+    if not terms:
+        return None
+    return ' '.join(f'({term}^4 OR {term}* OR {term}~1)' for term in terms)
+
+
+def search(tx, query, types, limit, after=None):
+    locate_nodes = """
+        CALL db.index.fulltext.queryNodes('search', $query) YIELD node, score
+        WITH node, score, [label IN labels(node) WHERE label IN $types][0] AS type
+        WHERE type IS NOT NULL
+            AND ($after IS NULL OR score < $after[0] OR (score = $after[0] AND node.uid > $after[1]))
+        WITH node, score, type
+        ORDER BY score DESC, node.uid
+        LIMIT $limit
+        RETURN toLower(type) AS type,
+            node.uid AS id,
+            CASE type
+                WHEN 'Show' THEN node.title
+                WHEN 'Person' THEN node.name + ' ' + node.surname
+                WHEN 'User' THEN node.nick
+                ELSE node.body
+            END AS text,
+            score
+        ORDER BY score DESC, id
+    """
+    locate_nodes_result = tx.run(locate_nodes, query=query, types=types, limit=limit, after=after).data()
+    return locate_nodes_result
+
+
+@api.route('/search', methods=['GET'])
+@cached('Show', 'Person', 'User', 'Review')
+def search_route():
+    """
+    http GET http://127.0.0.1:5000/search q=="text" type==show type==person limit==50 cursor==<next>
+    :return: {}
     """
+    query = search_query(request.args.get('q', ''))
+    types = request.args.getlist('type') or list(SEARCH_TYPES)
+    if query is None:
+        raise InvalidParameter('Invalid query!')
+    if not all(the_type in SEARCH_TYPES for the_type in types):
+        raise InvalidParameter('Invalid type!')
+    limit, after = get_page()
+
     with driver.session() as session:
-        string = session.read_transaction(get_database_csv)
+        results = session.read_transaction(
+            search, query, [SEARCH_TYPES[the_type] for the_type in types], limit, after
+        )
 
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
+    response = {'results': results, 'next': next_cursor(results, 'score', limit)}
+    return jsonify(response)
 
 
-# /admin/get/json/database----------------------------------------------------------------------------------------------
+@api.route('/autocomplete', methods=['GET'])
+def autocomplete_route():
+    """
+    http GET http://127.0.0.1:5000/autocomplete q=="break" type==show limit==10
+    :return: {}
+    """
+    prefix = request.args.get('q', '').strip()
+    types = request.args.getlist('type') or None
+    if not prefix:
+        raise InvalidParameter('Invalid query!')
+    if types and not all(the_type in ('show', 'person', 'user') for the_type in types):
+        raise InvalidParameter('Invalid type!')
+    limit = get_limit(DEFAULT_COMPLETIONS)
+    ensure_seeded(seed_lookup, lookup_lock, lookup)
+
+    completions = [
+        {'type': the_type, 'id': the_id, 'text': name}
+        for the_type, the_id, name in lookup.complete(prefix, limit, types)
+    ]
+    response = {'completions': completions}
+    return jsonify(response)
+
+
+# /admin/get/csv/database-----------------------------------------------------------------------------------------------
 
 
-def get_database_json(tx):
-    get_database = "CALL apoc.export.json.all(null, {stream:true}) YIELD data RETURN data"
-    get_database_result = tx.run(get_database).data()
-    return get_database_result[0]['data']
+@api.route('/admin/get/csv/database', methods=['GET'])
+def get_database_csv_route():
+    """
+    http GET http://127.0.0.1:5000/admin/get/csv/database
+    :return: Response
+    """
+    return export_response('csv')
+
+
+# /admin/get/json/database----------------------------------------------------------------------------------------------
 
 
 @api.route('/admin/get/json/database', methods=['GET'])
 def get_database_json_route():
     """
     http GET http://127.0.0.1:5000/admin/get/json/database
-    :return: StringIO
+    :return: Response
+    """
+    return export_response('json')
+
+
+# /admin/schema---------------------------------------------------------------------------------------------------------
+
+
+NODE_LABELS = ['Genre', 'Person', 'Show', 'User', 'Review']
+RELATIONSHIP_TYPES = ['BELONGS', 'SEEN', 'LIKES', 'WANTS_TO_WATCH', 'PLAYED', 'DIRECTED', 'ABOUT', 'WROTE', 'COMMENTS']
+
+SCHEMA = [
+    'CREATE CONSTRAINT user_nick IF NOT EXISTS FOR (user:User) REQUIRE user.nick IS UNIQUE',
+    'CREATE CONSTRAINT show_title IF NOT EXISTS FOR (show:Show) REQUIRE show.title IS UNIQUE',
+    'CREATE CONSTRAINT genre_name IF NOT EXISTS FOR (genre:Genre) REQUIRE genre.name IS UNIQUE',
+    'CREATE INDEX person_name IF NOT EXISTS FOR (person:Person) ON (person.name, person.surname)',
+    'CREATE INDEX show_likes IF NOT EXISTS FOR (show:Show) ON (show.likes)',
+    'CREATE INDEX user_activity IF NOT EXISTS FOR (user:User) ON (user.activity)',
+    'CREATE FULLTEXT INDEX search IF NOT EXISTS FOR (node:Show|Person|User|Review) '
+    'ON EACH [node.title, node.name, node.surname, node.nick, node.body]',
+] + [
+    f'CREATE CONSTRAINT {label.lower()}_uid IF NOT EXISTS FOR (node:{label}) REQUIRE node.uid IS UNIQUE'
+    for label in NODE_LABELS
+] + [
+    f'CREATE INDEX {rel_type.lower()}_uid IF NOT EXISTS FOR ()-[conn:{rel_type}]-() ON (conn.uid)'
+    for rel_type in RELATIONSHIP_TYPES
+]
+
+BACKFILL = [
+    """
+        MATCH (node) WHERE node.uid IS NULL
+        CALL { WITH node SET node.uid = randomUUID() } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+        MATCH ()-[conn]->() WHERE conn.uid IS NULL
+        CALL { WITH conn SET conn.uid = randomUUID() } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+        MATCH (show:Show) WHERE show.likes IS NULL
+        CALL {
+            WITH show
+            SET show.likes = size([(show)<-[:LIKES]-(:User) | 1])
+        } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+        MATCH (review:Review) WHERE review.like_count IS NULL OR review.comment_count IS NULL
+        CALL {
+            WITH review
+            SET review.like_count = size([(review)<-[:LIKES]-(:User) | 1]),
+                review.comment_count = size([(review)<-[:COMMENTS]-(:User) | 1])
+        } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+        MATCH (user:User) WHERE user.activity IS NULL
+        CALL {
+            WITH user
+            SET user.activity = size([(user)-[:WROTE|COMMENTS]->(:Review) | 1])
+        } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+        MATCH (review:Review) WHERE review.created IS NULL
+        CALL { WITH review SET review.created = timestamp() } IN TRANSACTIONS OF 10000 ROWS
+    """,
+]
+SCHEMA_TIMEOUT = 300
+
+
+def ensure_schema(backfill=False):
+    """
+    Creates the constraints and indexes backing the lookups by uid, nick, title, genre name and person name, the
+    score sorts, the top users and the full-text search, then waits until all of them are online. Safe to run on
+    every start.
+    :param backfill: bool, whether to first give every node and relationship created outside the API a public uid,
+    the counters the write routes keep and review timestamps, which scans the whole graph
+    """
+    with driver.session() as session:
+        for statement in (BACKFILL if backfill else []) + SCHEMA:
+            session.run(statement).consume()
+        session.run('CALL db.awaitIndexes($timeout)', timeout=SCHEMA_TIMEOUT).consume()
+
+
+def get_schema(tx):
+    locate_indexes = """
+        SHOW INDEXES
+        YIELD name, type, entityType, labelsOrTypes, properties, state, populationPercent
+        RETURN name, type, entityType, labelsOrTypes, properties, state, populationPercent
+        ORDER BY name
+    """
+    locate_indexes_result = tx.run(locate_indexes).data()
+    return locate_indexes_result
+
+
+@api.route('/admin/schema', methods=['GET'])
+def get_schema_route():
+    """
+    http GET http://127.0.0.1:5000/admin/schema
+    :return: {}
+    """
+    with driver.session() as session:
+        indexes = session.read_transaction(get_schema)
+
+    response = {'indexes': indexes}
+    return jsonify(response)
+
+
+@api.cli.command('schema')
+def schema_command():
+    """
+    flask --app main schema
     """
+    ensure_schema(backfill=True)
     with driver.session() as session:
-        string = session.read_transaction(get_database_json)
+        indexes = session.read_transaction(get_schema)
 
-    file = StringIO(string, '\n')
-    return Response(file, mimetype='text/plain')
+    for index in indexes:
+        print(f"{index['name']}: {index['state']} ({index['populationPercent']}%) "
+              f"{index['labelsOrTypes']} {index['properties']}")
 
 
 if __name__ == '__main__':
+    ensure_schema()
+    seed_leaderboards()
+    seed_similarity()
+    seed_lookup()
+    load_recommender()
     api.run()
@@ -0,0 +1,68 @@
+import json
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+
+
+class InvalidParameter(ValueError):
+    pass
+
+
+def encode_cursor(key, the_id):
+    """
+    Packs the sort key and ID of the last row on a page into an opaque token.
+    :param key: value of the sort key
+    :param the_id: string
+    :return: string
+    """
+    return urlsafe_b64encode(json.dumps([key, the_id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    :param cursor: string
+    :return: [key, the_id]
+    """
+    try:
+        key, the_id = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise InvalidParameter('Invalid cursor!')
+    return [key, the_id]
+
+
+def next_cursor(rows, key, limit):
+    """
+    :param rows: [{}] page returned by the database
+    :param key: name of the column the page is ordered by
+    :param limit: int
+    :return: cursor of the next page or None if this is the last one
+    """
+    if limit is None or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1][key], rows[-1]['id'])
+
+
+def sort_query(listing, sort, descending, paged=True):
+    """
+    Builds a top-k query for one page of the listing: keyset predicate on (sort key, id), ORDER BY and LIMIT are all
+    pushed into Cypher, and the output columns are computed only for the rows that made it onto the page. The sort
+    key and the cursor are coalesced to the default of the key, so rows missing the property page like any other.
+    Rows come back ordered by that key, returned in a 'key' column for the next cursor.
+    :param listing: {} one of the *_LISTING specs
+    :param sort: whitelisted key of listing['keys']
+    :param descending: bool
+    :param paged: bool, False leaves out LIMIT
+    :return: string
+    """
+    expression, _, default = listing['keys'][sort]
+    direction = 'DESC' if descending else 'ASC'
+    comparison = '<' if descending else '>'
+    return f"""
+        {listing['match']}
+        WITH {listing['carry']}, coalesce({expression}, {default}) AS key, {listing['node']}.uid AS id,
+            coalesce($after[0], {default}) AS after
+        WHERE $after IS NULL OR key {comparison} after OR (key = after AND id > $after[1])
+        WITH {listing['carry']}, key, id
+        ORDER BY key {direction}, id
+        {'LIMIT $limit' if paged else ''}
+        {listing['return'].rstrip()}, key
+        ORDER BY key {direction}, id
+    """
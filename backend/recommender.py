@@ -0,0 +1,424 @@
+import os
+from os.path import dirname, getmtime
+from tempfile import NamedTemporaryFile
+from threading import RLock
+
+import numpy as np
+from scipy import sparse
+
+
+class ItemRecommender:
+    """
+    Item-item collaborative filtering over the users x shows matrix R, where an entry is the number of SEEN and LIKES
+    connections between a user and a show. Only the co-occurrence matrix C = R.T @ R is kept: the cosine similarity
+    of shows j and k is C[j, k] / sqrt(C[j, j] * C[k, k]), so scoring a user takes their sparse row of R, the rows of
+    C it selects and a top-k.
+
+    Interactions changed since the last compaction live in per-user rows and a list of co-occurrence deltas, which
+    are folded into the sparse matrices every compact_every updates.
+    """
+
+    def __init__(self, users, shows, ratings, cooccurrence=None, removed=(), watermark=None, compact_every=1000):
+        self.users = list(users)
+        self.shows = list(shows)
+        self.user_index = {uid: i for i, uid in enumerate(self.users)}
+        self.show_index = {uid: i for i, uid in enumerate(self.shows)}
+        self.ratings = sparse.csr_matrix(ratings, dtype=np.float64)
+        if cooccurrence is None:
+            cooccurrence = self.ratings.T @ self.ratings
+        self.cooccurrence = sparse.csr_matrix(cooccurrence, dtype=np.float64)
+        self.norms = np.asarray(self.cooccurrence.diagonal(), dtype=np.float64)
+        self.removed = set(removed)
+        self.watermark = watermark
+        self.compact_every = compact_every
+        self._rows = {}
+        self._pending = ([], [], [])
+        self._updates = 0
+        self._lock = RLock()
+        self.changed = False
+
+    @classmethod
+    def from_interactions(cls, users, shows, weights, **kwargs):
+        """
+        :param users: [] user uid of every interaction
+        :param shows: [] show uid of every interaction
+        :param weights: [] number of SEEN and LIKES connections of every interaction
+        :return: ItemRecommender
+        """
+        user_ids, user_rows = np.unique(np.asarray(users, dtype=str), return_inverse=True)
+        show_ids, show_cols = np.unique(np.asarray(shows, dtype=str), return_inverse=True)
+        ratings = sparse.coo_matrix(
+            (np.asarray(weights, dtype=np.float64), (user_rows, show_cols)),
+            shape=(len(user_ids), len(show_ids))
+        ).tocsr()
+        return cls(user_ids.tolist(), show_ids.tolist(), ratings, **kwargs)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with np.load(path, allow_pickle=False) as saved:
+            ratings = sparse.csr_matrix(
+                (saved['ratings_data'], saved['ratings_indices'], saved['ratings_indptr']),
+                shape=tuple(saved['ratings_shape'])
+            )
+            cooccurrence = sparse.csr_matrix(
+                (saved['cooccurrence_data'], saved['cooccurrence_indices'], saved['cooccurrence_indptr']),
+                shape=tuple(saved['cooccurrence_shape'])
+            )
+            return cls(
+                saved['users'].tolist(),
+                saved['shows'].tolist(),
+                ratings,
+                cooccurrence,
+                saved['removed'].tolist(),
+                int(saved['watermark']) if 'watermark' in saved else None,
+                **kwargs
+            )
+
+    def save(self, path):
+        """
+        Compacts pending updates and writes the model to path, an .npz file. The arrays are taken under the lock and
+        written outside of it, to a temporary file that replaces path once complete, so readers never see a partial
+        file.
+        :return: int, the watermark saved with the model
+        """
+        with self._lock:
+            self.compact()
+            self.changed = False
+            self.watermark = self.weight()
+            arrays = dict(
+                users=np.asarray(self.users, dtype=str),
+                shows=np.asarray(self.shows, dtype=str),
+                removed=np.asarray(sorted(self.removed), dtype=np.int64),
+                watermark=np.asarray(self.watermark),
+                ratings_data=self.ratings.data,
+                ratings_indices=self.ratings.indices,
+                ratings_indptr=self.ratings.indptr,
+                ratings_shape=np.asarray(self.ratings.shape),
+                cooccurrence_data=self.cooccurrence.data,
+                cooccurrence_indices=self.cooccurrence.indices,
+                cooccurrence_indptr=self.cooccurrence.indptr,
+                cooccurrence_shape=np.asarray(self.cooccurrence.shape)
+            )
+
+        with NamedTemporaryFile(dir=dirname(os.path.abspath(path)), suffix='.npz', delete=False) as file:
+            try:
+                np.savez_compressed(file, **arrays)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        os.replace(file.name, path)
+        return arrays['watermark'].item()
+
+    def weight(self):
+        """
+        :return: int, the sum of R, i.e. the number of SEEN and LIKES connections between users and shows the model
+        reflects, which is compared with the graph to tell whether the model is up to date
+        """
+        with self._lock:
+            total = self.ratings.sum()
+            for u, row in self._rows.items():
+                if u < self.ratings.shape[0]:
+                    total -= self.ratings.data[self.ratings.indptr[u]:self.ratings.indptr[u + 1]].sum()
+                total += sum(row.values())
+            return int(round(total))
+
+    def set_interaction(self, user, show, weight):
+        """
+        Sets the entry of R for user and show, updating the co-occurrence of show with the other shows of the user.
+        :param user: string, user uid
+        :param show: string, show uid
+        :param weight: int, number of SEEN and LIKES connections between them
+        :return: bool, whether the update triggered a compaction
+        """
+        with self._lock:
+            u = self._add_user(user)
+            j = self._add_show(show)
+            row = dict(self._user_row(u))
+            old = row.get(j, 0.0)
+            if old == weight:
+                return False
+
+            delta = weight - old
+            rows, cols, values = self._pending
+            for k, w in row.items():
+                if k != j:
+                    rows.extend((j, k))
+                    cols.extend((k, j))
+                    values.extend((delta * w, delta * w))
+            rows.append(j)
+            cols.append(j)
+            values.append(weight ** 2 - old ** 2)
+            self.norms[j] += weight ** 2 - old ** 2
+
+            if weight:
+                row[j] = float(weight)
+            else:
+                row.pop(j, None)
+            self._rows[u] = row
+            self.changed = True
+
+            self._updates += 1
+            if self._updates >= self.compact_every:
+                self.compact()
+                return True
+            return False
+
+    def remove_user(self, user):
+        with self._lock:
+            u = self.user_index.get(user)
+            if u is None:
+                return
+            for j in list(self._user_row(u)):
+                self.set_interaction(user, self.shows[j], 0)
+
+    def remove_show(self, show):
+        """
+        Zeroes the column of R for show, so it no longer scores other shows or counts towards weight(), and masks it
+        out of the recommendations.
+        """
+        with self._lock:
+            j = self.show_index.get(show)
+            if j is None:
+                return
+            users = {u for u, row in self._rows.items() if j in row}
+            if j < self.ratings.shape[1]:
+                users.update(u for u in self.ratings.getcol(j).nonzero()[0].tolist() if u not in self._rows)
+            for u in sorted(users):
+                self.set_interaction(self.users[u], show, 0)
+            self.removed.add(j)
+            self.changed = True
+
+    def recommend(self, user, limit, exclude=()):
+        """
+        :param user: string, user uid
+        :param limit: int
+        :param exclude: [] of show uids to leave out as well
+        :return: [] of (show uid, score) for the best limit shows the user has no interaction with
+        """
+        return self.recommend_many([user], limit, {user: exclude})[user]
+
+    def recommend_many(self, users, limit, exclude=None):
+        """
+        Scores all users in one pass: a sparse product of their rows of R with the normalised co-occurrence matrix,
+        followed by a top-k over the non-zero scores of every row.
+        :param users: [] of user uids
+        :param limit: int
+        :param exclude: {} user uid -> [] of show uids to leave out as well, e.g. their watchlist
+        :return: {} user uid -> [] of (show uid, score)
+        """
+        exclude = exclude or {}
+        with self._lock:
+            rows = {}
+            for user in users:
+                u = self.user_index.get(user)
+                row = self._user_row(u) if u is not None else {}
+                if row:
+                    rows[user] = row
+
+            recommended = {user: [] for user in users}
+            if rows:
+                scores = self._scores(list(rows.values()))
+                for i, user in enumerate(rows):
+                    start, end = scores.indptr[i], scores.indptr[i + 1]
+                    excluded = [self.show_index[show] for show in exclude.get(user, ()) if show in self.show_index]
+                    recommended[user] = self._top(
+                        scores.indices[start:end], scores.data[start:end], limit, excluded
+                    )
+            return recommended
+
+    def active_users(self):
+        """
+        :return: [] of uids of the users with at least one interaction
+        """
+        with self._lock:
+            counts = np.zeros(len(self.users), dtype=np.int64)
+            counts[:self.ratings.shape[0]] = np.diff(self.ratings.indptr)
+            for u, row in self._rows.items():
+                counts[u] = len(row)
+            return [self.users[u] for u in np.flatnonzero(counts)]
+
+    def compact(self):
+        """
+        Folds the rows and co-occurrence deltas changed since the last compaction into the sparse matrices.
+        """
+        with self._lock:
+            n_users, n_shows = len(self.users), len(self.shows)
+
+            ratings = self.ratings.tocoo()
+            keep = ~np.isin(ratings.row, np.fromiter(self._rows, dtype=np.int64, count=len(self._rows)))
+            rows = [ratings.row[keep]]
+            cols = [ratings.col[keep]]
+            values = [ratings.data[keep]]
+            for u, row in self._rows.items():
+                rows.append(np.full(len(row), u, dtype=np.int64))
+                cols.append(np.fromiter(row.keys(), dtype=np.int64, count=len(row)))
+                values.append(np.fromiter(row.values(), dtype=np.float64, count=len(row)))
+            self.ratings = sparse.coo_matrix(
+                (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+                shape=(n_users, n_shows)
+            ).tocsr()
+
+            cooccurrence = self.cooccurrence.tocoo()
+            pending_rows, pending_cols, pending_values = self._pending
+            self.cooccurrence = sparse.coo_matrix(
+                (
+                    np.concatenate([cooccurrence.data, np.asarray(pending_values, dtype=np.float64)]),
+                    (
+                        np.concatenate([cooccurrence.row, np.asarray(pending_rows, dtype=np.int64)]),
+                        np.concatenate([cooccurrence.col, np.asarray(pending_cols, dtype=np.int64)])
+                    )
+                ),
+                shape=(n_shows, n_shows)
+            ).tocsr()
+            self.cooccurrence.eliminate_zeros()
+
+            self._rows = {}
+            self._pending = ([], [], [])
+            self._updates = 0
+
+    def _scores(self, rows):
+        """
+        :param rows: [] of {} show index -> weight
+        :return: sparse (len(rows), number of shows) matrix of summed cosine similarities, without the shows a row
+        already has and the removed ones
+        """
+        n_shows = len(self.shows)
+        norms = np.sqrt(np.maximum(self.norms, 0.0))
+        inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+        indptr = np.cumsum([0] + [len(row) for row in rows])
+        indices = np.fromiter((j for row in rows for j in row), dtype=np.int64, count=indptr[-1])
+        weights = np.fromiter((w for row in rows for w in row.values()), dtype=np.float64, count=indptr[-1])
+        queries = sparse.csr_matrix((weights * inverse[indices], indices, indptr), shape=(len(rows), n_shows))
+
+        base = self.cooccurrence.shape[0]
+        scores = sparse.csr_matrix(queries[:, :base] @ self.cooccurrence)
+        scores.resize((len(rows), n_shows))
+
+        pending_rows, pending_cols, pending_values = self._pending
+        if pending_values:
+            pending = sparse.csr_matrix(
+                (pending_values, (pending_rows, pending_cols)),
+                shape=(n_shows, n_shows)
+            )
+            scores = scores + queries @ pending
+
+        targets = inverse.copy()
+        targets[list(self.removed)] = 0.0
+        scores = sparse.csr_matrix(scores @ sparse.diags(targets))
+        seen = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(rows), n_shows))
+        scores = sparse.csr_matrix(scores - scores.multiply(seen))
+        scores.eliminate_zeros()
+        return scores
+
+    def _top(self, indices, scores, limit, excluded=()):
+        """
+        :param indices: array of show indices
+        :param scores: array of their scores
+        :param limit: int
+        :param excluded: [] of show indices to leave out
+        :return: [] of (show uid, score) for the best limit positive scores
+        """
+        positive = (scores > 0) & ~np.isin(indices, np.asarray(excluded, dtype=np.int64))
+        indices, scores = indices[positive], scores[positive]
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(self.shows[indices[b]], float(scores[b])) for b in best]
+
+    def _user_row(self, u):
+        row = self._rows.get(u)
+        if row is not None:
+            return row
+        if u >= self.ratings.shape[0]:
+            return {}
+        start, end = self.ratings.indptr[u], self.ratings.indptr[u + 1]
+        return dict(zip(self.ratings.indices[start:end].tolist(), self.ratings.data[start:end].tolist()))
+
+    def _add_user(self, user):
+        u = self.user_index.get(user)
+        if u is None:
+            u = len(self.users)
+            self.users.append(user)
+            self.user_index[user] = u
+        return u
+
+    def _add_show(self, show):
+        j = self.show_index.get(show)
+        if j is None:
+            j = len(self.shows)
+            self.shows.append(show)
+            self.show_index[show] = j
+            self.norms = np.append(self.norms, 0.0)
+        return j
+
+
+_worker_model = None
+_worker_version = None
+
+
+def recommend_chunk(path, users, limit, exclude=None):
+    """
+    Process pool task: scores a chunk of users with the model saved at path, loaded once per worker and reloaded
+    when the file changes.
+    :param path: string
+    :param users: [] of user uids
+    :param limit: int
+    :param exclude: {} user uid -> [] of show uids to leave out as well
+    :return: {} user uid -> [] of (show uid, score)
+    """
+    global _worker_model, _worker_version
+    version = (path, getmtime(path))
+    if _worker_model is None or _worker_version != version:
+        _worker_model = ItemRecommender.load(path)
+        _worker_version = version
+    return _worker_model.recommend_many(users, limit, exclude)
+
+
+def rank_reviews(ids, likes, comments, created, affinity, limit, after=None, now=0.0, half_life=1.0,
+                 comment_weight=1.0, affinity_weight=1.0):
+    """
+    Ranks candidate reviews by engagement * (1 + affinity_weight * affinity) * 0.5 ** (age / half_life), where
+    engagement = 1 + log(1 + likes) + comment_weight * log(1 + comments). The ranking key is the logarithm of that
+    score with the decay of now left out, which orders reviews the same way at any time, so a page boundary stays
+    valid while the feed ages.
+    :param ids: [] review uids
+    :param likes: [] like count of every review
+    :param comments: [] comment count of every review
+    :param created: [] creation time of every review, in the unit of half_life
+    :param affinity: [] number of SEEN and LIKES connections of the user with the reviewed show
+    :param limit: int
+    :param after: [key, uid] of the last review already seen or None
+    :param now: current time, in the unit of half_life
+    :param half_life: age at which the score of a review halves
+    :return: [] of (index into ids, key, score) for the next limit reviews, best first
+    """
+    ids = np.asarray(ids, dtype=str)
+    decay = np.log(2.0) / half_life
+    engagement = (
+        1.0
+        + np.log1p(np.asarray(likes, dtype=np.float64))
+        + comment_weight * np.log1p(np.asarray(comments, dtype=np.float64))
+    )
+    keys = (
+        np.log(engagement)
+        + np.log1p(affinity_weight * np.asarray(affinity, dtype=np.float64))
+        + decay * np.asarray(created, dtype=np.float64)
+    )
+
+    candidates = np.arange(len(ids))
+    if after is not None:
+        key, the_id = after
+        candidates = np.flatnonzero((keys < key) | ((keys == key) & (ids > the_id)))
+    if limit <= 0 or not len(candidates):
+        return []
+
+    if len(candidates) > limit:
+        bound = np.partition(-keys[candidates], limit - 1)[limit - 1]
+        candidates = candidates[-keys[candidates] <= bound]
+    order = candidates[np.lexsort((ids[candidates], -keys[candidates]))][:limit]
+    return [(int(i), float(keys[i]), float(np.exp(keys[i] - decay * now))) for i in order]
@@ -0,0 +1,47 @@
+from threading import Lock
+
+
+class Seeded:
+    """
+    Base of the in-process indexes loaded from a database snapshot. Until seed() has run writes are dropped, since
+    the snapshot includes them. Writes made between begin_seed() and seed() are journaled and replayed on top of the
+    snapshot, which may have been read before them; they carry absolute values, so replaying is idempotent.
+
+    Subclasses implement _load(items) to replace their contents, and route every write through _write().
+    """
+
+    def __init__(self):
+        self.seeded = False
+        self._journal = None
+        self._lock = Lock()
+
+    def begin_seed(self):
+        """
+        Starts recording the writes made until seed() is called, which replays them on top of the snapshot.
+        """
+        with self._lock:
+            self._journal = []
+
+    def seed(self, items):
+        """
+        Replaces the contents with items and replays the writes made since begin_seed().
+        """
+        with self._lock:
+            self._load(items)
+            for write, args in self._journal or ():
+                write(*args)
+            self._journal = None
+            self.seeded = True
+
+    def _load(self, items):
+        raise NotImplementedError
+
+    def _write(self, write, *args):
+        """
+        Applies a write once seeded, and records it while a seed is in progress.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((write, args))
+            if self.seeded:
+                write(*args)
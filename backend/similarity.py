@@ -0,0 +1,154 @@
+from hashlib import blake2b
+
+import numpy as np
+
+from seeding import Seeded
+
+PRIME = (1 << 31) - 1
+
+
+class MinHashIndex(Seeded):
+    """
+    Locality-sensitive hashing over the sets of shows users have seen or liked. Every user has a MinHash signature of
+    permutations values, whose share of equal positions estimates the Jaccard similarity of two sets. The signature
+    is cut into bands, and users sharing any band land in the same bucket, so a lookup only compares a user with the
+    candidates of their buckets instead of everyone.
+
+    Adding a show lowers a signature in place. Removing one rebuilds the signature from the user's set.
+    """
+
+    def __init__(self, permutations=128, bands=32, seed=0):
+        if permutations % bands:
+            raise ValueError('permutations must be a multiple of bands')
+        super().__init__()
+        self.permutations = permutations
+        self.bands = bands
+        random = np.random.default_rng(seed)
+        self._a = random.integers(1, PRIME, permutations, dtype=np.uint64)
+        self._b = random.integers(0, PRIME, permutations, dtype=np.uint64)
+        self._sets = {}
+        self._signatures = {}
+        self._keys = {}
+        self._buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, user):
+        return user in self._signatures
+
+    def seed(self, interactions):
+        """
+        Replaces the index with interactions.
+        :param interactions: [] of (user uid, show uid)
+        """
+        sets = {}
+        for user, show in interactions:
+            sets.setdefault(user, set()).add(show)
+        super().seed(sets)
+
+    def set_interaction(self, user, show, present):
+        """
+        :param user: string, user uid
+        :param show: string, show uid
+        :param present: bool, whether the user still has a SEEN or LIKES connection with the show
+        """
+        self._write(self._set_interaction, user, show, present)
+
+    def remove_user(self, user):
+        self._write(self._remove_user, user)
+
+    def remove_show(self, show):
+        self._write(self._remove_show, show)
+
+    def similar(self, user, limit):
+        """
+        :param user: string, user uid
+        :param limit: int
+        :return: [] of (user uid, estimated Jaccard similarity) for the best limit candidates sharing a bucket
+        """
+        with self._lock:
+            signature = self._signatures.get(user)
+            if signature is None:
+                return []
+            candidates = set()
+            for band, key in enumerate(self._keys[user]):
+                candidates.update(self._buckets[band][key])
+            candidates.discard(user)
+            if not candidates or limit <= 0:
+                return []
+
+            candidates = sorted(candidates)
+            signatures = np.stack([self._signatures[candidate] for candidate in candidates])
+        scores = np.mean(signatures == signature, axis=1)
+        limit = min(limit, len(candidates))
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(candidates[b], float(scores[b])) for b in best]
+
+    def _load(self, sets):
+        self._sets = {}
+        self._signatures = {}
+        self._keys = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        for user, shows in sets.items():
+            self._sets[user] = shows
+            self._index(user, self._signature(shows))
+
+    def _set_interaction(self, user, show, present):
+        shows = self._sets.get(user, set())
+        if present == (show in shows):
+            return
+        if present:
+            shows.add(show)
+            self._sets[user] = shows
+            signature = self._signatures.get(user)
+            hashes = self._hashes([show])[:, 0]
+            self._unindex(user)
+            self._index(user, hashes if signature is None else np.minimum(signature, hashes))
+        else:
+            shows.discard(show)
+            self._unindex(user)
+            if shows:
+                self._index(user, self._signature(shows))
+            else:
+                del self._sets[user]
+
+    def _remove_user(self, user):
+        self._sets.pop(user, None)
+        self._unindex(user)
+
+    def _remove_show(self, show):
+        for user, shows in list(self._sets.items()):
+            if show in shows:
+                self._set_interaction(user, show, False)
+
+    def _signature(self, shows):
+        return self._hashes(shows).min(axis=1)
+
+    def _hashes(self, shows):
+        """
+        :return: (permutations, len(shows)) matrix of the hashes of shows under every permutation
+        """
+        values = np.fromiter(
+            (int.from_bytes(blake2b(show.encode(), digest_size=8).digest(), 'little') % PRIME for show in shows),
+            dtype=np.uint64,
+            count=len(shows)
+        )
+        return (self._a[:, None] * values[None, :] + self._b[:, None]) % PRIME
+
+    def _index(self, user, signature):
+        self._signatures[user] = signature
+        keys = [band.tobytes() for band in np.split(signature, self.bands)]
+        self._keys[user] = keys
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, set()).add(user)
+
+    def _unindex(self, user):
+        self._signatures.pop(user, None)
+        for band, key in enumerate(self._keys.pop(user, ())):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(user)
+                if not bucket:
+                    del self._buckets[band][key]
@@ -0,0 +1,17 @@
+import sys
+from os.path import dirname, abspath
+
+import pytest
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+
+@pytest.fixture
+def seeded():
+    """
+    :return: function seeding an index with items and returning it
+    """
+    def seed(index, items):
+        index.seed(items)
+        return index
+    return seed
@@ -0,0 +1,55 @@
+import cache
+from cache import ResponseCache
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache, 'monotonic', lambda: now[0])
+    responses = ResponseCache(ttl=10)
+    assert responses.set('a', 'A', ['Show'], responses.versions(['Show']), 1)
+
+    now[0] = 110.0
+    assert responses.get('a') == 'A'
+    now[0] = 110.5
+    assert responses.get('a') is None
+    assert len(responses) == 0 and responses.size == 0
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    responses = ResponseCache(max_entries=2)
+    for key in ('a', 'b'):
+        responses.set(key, key.upper(), [], (), 1)
+    responses.get('a')
+    responses.set('c', 'C', [], (), 1)
+    assert responses.get('b') is None
+    assert responses.get('a') == 'A' and responses.get('c') == 'C'
+
+
+def test_total_size_is_bounded():
+    responses = ResponseCache(max_size=10)
+    responses.set('a', 'A', [], (), 6)
+    responses.set('b', 'B', [], (), 6)
+    assert responses.get('a') is None and responses.get('b') == 'B'
+    assert not responses.set('c', 'C', [], (), 11)
+    assert responses.size == 6
+
+
+def test_invalidate_drops_only_tagged_entries():
+    responses = ResponseCache()
+    responses.set('shows', 'S', ['Show'], (0,), 1)
+    responses.set('likes', 'L', ['Show', 'LIKES'], (0, 0), 1)
+    responses.set('users', 'U', ['User'], (0,), 1)
+    responses.invalidate('LIKES')
+    assert responses.get('likes') is None
+    assert responses.get('shows') == 'S' and responses.get('users') == 'U'
+    responses.invalidate('Show')
+    assert responses.get('shows') is None and len(responses) == 1
+
+
+def test_response_built_across_an_invalidation_is_not_stored():
+    responses = ResponseCache()
+    versions = responses.versions(['Show', 'Genre'])
+    responses.invalidate('Genre')
+    assert not responses.set('shows', 'S', ['Show', 'Genre'], versions, 1)
+    assert responses.get('shows') is None
+    assert responses.set('shows', 'S', ['Show', 'Genre'], responses.versions(['Show', 'Genre']), 1)
@@ -0,0 +1,34 @@
+from leaderboard import Leaderboard
+
+SHOWS = [{'id': 's1', 'score': 3}, {'id': 's2', 'score': 5}, {'id': 's3', 'score': 3}, {'id': 's4', 'score': None}]
+
+
+def ids(board, k=10):
+    return [item['id'] for item in board.top(k)]
+
+
+def test_top_orders_by_score_then_id(seeded):
+    board = seeded(Leaderboard('score'), SHOWS)
+    assert ids(board) == ['s2', 's1', 's3', 's4']
+    assert ids(board, 2) == ['s2', 's1']
+
+
+def test_put_update_and_discard(seeded):
+    board = seeded(Leaderboard('score'), SHOWS)
+    board.update('s3', score=6)
+    board.put({'id': 's5', 'score': 4})
+    board.discard('s2')
+    board.update('missing', score=9)
+    assert ids(board) == ['s3', 's5', 's1', 's4']
+    assert board.get('s3') == {'id': 's3', 'score': 6}
+    assert 'missing' not in board
+
+
+def test_update_during_a_reseed_reaches_entries_the_board_lacked(seeded):
+    board = seeded(Leaderboard('score'), SHOWS[:2])
+    board.begin_seed()
+    board.update('s4', score=8)
+    board.seed([{'id': 's1', 'score': 1}, {'id': 's4', 'score': 0}])
+    assert ids(board) == ['s4', 's1']
+    board.update('s1', score=9)
+    assert ids(board) == ['s1', 's4']
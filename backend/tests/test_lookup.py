@@ -0,0 +1,76 @@
+from lookup import PrefixIndex, edit_distance, normalize
+
+NAMES = [
+    ('show', 's1', 'Breaking Bad'),
+    ('show', 's2', 'Better Call Saul'),
+    ('show', 's3', 'Amélie'),
+    ('person', 'p1', 'Bryan Cranston'),
+    ('person', 'p2', 'Łukasz Żak'),
+    ('person', 'p3', None),
+    ('user', 'u1', 'breaker'),
+]
+
+
+def test_normalize_folds_case_accents_and_spaces():
+    assert normalize('  Łukasz   ŻAK ') == 'lukasz zak'
+    assert normalize('Amélie') == 'amelie'
+
+
+def test_complete_matches_any_word_ignoring_accents(seeded):
+    index = seeded(PrefixIndex(), NAMES)
+    assert index.complete('Bre', 10) == [('user', 'u1', 'breaker'), ('show', 's1', 'Breaking Bad')]
+    assert index.complete('cran', 10) == [('person', 'p1', 'Bryan Cranston')]
+    assert index.complete('AME', 10) == [('show', 's3', 'Amélie')]
+    assert index.complete('zak', 10) == [('person', 'p2', 'Łukasz Żak')]
+
+
+def test_complete_filters_types_and_limits(seeded):
+    index = seeded(PrefixIndex(), NAMES)
+    shows = index.complete('b', 10, types=('show',))
+    assert shows == [('show', 's1', 'Breaking Bad'), ('show', 's2', 'Better Call Saul')]
+    assert len(index.complete('b', 2)) == 2
+
+
+def test_seed_skips_entries_without_a_name(seeded):
+    index = seeded(PrefixIndex(), NAMES)
+    assert ('person', 'p3') not in index
+    assert len(index) == 6
+
+
+def test_rename_replaces_old_keys(seeded):
+    index = seeded(PrefixIndex(), NAMES)
+    index.put('person', 'p1', 'Aaron Paul')
+    assert index.complete('cran', 10) == []
+    assert index.complete('paul', 10) == [('person', 'p1', 'Aaron Paul')]
+
+
+def test_edit_distance_gives_up_past_the_bound():
+    assert edit_distance('kitten', 'sitting', 3) == 3
+    assert edit_distance('kitten', 'sitting', 2) is None
+    assert edit_distance('abc', 'abcdef', 2) is None
+
+
+def test_find_ignores_case_and_accents(seeded):
+    index = seeded(PrefixIndex(), NAMES)
+    assert index.find('show', 'AMELIE', 2, 10) == [('s3', 0)]
+    assert index.find('person', 'lukasz zak', 0, 10) == [('p2', 0)]
+
+
+def test_find_tolerates_typos_within_the_distance(seeded):
+    index = seeded(PrefixIndex(), NAMES)
+    assert index.find('show', 'Brakin Bad', 2, 10) == [('s1', 2)]
+    assert index.find('show', 'Brakin Bad', 1, 10) == []
+    assert index.find('person', 'Bryan Cranston', 2, 10) == [('p1', 0)]
+
+
+def test_find_orders_by_distance_and_respects_type_and_limit(seeded):
+    index = seeded(PrefixIndex(), NAMES + [('show', 's4', 'Breaking Bed'), ('show', 's5', 'Breaking Bud')])
+    assert index.find('show', 'breaking bad', 1, 10) == [('s1', 0), ('s4', 1), ('s5', 1)]
+    assert index.find('show', 'breaking bad', 1, 2) == [('s1', 0), ('s4', 1)]
+    assert index.find('user', 'breaking bad', 2, 10) == []
+
+
+def test_distance_is_capped_for_short_names(seeded):
+    index = seeded(PrefixIndex(), [('show', 's1', 'Up'), ('show', 's2', 'Us')])
+    assert index.find('show', 'up', 2, 10) == [('s1', 0), ('s2', 1)]
+    assert index.find('show', 'ab', 2, 10) == []
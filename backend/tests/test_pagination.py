@@ -0,0 +1,59 @@
+import pytest
+
+from pagination import InvalidParameter, decode_cursor, encode_cursor, next_cursor, sort_query
+
+LISTING = {
+    'name': 'shows',
+    'match': 'MATCH (show:Show)-[:BELONGS]-(genre:Genre)',
+    'node': 'show',
+    'carry': 'show, genre',
+    'keys': {
+        'id': ('show.uid', 'id', "''"),
+        'score': ('show.likes', 'score', '0'),
+    },
+    'return': """
+        RETURN show.title AS title,
+            id,
+            show.likes AS score
+    """,
+}
+
+
+def clauses(query):
+    return [line.strip() for line in query.strip().splitlines() if line.strip()]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(5, 's1')) == [5, 's1']
+    assert decode_cursor(encode_cursor(None, 's1')) == [None, 's1']
+
+
+@pytest.mark.parametrize('cursor', ['not base64!', encode_cursor(1, 's1')[:-4], 'WzFd'])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidParameter):
+        decode_cursor(cursor)
+
+
+def test_next_cursor_comes_from_the_last_row_of_a_full_page():
+    rows = [{'key': 0, 'id': 's2', 'score': None}, {'key': 5, 'id': 's1', 'score': 5}]
+    assert next_cursor(rows, 'key', 2) == encode_cursor(5, 's1')
+    assert next_cursor(rows, 'key', 3) is None
+    assert next_cursor(rows, 'key', None) is None
+
+
+def test_sort_query_orders_and_filters_on_the_coalesced_key():
+    query = clauses(sort_query(LISTING, 'score', True))
+    assert 'WITH show, genre, coalesce(show.likes, 0) AS key, show.uid AS id,' in query
+    assert 'coalesce($after[0], 0) AS after' in query
+    assert 'WHERE $after IS NULL OR key < after OR (key = after AND id > $after[1])' in query
+    assert query[-2] == 'show.likes AS score, key'
+    assert query[-1] == 'ORDER BY key DESC, id'
+    assert query.count('ORDER BY key DESC, id') == 2
+    assert 'LIMIT $limit' in query
+
+
+def test_sort_query_without_paging_has_no_limit():
+    query = clauses(sort_query(LISTING, 'id', False, paged=False))
+    assert 'LIMIT $limit' not in query
+    assert 'WHERE $after IS NULL OR key > after OR (key = after AND id > $after[1])' in query
+    assert query[-1] == 'ORDER BY key ASC, id'
@@ -0,0 +1,43 @@
+import numpy as np
+
+from recommender import rank_reviews
+
+
+def rank(ids, likes, created, limit, after=None, **kwargs):
+    return rank_reviews(ids, likes, [0] * len(ids), created, [0] * len(ids), limit, after, **kwargs)
+
+
+def test_ties_are_ordered_by_id():
+    ids = ['r3', 'r1', 'r4', 'r2']
+    ranked = rank(ids, [1, 1, 5, 1], [0, 0, 0, 0], 4)
+    assert [ids[i] for i, key, score in ranked] == ['r4', 'r1', 'r2', 'r3']
+
+
+def test_pages_split_inside_a_tie():
+    ids = ['r%d' % i for i in range(7)]
+    likes = [2, 0, 2, 2, 0, 2, 1]
+    everything = [ids[i] for i, key, score in rank(ids, likes, [0] * 7, 7)]
+
+    pages = []
+    after = None
+    while True:
+        page = rank(ids, likes, [0] * 7, 2, after)
+        if not page:
+            break
+        pages.extend(ids[i] for i, key, score in page)
+        index, key, score = page[-1]
+        after = [key, ids[index]]
+    assert pages == everything == ['r0', 'r2', 'r3', 'r5', 'r6', 'r1', 'r4']
+
+
+def test_keys_do_not_depend_on_now():
+    ids = ['old', 'new']
+    early = rank(ids, [3, 0], [0, 2], 2, now=2, half_life=1)
+    late = rank(ids, [3, 0], [0, 2], 2, now=10, half_life=1)
+    assert [(i, key) for i, key, score in early] == [(i, key) for i, key, score in late]
+    assert np.isclose(early[0][2] / late[0][2], 2 ** 8)
+
+
+def test_newer_review_outranks_older_with_the_same_engagement():
+    ranked = rank(['old', 'new'], [1, 1], [0, 1], 2, half_life=1)
+    assert [i for i, key, score in ranked] == [1, 0]
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+from recommender import ItemRecommender
+
+INTERACTIONS = [
+    ('u1', 's1', 2), ('u1', 's2', 1), ('u2', 's1', 1), ('u2', 's3', 2),
+    ('u3', 's2', 1), ('u3', 's3', 1), ('u3', 's4', 2), ('u4', 's4', 1),
+]
+UPDATES = [
+    ('u1', 's3', 1), ('u2', 's1', 0), ('u5', 's2', 2), ('u5', 's5', 1), ('u4', 's1', 2), ('u1', 's3', 2),
+]
+
+
+def build(interactions, **kwargs):
+    users, shows, weights = zip(*interactions)
+    return ItemRecommender.from_interactions(users, shows, weights, **kwargs)
+
+
+def rebuilt():
+    final = {(user, show): weight for user, show, weight in INTERACTIONS + UPDATES}
+    return build([(user, show, weight) for (user, show), weight in final.items() if weight])
+
+
+def assert_same_recommendations(model, expected):
+    users = sorted(expected.user_index)
+    actual = model.recommend_many(users, 10)
+    for user, recommended in expected.recommend_many(users, 10).items():
+        assert [show for show, score in actual[user]] == [show for show, score in recommended]
+        assert np.allclose([score for show, score in actual[user]], [score for show, score in recommended])
+
+
+def test_pending_updates_match_rebuild():
+    model = build(INTERACTIONS)
+    for user, show, weight in UPDATES:
+        assert not model.set_interaction(user, show, weight)
+
+    expected = rebuilt()
+    assert_same_recommendations(model, expected)
+    assert model.weight() == expected.weight()
+
+
+def test_compacted_updates_match_rebuild():
+    model = build(INTERACTIONS, compact_every=2)
+    compactions = [model.set_interaction(user, show, weight) for user, show, weight in UPDATES]
+    assert compactions == [False, True] * 3
+
+    assert_same_recommendations(model, rebuilt())
+    model.compact()
+    assert_same_recommendations(model, rebuilt())
+
+
+def test_recommend_leaves_out_known_and_excluded_shows():
+    model = build(INTERACTIONS)
+    recommended = [show for show, score in model.recommend('u1', 10)]
+    assert recommended and not {'s1', 's2'} & set(recommended)
+
+    excluded = [show for show, score in model.recommend('u1', 10, exclude=[recommended[0]])]
+    assert excluded == recommended[1:]
+    assert model.recommend('nobody', 10) == []
+
+
+def test_removed_show_matches_rebuild_without_it():
+    model = build(INTERACTIONS + [('u6', 's3', 1)])
+    model.remove_show('s3')
+    assert 's3' not in [show for show, score in model.recommend('u1', 10)]
+    assert model.recommend('u6', 10) == []
+
+    expected = build([(user, show, weight) for user, show, weight in INTERACTIONS if show != 's3'])
+    assert model.weight() == expected.weight()
+    assert_same_recommendations(model, expected)
+    model.compact()
+    assert_same_recommendations(model, expected)
+
+
+def test_save_replaces_file_and_keeps_watermark(tmp_path):
+    path = str(tmp_path / 'model.npz')
+    model = build(INTERACTIONS)
+    model.set_interaction('u1', 's3', 1)
+    assert model.save(path) == model.weight() == sum(weight for user, show, weight in INTERACTIONS) + 1
+    assert os.listdir(tmp_path) == ['model.npz']
+
+    loaded = ItemRecommender.load(path)
+    assert loaded.watermark == model.watermark
+    assert_same_recommendations(loaded, model)
+
+
+def test_failed_save_leaves_previous_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'model.npz')
+    model = build(INTERACTIONS)
+    model.save(path)
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(np, 'savez_compressed', fail)
+    model.set_interaction('u1', 's3', 1)
+    with pytest.raises(OSError):
+        model.save(path)
+    assert os.listdir(tmp_path) == ['model.npz']
+    assert ItemRecommender.load(path).weight() == model.weight() - 1
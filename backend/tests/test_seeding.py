@@ -0,0 +1,72 @@
+import pytest
+
+from leaderboard import Leaderboard
+from lookup import PrefixIndex
+from seeding import Seeded
+from similarity import MinHashIndex
+
+
+class Store(Seeded):
+    def __init__(self):
+        super().__init__()
+        self.items = {}
+
+    def set(self, key, value):
+        self._write(self._set, key, value)
+
+    def _load(self, items):
+        self.items = dict(items)
+
+    def _set(self, key, value):
+        if value is None:
+            self.items.pop(key, None)
+        else:
+            self.items[key] = value
+
+
+def test_writes_before_seeding_are_dropped():
+    store = Store()
+    store.set('a', 1)
+    assert not store.seeded and store.items == {}
+    store.seed([('b', 2)])
+    assert store.seeded and store.items == {'b': 2}
+
+
+def test_writes_during_seeding_are_replayed_in_order_on_the_snapshot():
+    store = Store()
+    store.begin_seed()
+    store.set('a', 1)
+    store.set('a', 3)
+    store.set('b', None)
+    store.set('c', 4)
+    assert store.items == {}
+    store.seed([('a', 0), ('b', 2)])
+    assert store.items == {'a': 3, 'c': 4}
+
+
+def test_writes_after_seeding_apply_immediately_and_are_not_journaled():
+    store = Store()
+    store.seed([('a', 1)])
+    store.set('a', 2)
+    assert store.items == {'a': 2}
+    assert store._journal is None
+
+
+def test_reseeding_keeps_serving_and_replays_writes_made_meanwhile():
+    store = Store()
+    store.seed([('a', 1)])
+    store.begin_seed()
+    store.set('b', 2)
+    assert store.items == {'a': 1, 'b': 2}
+    store.seed([('a', 5)])
+    assert store.items == {'a': 5, 'b': 2}
+
+
+def test_subclasses_must_load_snapshots():
+    with pytest.raises(NotImplementedError):
+        Seeded().seed([])
+
+
+@pytest.mark.parametrize('index', [Leaderboard('score'), PrefixIndex(), MinHashIndex(64, 16)])
+def test_indexes_share_the_journal(index):
+    assert isinstance(index, Seeded) and not index.seeded
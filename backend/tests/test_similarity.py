@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from similarity import MinHashIndex
+
+INTERACTIONS = [('u1', 's1'), ('u1', 's2'), ('u2', 's1'), ('u2', 's2'), ('u2', 's3'), ('u3', 's4')]
+
+
+def signatures(index):
+    return {user: index._signatures[user].tolist() for user in index._sets}
+
+
+def test_identical_histories_are_found(seeded):
+    index = seeded(MinHashIndex(64, 16), INTERACTIONS + [('u4', 's1'), ('u4', 's2')])
+    assert index.similar('u1', 5)[0] == ('u4', 1.0)
+    assert index.similar('nobody', 5) == []
+
+
+def test_incremental_writes_match_a_fresh_seed(seeded):
+    index = seeded(MinHashIndex(64, 16), INTERACTIONS)
+    index.set_interaction('u1', 's3', True)
+    index.set_interaction('u2', 's1', False)
+    index.remove_user('u3')
+    expected = seeded(MinHashIndex(64, 16), [('u1', 's1'), ('u1', 's2'), ('u1', 's3'), ('u2', 's2'), ('u2', 's3')])
+    assert index._sets == expected._sets
+    assert signatures(index) == signatures(expected)
+
+
+def test_removing_a_show_rebuilds_signatures(seeded):
+    index = seeded(MinHashIndex(64, 16), INTERACTIONS)
+    index.remove_show('s2')
+    expected = seeded(MinHashIndex(64, 16), [(user, show) for user, show in INTERACTIONS if show != 's2'])
+    assert signatures(index) == signatures(expected)
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHashIndex(100, 32)
+
+
+def test_estimate_tracks_jaccard_similarity():
+    shows = ['s%d' % i for i in range(40)]
+    index = MinHashIndex(256, 64)
+    index.seed([('a', show) for show in shows[:30]] + [('b', show) for show in shows[10:40]])
+    similar = dict(index.similar('a', 1))
+    assert np.isclose(similar['b'], 0.5, atol=0.15)